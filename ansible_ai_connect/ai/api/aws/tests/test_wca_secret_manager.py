@@ -12,7 +12,8 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from unittest.mock import Mock
+import time
+from unittest.mock import Mock, patch
 
 from botocore.exceptions import ClientError
 from rest_framework.test import APITestCase
@@ -24,7 +25,9 @@ from ansible_ai_connect.ai.api.aws.exceptions import (
 from ansible_ai_connect.ai.api.aws.wca_secret_manager import (
     SECRET_KEY_PREFIX,
     AWSSecretManager,
+    CachingSecretManager,
     Suffixes,
+    invalidate_cached_secrets,
 )
 from ansible_ai_connect.test_utils import WisdomServiceLogAwareTestCase
 
@@ -151,3 +154,96 @@ class TestWcaApiKeyClient(APITestCase, WisdomServiceLogAwareTestCase):
         c = AWSSecretManager("dummy", None, "dummy", "dummy", [])
         with self.assertRaises(WcaSecretManagerMissingCredentialsError):
             c.get_client()
+
+
+class TestCachingSecretManager(WisdomServiceLogAwareTestCase):
+    def setUp(self):
+        super().setUp()
+        self.m_secret_manager = Mock()
+        self.m_secret_manager.get_secret.return_value = {"SecretString": SECRET_VALUE}
+        self.c = CachingSecretManager(self.m_secret_manager, ttl=300, negative_ttl=30)
+
+    def test_get_secret_is_cached(self):
+        self.assertEqual(self.c.get_secret(ORG_ID, Suffixes.API_KEY)["SecretString"], SECRET_VALUE)
+        self.assertEqual(self.c.get_secret(ORG_ID, Suffixes.API_KEY)["SecretString"], SECRET_VALUE)
+        self.assertTrue(self.c.secret_exists(ORG_ID, Suffixes.API_KEY))
+        self.m_secret_manager.get_secret.assert_called_once_with(ORG_ID, Suffixes.API_KEY)
+
+    def test_get_secret_is_cached_per_suffix(self):
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.c.get_secret(ORG_ID, Suffixes.MODEL_ID)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_get_secret_expires(self):
+        now = time.monotonic()
+        with patch("time.monotonic", return_value=now):
+            self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        with patch("time.monotonic", return_value=now + 301):
+            self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_missing_secret_is_cached(self):
+        self.m_secret_manager.get_secret.return_value = None
+        now = time.monotonic()
+        with patch("time.monotonic", return_value=now):
+            self.assertIsNone(self.c.get_secret(ORG_ID, Suffixes.MODEL_ID))
+            self.assertFalse(self.c.secret_exists(ORG_ID, Suffixes.MODEL_ID))
+        self.m_secret_manager.get_secret.assert_called_once()
+        with patch("time.monotonic", return_value=now + 31):
+            self.c.get_secret(ORG_ID, Suffixes.MODEL_ID)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.m_secret_manager.get_secret.side_effect = WcaSecretManagerError
+        for _ in range(2):
+            with self.assertRaises(WcaSecretManagerError):
+                self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_save_secret_invalidates(self):
+        self.m_secret_manager.save_secret.return_value = "wisdom"
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.c.save_secret(ORG_ID, Suffixes.API_KEY, SECRET_VALUE), "wisdom")
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_delete_secret_invalidates(self):
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.c.delete_secret(ORG_ID, Suffixes.API_KEY)
+        self.m_secret_manager.delete_secret.assert_called_once_with(ORG_ID, Suffixes.API_KEY)
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_delete_secret_error_invalidates(self):
+        self.m_secret_manager.delete_secret.side_effect = WcaSecretManagerError
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        with self.assertRaises(WcaSecretManagerError):
+            self.c.delete_secret(ORG_ID, Suffixes.API_KEY)
+        self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_save_secret_invalidates_other_processes(self):
+        other = CachingSecretManager(self.m_secret_manager, ttl=300, negative_ttl=30)
+        other.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.c.save_secret(ORG_ID, Suffixes.API_KEY, SECRET_VALUE)
+        other.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
+
+    def test_invalidate_during_read(self):
+        def get_secret(org_id, suffix):
+            # The Secret is rotated while the previous one is being read
+            invalidate_cached_secrets(org_id)
+            return {"SecretString": "previous"}
+
+        self.m_secret_manager.get_secret.side_effect = get_secret
+        self.assertEqual(self.c.get_secret(ORG_ID, Suffixes.API_KEY)["SecretString"], "previous")
+        self.m_secret_manager.get_secret.side_effect = None
+        self.assertEqual(self.c.get_secret(ORG_ID, Suffixes.API_KEY)["SecretString"], SECRET_VALUE)
+
+    def test_shared_cache_error(self):
+        with patch(
+            "ansible_ai_connect.ai.api.aws.wca_secret_manager.cache.get", side_effect=Exception
+        ):
+            for _ in range(2):
+                self.c.get_secret(ORG_ID, Suffixes.API_KEY)
+        self.assertEqual(self.m_secret_manager.get_secret.call_count, 2)
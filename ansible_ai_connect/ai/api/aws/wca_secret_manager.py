@@ -13,13 +13,19 @@
 #  limitations under the License.
 
 import logging
+import threading
+import time
+import uuid
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 
 import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Histogram
 
 from .exceptions import WcaSecretManagerError, WcaSecretManagerMissingCredentialsError
 
@@ -27,6 +33,24 @@ SECRET_KEY_PREFIX = "wca"
 
 logger = logging.getLogger(__name__)
 
+wca_secret_manager_hist = Histogram(
+    "wca_secret_manager_latency_seconds",
+    "Histogram of AWS Secrets Manager API processing time",
+    namespace=NAMESPACE,
+)
+wca_secret_manager_cache_hit_counter = Counter(
+    "wca_secret_manager_cache_hits",
+    "Counter of WCA Secrets served from the cache",
+    ["suffix"],
+    namespace=NAMESPACE,
+)
+wca_secret_manager_cache_miss_counter = Counter(
+    "wca_secret_manager_cache_misses",
+    "Counter of WCA Secrets looked up in AWS Secrets Manager",
+    ["suffix"],
+    namespace=NAMESPACE,
+)
+
 
 class Suffixes(Enum):
     API_KEY = "api_key"
@@ -208,7 +232,8 @@ class AWSSecretManager(BaseSecretManager):
         """
         secret_id = self.get_secret_id(org_id, suffix)
         try:
-            return self.get_client().get_secret_value(SecretId=secret_id)
+            with wca_secret_manager_hist.time():
+                return self.get_client().get_secret_value(SecretId=secret_id)
         except self.get_client().exceptions.ResourceNotFoundException:
             logger.info("No Secret exists for org with id '%s' and suffix '%s'.", org_id, suffix)
             return None
@@ -221,3 +246,94 @@ class AWSSecretManager(BaseSecretManager):
         Returns True if a Secret exists for the given org_id and suffix.
         """
         return self.get_secret(org_id, suffix) is not None
+
+
+def _version_key(org_id) -> str:
+    return f"wca_secret_version_{org_id}"
+
+
+def invalidate_cached_secrets(org_id) -> None:
+    """Drop the Secrets of an organization cached by the CachingSecretManager of any process."""
+    ttl = max(settings.WCA_SECRET_MANAGER_CACHE_TTL, settings.WCA_SECRET_MANAGER_NEGATIVE_CACHE_TTL)
+    if ttl > 0 and org_id:
+        # The Secrets cached with another version are ignored, and none of them lives
+        # longer than the TTL.
+        try:
+            cache.set(_version_key(org_id), uuid.uuid4().hex, ttl)
+        except Exception:
+            logger.exception("Failed to invalidate the cached Secrets of org_id '%s'", org_id)
+
+
+class CachedSecret(NamedTuple):
+    secret: Optional[dict[str, Any]]
+    version: Optional[str]
+    expires_at: float
+
+
+class CachingSecretManager(BaseSecretManager):
+    """
+    Keeps the Secrets read from another BaseSecretManager in memory for a short time.
+    Orgs without a Secret are remembered too, for `negative_ttl` seconds.
+    Each Secret is served only while the version of its organization in the shared
+    cache is the one read before the Secret was, the version changes when a Secret
+    of the organization is saved or deleted, in any process.
+    """
+
+    def __init__(self, secret_manager: BaseSecretManager, ttl: int, negative_ttl: int):
+        self.secret_manager = secret_manager
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._secrets: dict[tuple[int, Suffixes], CachedSecret] = {}
+
+    def save_secret(self, org_id: int, suffix: Suffixes, secret):
+        try:
+            return self.secret_manager.save_secret(org_id, suffix, secret)
+        finally:
+            self.invalidate(org_id, suffix)
+
+    def delete_secret(self, org_id: int, suffix: Suffixes) -> None:
+        try:
+            self.secret_manager.delete_secret(org_id, suffix)
+        finally:
+            self.invalidate(org_id, suffix)
+
+    def get_secret(self, org_id: int, suffix: Suffixes) -> Optional[dict[str, Any]]:
+        key = (org_id, suffix)
+        now = time.monotonic()
+        try:
+            version = cache.get(_version_key(org_id))
+        except Exception:
+            # Without the version, a cached Secret may be stale
+            logger.exception("Failed to read the version of the Secrets of org_id '%s'", org_id)
+            wca_secret_manager_cache_miss_counter.labels(suffix=suffix.value).inc()
+            return self.secret_manager.get_secret(org_id, suffix)
+
+        with self._lock:
+            cached = self._secrets.get(key)
+        if cached and now < cached.expires_at and cached.version == version:
+            wca_secret_manager_cache_hit_counter.labels(suffix=suffix.value).inc()
+            return cached.secret
+
+        wca_secret_manager_cache_miss_counter.labels(suffix=suffix.value).inc()
+        # Errors are not cached, the next call will try again.
+        secret = self.secret_manager.get_secret(org_id, suffix)
+        ttl = self.ttl if secret is not None else self.negative_ttl
+        with self._lock:
+            self._evict_expired(now)
+            # Stored with the version read before the Secret: an invalidation made
+            # while it was read makes it stale.
+            self._secrets[key] = CachedSecret(secret, version, now + ttl)
+        return secret
+
+    def secret_exists(self, org_id: int, suffix: Suffixes) -> bool:
+        return self.get_secret(org_id, suffix) is not None
+
+    def invalidate(self, org_id: int, suffix: Suffixes) -> None:
+        with self._lock:
+            self._secrets.pop((org_id, suffix), None)
+        invalidate_cached_secrets(org_id)
+
+    def _evict_expired(self, now: float) -> None:
+        for key in [k for k, v in self._secrets.items() if v.expires_at <= now]:
+            del self._secrets[key]
@@ -91,6 +91,11 @@ class ModelTimeoutException(WisdomEmptyResponse):
     default_detail = "An timeout occurred attempting to complete the request."
 
 
+class RequestDeadlineExceededException(ModelTimeoutException):
+    default_code = "error__request_deadline_exceeded"
+    default_detail = "The request could not be completed in the allotted time."
+
+
 class WcaBadRequestException(WisdomEmptyResponse):
     default_code = "error__wca_bad_request"
     default_detail = "WCA returned a bad request response."
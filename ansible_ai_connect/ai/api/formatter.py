@@ -12,16 +12,58 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import copy
 import logging
 import re
+import threading
 from io import StringIO
+from typing import Callable, Optional
 
 import yaml
 from ansible.playbook.task import Task
+from django.conf import settings
 from ruamel.yaml import YAML, scalarstring
 
+from ansible_ai_connect.ai.api.utils.documents import SafeLoader, load_yaml
+from ansible_ai_connect.ai.api.utils.postprocess_cache import (
+    PostProcessCache,
+    cache_key,
+)
+
 logger = logging.getLogger(__name__)
 
+# The normalized prompts and suggestions, and the indented suggestions, keyed by the
+# digest of the text: they come back while the same playbook is edited.
+_caches: dict[str, Optional[PostProcessCache]] = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(name: str) -> Optional[PostProcessCache]:
+    with _caches_lock:
+        if name not in _caches:
+            max_bytes = settings.ANSIBLE_AI_FORMATTER_CACHE_MAX_BYTES
+            _caches[name] = PostProcessCache(name, max_bytes) if max_bytes else None
+        return _caches[name]
+
+
+def clear_caches() -> None:
+    with _caches_lock:
+        _caches.clear()
+
+
+def _cached(name: str, function: Callable[[str], Optional[str]], text: str) -> Optional[str]:
+    cache = _get_cache(name)
+    if cache is None:
+        return function(text)
+    key = cache_key(text)
+    result = cache.get(key)
+    if result is None:
+        result = function(text)
+        if result is not None:
+            cache.set(key, result)
+    return result
+
+
 """
 The code below causes any yaml.dump calls to dump None
 as blank rather than "null"
@@ -94,12 +136,29 @@ Normalize by loading and re-serializing
 """
 
 
-def normalize_yaml(yaml_str, ansible_file_type="playbook", additional_context=None):
-    data = yaml.load(yaml_str, Loader=yaml.SafeLoader)
+def normalize_yaml(yaml_str, ansible_file_type="playbook", additional_context=None, cached=True):
+    if not additional_context:
+        if cached:
+            return _cached("formatter_normalize", _normalize_yaml, yaml_str)
+        return _normalize_yaml(yaml_str)
+    data = load_yaml(yaml_str)
     if data is None:
         return None
-    if additional_context:
-        expand_vars_files(data, ansible_file_type, additional_context)
+    # The loaded document is shared, the variables are expanded in a copy
+    data = copy.deepcopy(data)
+    expand_vars_files(data, ansible_file_type, additional_context)
+    return _dump_yaml(data)
+
+
+def _normalize_yaml(yaml_str):
+    data = load_yaml(yaml_str)
+    if data is None:
+        return None
+    return _dump_yaml(data)
+
+
+def _dump_yaml(data):
+    # The C emitter cannot be used, AnsibleDumper customizes the Python one
     return yaml.dump(data, Dumper=AnsibleDumper, allow_unicode=True, sort_keys=False, width=10000)
 
 
@@ -107,7 +166,7 @@ def load_and_merge_vars_in_context(vars_in_context):
     merged_vars = {}
     for v in vars_in_context:
         # Merge the vars element and the dict loaded from a vars string
-        merged_vars |= yaml.load(v, Loader=yaml.SafeLoader)
+        merged_vars |= yaml.load(v, Loader=SafeLoader)
     return merged_vars
 
 
@@ -190,7 +249,10 @@ def preprocess(
     """
     Add a newline between the input context and prompt in case context doesn't end with one
     """
-    formatted = normalize_yaml(f"{context}\n{prompt}", ansible_file_type, additional_context)
+    # The whole content of the editor is not cached, it changes with every keystroke
+    formatted = normalize_yaml(
+        f"{context}\n{prompt}", ansible_file_type, additional_context, cached=False
+    )
 
     if formatted is not None:
         logger.debug(f"initial user input {context}\n{prompt}")
@@ -248,13 +310,29 @@ def handle_jinja2_variable_quotes(obj):
     return obj
 
 
+# ruamel YAML instances are reusable but not thread safe, each thread configures its own
+_indentation_yaml = threading.local()
+
+
+def _get_indentation_yaml():
+    yaml_obj = getattr(_indentation_yaml, "yaml_obj", None)
+    if yaml_obj is None:
+        yaml_obj = YAML()
+        yaml_obj.allow_duplicate_keys = True
+        yaml_obj.indent(offset=2, sequence=4)
+        _indentation_yaml.yaml_obj = yaml_obj
+    return yaml_obj
+
+
 def adjust_indentation(yaml):
+    return _cached("formatter_indentation", _adjust_indentation, yaml)
+
+
+def _adjust_indentation(yaml):
     output = yaml
     stream = StringIO()
     with stream as fp:
-        yaml_obj = YAML()
-        yaml_obj.allow_duplicate_keys = True
-        yaml_obj.indent(offset=2, sequence=4)
+        yaml_obj = _get_indentation_yaml()
         loaded_data = yaml_obj.load(output)
         loaded_data = handle_jinja2_variable_quotes(loaded_data)
         yaml_obj.dump(loaded_data, fp)
@@ -354,7 +432,7 @@ def get_task_names_from_prompt(prompt):
 
 
 def get_task_names_from_tasks(tasks):
-    task_list = yaml.load(tasks, Loader=yaml.SafeLoader)
+    task_list = load_yaml(tasks)
     if (
         not isinstance(task_list, list)
         or not isinstance(task_list[0], dict)
@@ -0,0 +1,137 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import logging
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.structures import CaseInsensitiveDict
+
+from ansible_ai_connect.main.circuit_breaker import (
+    get_circuit_breaker,
+    is_failure_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSession:
+    """
+    Minimal asyncio counterpart of requests.Session backed by a pooled aiohttp session.
+
+    One aiohttp.ClientSession, and so one connection pool, is kept per event loop.
+    Responses are returned as requests.Response and transport errors are raised as
+    their requests counterparts, so the synchronous response checks and error
+    handling of the model clients apply unchanged to the asynchronous code paths.
+    """
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None):
+        self._limit = settings.ANSIBLE_AI_MODEL_MESH_ASYNC_POOL_SIZE if limit is None else limit
+        self._limit_per_host = (
+            settings.ANSIBLE_AI_MODEL_MESH_ASYNC_POOL_SIZE_PER_HOST
+            if limit_per_host is None
+            else limit_per_host
+        )
+        self._circuit_breaker = settings.UPSTREAM_CIRCUIT_BREAKER_ENABLED
+        self._sessions: WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession] = (
+            WeakKeyDictionary()
+        )
+
+    def get_client_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict[str, Optional[str]]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        # requests drops headers set to None, aiohttp rejects them
+        headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        circuit_breaker = get_circuit_breaker(url) if self._circuit_breaker else None
+        if circuit_breaker:
+            circuit_breaker.before_call()
+        try:
+            response = await self._request(method, url, headers, json, data, timeout)
+        except asyncio.CancelledError:
+            # Cancelled by the caller, e.g. a hedged request that lost
+            if circuit_breaker:
+                circuit_breaker.release()
+            raise
+        except Exception:
+            if circuit_breaker:
+                circuit_breaker.record_failure()
+            raise
+        if circuit_breaker:
+            if is_failure_response(response.status_code):
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        json: Any,
+        data: Any,
+        timeout: Optional[float],
+    ) -> requests.Response:
+        try:
+            async with self.get_client_session().request(
+                method,
+                url,
+                headers=headers,
+                json=json,
+                data=data,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as result:
+                content = await result.read()
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.ReadTimeout(f"Request to {url} timed out") from e
+        except aiohttp.ClientConnectionError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+
+        response = requests.Response()
+        response.status_code = result.status
+        response.reason = result.reason or ""
+        response.headers = CaseInsensitiveDict(result.headers)
+        response.url = str(result.url)
+        response._content = content
+        return response
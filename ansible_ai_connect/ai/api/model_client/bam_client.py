@@ -22,6 +22,8 @@ from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.language_models.chat_models import SimpleChatModel
 from langchain_core.messages import BaseMessage
 
+from ansible_ai_connect.main.upstream import new_upstream_session
+
 from .langchain import LangChainClient
 
 logger = logging.getLogger(__name__)
@@ -32,6 +34,7 @@ class ChatBAM(SimpleChatModel):
     model_id: str
     prediction_url: str
     timeout: Callable[[int], Union[int, None]]
+    session: Any = None
 
     @property
     def _llm_type(self) -> str:
@@ -50,7 +53,7 @@ class ChatBAM(SimpleChatModel):
         bam_messages = list(
             map(lambda x: {"role": x.additional_kwargs["role"], "content": x.content}, messages)
         )
-        session = requests.Session()
+        session = self.session or requests.Session()
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
@@ -84,10 +87,15 @@ class ChatBAM(SimpleChatModel):
 
 
 class BAMClient(LangChainClient):
+    def __init__(self, inference_url):
+        super().__init__(inference_url=inference_url)
+        self.session = new_upstream_session()
+
     def get_chat_model(self, model_id):
         return ChatBAM(
             api_key=settings.ANSIBLE_AI_MODEL_MESH_API_KEY,
             model_id=model_id,
             prediction_url=f"{self._inference_url}/v2/text/chat?version=2024-01-10",
             timeout=self.timeout,
+            session=self.session,
         )
@@ -13,10 +13,12 @@
 #  limitations under the License.
 
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Generator, Optional
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
+from ansible_ai_connect.ai.api.utils.deadline import get_deadline
 from ansible_ai_connect.healthcheck.backends import (
     MODEL_MESH_HEALTH_CHECK_MODELS,
     MODEL_MESH_HEALTH_CHECK_PROVIDER,
@@ -42,6 +44,20 @@ class ModelMeshClient:
     def codematch(self, request, model_input, model_id):
         raise NotImplementedError
 
+    # Asynchronous variants of the model API. Clients without a native asyncio
+    # transport run the blocking implementation in a worker thread.
+    async def ainfer(
+        self, request, model_input, model_id: str = "", suggestion_id=None
+    ) -> Dict[str, Any]:
+        return await sync_to_async(self.infer, thread_sensitive=False)(
+            request, model_input, model_id=model_id, suggestion_id=suggestion_id
+        )
+
+    async def acodematch(self, request, model_input, model_id):
+        return await sync_to_async(self.codematch, thread_sensitive=False)(
+            request, model_input, model_id
+        )
+
     def set_inference_url(self, inference_url):
         self._inference_url = inference_url
 
@@ -54,7 +70,9 @@ class ModelMeshClient:
         return requested_model_id or settings.ANSIBLE_AI_MODEL_MESH_MODEL_ID
 
     def timeout(self, task_count=1):
-        return self._timeout * task_count if self._timeout else None
+        timeout = self._timeout * task_count if self._timeout else None
+        # Never wait past the deadline of the request being processed
+        return get_deadline().timeout(timeout, "inference")
 
     def get_chat_model(self, model_id):
         raise NotImplementedError
@@ -72,6 +90,55 @@ class ModelMeshClient:
     def explain_playbook(self, request, content, explanation_id: str = "") -> str:
         raise NotImplementedError
 
+    async def agenerate_playbook(
+        self,
+        request,
+        text: str = "",
+        create_outline: bool = False,
+        outline: str = "",
+        generation_id: str = "",
+    ) -> tuple[str, str]:
+        return await sync_to_async(self.generate_playbook, thread_sensitive=False)(
+            request,
+            text=text,
+            create_outline=create_outline,
+            outline=outline,
+            generation_id=generation_id,
+        )
+
+    async def aexplain_playbook(self, request, content, explanation_id: str = "") -> str:
+        return await sync_to_async(self.explain_playbook, thread_sensitive=False)(
+            request, content, explanation_id=explanation_id
+        )
+
+    # Streaming variants of the playbook generation and explanation. They yield the
+    # text as the model produces it and return the same value as the blocking
+    # methods. Clients without a streaming API yield the whole answer at once.
+    def stream_playbook(
+        self,
+        request,
+        text: str = "",
+        create_outline: bool = False,
+        outline: str = "",
+        generation_id: str = "",
+    ) -> Generator[str, None, tuple[str, str]]:
+        playbook, outline = self.generate_playbook(
+            request,
+            text=text,
+            create_outline=create_outline,
+            outline=outline,
+            generation_id=generation_id,
+        )
+        yield playbook
+        return playbook, outline
+
+    def stream_explanation(
+        self, request, content, explanation_id: str = ""
+    ) -> Generator[str, None, str]:
+        explanation = self.explain_playbook(request, content, explanation_id=explanation_id)
+        yield explanation
+        return explanation
+
     def self_test(self) -> HealthCheckSummary:
         """
         Check the health of the model service.
@@ -12,6 +12,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import asyncio
 import json
 import logging
 import secrets
@@ -77,11 +78,25 @@ class DummyClient(ModelMeshClient):
     def infer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
         logger.debug("!!!! settings.ANSIBLE_AI_MODEL_MESH_API_TYPE == 'dummy' !!!!")
         logger.debug("!!!! Mocking Model response !!!!")
+        time.sleep(self.get_latency())
+        return self.get_response_body()
+
+    async def ainfer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
+        logger.debug("!!!! settings.ANSIBLE_AI_MODEL_MESH_API_TYPE == 'dummy' !!!!")
+        logger.debug("!!!! Mocking Model response !!!!")
+        await asyncio.sleep(self.get_latency())
+        return self.get_response_body()
+
+    @staticmethod
+    def get_latency() -> float:
         if settings.DUMMY_MODEL_RESPONSE_LATENCY_USE_JITTER:
             jitter: float = secrets.randbelow(1000) * 0.001
         else:
             jitter: float = 0.001
-        time.sleep(settings.DUMMY_MODEL_RESPONSE_MAX_LATENCY_MSEC * jitter)
+        return settings.DUMMY_MODEL_RESPONSE_MAX_LATENCY_MSEC * jitter
+
+    @staticmethod
+    def get_response_body() -> Dict[str, Any]:
         response_body = json.loads(settings.DUMMY_MODEL_RESPONSE_BODY)
         response_body["model_id"] = "_"
         return response_body
@@ -23,6 +23,11 @@ class ModelTimeoutError(Exception):
     model_id: str = ""
 
 
+@dataclass
+class DeadlineExceeded(ModelTimeoutError):
+    """The request deadline expired before the prediction could be provided."""
+
+
 @dataclass
 class WcaException(Exception):
     """Base WCA Exception"""
@@ -12,8 +12,10 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import asyncio
 import logging
 from typing import Any, Dict
+from weakref import WeakKeyDictionary
 
 import grpc
 import requests
@@ -40,6 +42,10 @@ class GrpcClient(ModelMeshClient):
     def __init__(self, inference_url):
         super().__init__(inference_url=inference_url)
         self._inference_stub = self.get_inference_stub()
+        # grpc.aio channels are bound to the event loop they were created in
+        self._async_inference_stubs: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, wisdomextservice_pb2_grpc.WisdomExtServiceStub
+        ] = WeakKeyDictionary()
 
     def get_inference_stub(self) -> wisdomextservice_pb2_grpc.WisdomExtServiceStub:
         logger.debug("Inference URL: " + self._inference_url)
@@ -48,9 +54,19 @@ class GrpcClient(ModelMeshClient):
         logger.debug("Inference Stub: " + str(stub))
         return stub
 
+    def get_async_inference_stub(self) -> wisdomextservice_pb2_grpc.WisdomExtServiceStub:
+        loop = asyncio.get_running_loop()
+        stub = self._async_inference_stubs.get(loop)
+        if stub is None:
+            channel = grpc.aio.insecure_channel(self._inference_url)
+            stub = wisdomextservice_pb2_grpc.WisdomExtServiceStub(channel)
+            self._async_inference_stubs[loop] = stub
+        return stub
+
     def set_inference_url(self, inference_url):
         super().set_inference_url(inference_url=inference_url)
         self._inference_stub = self.get_inference_stub()
+        self._async_inference_stubs.clear()
 
     def infer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
         model_id = self.get_model_id(request.user, None, model_id)
@@ -81,6 +97,32 @@ class GrpcClient(ModelMeshClient):
                 logger.error(f"gRPC client error: {exc.details()}")  # type: ignore
                 raise
 
+    async def ainfer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
+        model_id = self.get_model_id(request.user, None, model_id)
+        logger.debug(f"Input prompt: {model_input}")
+        prompt = model_input.get("instances", [{}])[0].get("prompt", "")
+        context = model_input.get("instances", [{}])[0].get("context", "")
+
+        try:
+            task_count = len(get_task_names_from_prompt(prompt))
+            response = await self.get_async_inference_stub().AnsiblePredict(
+                request=ansiblerequest_pb2.AnsibleRequest(  # type: ignore
+                    prompt=prompt, context=context
+                ),
+                metadata=[("mm-vmodel-id", model_id)],
+                timeout=self.timeout(task_count),
+            )
+
+            logger.debug(f"inference response: {response.text}")
+            result: Dict[str, Any] = {"predictions": [response.text], "model_id": model_id}
+            return result
+        except grpc.RpcError as exc:
+            if exc.code() == grpc.StatusCode.DEADLINE_EXCEEDED:  # type: ignore
+                raise ModelTimeoutError
+            else:
+                logger.error(f"gRPC client error: {exc.details()}")  # type: ignore
+                raise
+
     def self_test(self) -> HealthCheckSummary:
         url = f"{settings.ANSIBLE_GRPC_HEALTHCHECK_URL}/oauth/healthz"
         summary: HealthCheckSummary = HealthCheckSummary(
@@ -28,7 +28,9 @@ from ansible_ai_connect.healthcheck.backends import (
     HealthCheckSummary,
     HealthCheckSummaryException,
 )
+from ansible_ai_connect.main.upstream import new_upstream_session
 
+from .async_session import AsyncSession
 from .base import ModelMeshClient
 from .exceptions import ModelTimeoutError
 
@@ -38,7 +40,8 @@ logger = logging.getLogger(__name__)
 class HttpClient(ModelMeshClient):
     def __init__(self, inference_url):
         super().__init__(inference_url=inference_url)
-        self.session = requests.Session()
+        self.session = new_upstream_session()
+        self.async_session = AsyncSession()
         self.headers = {"Content-Type": "application/json"}
 
     def infer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
@@ -62,6 +65,27 @@ class HttpClient(ModelMeshClient):
         except requests.exceptions.Timeout:
             raise ModelTimeoutError
 
+    async def ainfer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
+        model_id = self.get_model_id(request.user, None, model_id)
+        prediction_url = f"{self._inference_url}/predictions/{model_id}"
+
+        prompt = model_input.get("instances", [{}])[0].get("prompt", "")
+
+        try:
+            task_count = len(get_task_names_from_prompt(prompt))
+            result = await self.async_session.post(
+                prediction_url,
+                headers=self.headers,
+                json=model_input,
+                timeout=self.timeout(task_count),
+            )
+            result.raise_for_status()
+            response = json.loads(result.text)
+            response["model_id"] = model_id
+            return response
+        except requests.exceptions.Timeout:
+            raise ModelTimeoutError
+
     def self_test(self) -> HealthCheckSummary:
         url = f"{self._inference_url}/ping"
         summary: HealthCheckSummary = HealthCheckSummary(
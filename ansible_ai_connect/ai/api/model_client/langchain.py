@@ -16,7 +16,7 @@
 
 import re
 from textwrap import dedent
-from typing import Any, Dict
+from typing import Any, Dict, Generator
 
 import requests
 from langchain_core.messages import BaseMessage
@@ -63,6 +63,15 @@ def unwrap_playbook_answer(message: str | BaseMessage) -> tuple[str, str]:
         return "", ""
 
 
+def get_chunk_text(chunk: str | BaseMessage) -> str:
+    if isinstance(chunk, BaseMessage):
+        if isinstance(chunk.content, str):
+            return chunk.content
+        return "".join(c for c in chunk.content if isinstance(c, str))
+    # Ollama currently streams plain strings
+    return chunk
+
+
 def unwrap_task_answer(message: str | BaseMessage) -> str:
     task: str = ""
     if isinstance(message, BaseMessage):
@@ -92,7 +101,31 @@ class LangChainClient(ModelMeshClient):
 
     def infer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
         model_id = self.get_model_id(request.user, None, model_id)
+        chain, chain_input = self.get_infer_chain(model_input, model_id)
+
+        try:
+            message = chain.invoke(chain_input)
+            response = {"predictions": [unwrap_task_answer(message)], "model_id": model_id}
+
+            return response
+
+        except requests.exceptions.Timeout:
+            raise ModelTimeoutError
+
+    async def ainfer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
+        model_id = self.get_model_id(request.user, None, model_id)
+        chain, chain_input = self.get_infer_chain(model_input, model_id)
+
+        try:
+            message = await chain.ainvoke(chain_input)
+            response = {"predictions": [unwrap_task_answer(message)], "model_id": model_id}
+
+            return response
+
+        except requests.exceptions.Timeout:
+            raise ModelTimeoutError
 
+    def get_infer_chain(self, model_input, model_id):
         prompt = model_input.get("instances", [{}])[0].get("prompt", "")
         context = model_input.get("instances", [{}])[0].get("context", "")
 
@@ -110,17 +143,27 @@ class LangChainClient(ModelMeshClient):
             ]
         )
 
-        try:
-            chain = chat_template | llm
-            message = chain.invoke({"prompt": full_prompt})
-            response = {"predictions": [unwrap_task_answer(message)], "model_id": model_id}
+        chain = chat_template | llm
+        return chain, {"prompt": full_prompt}
 
-            return response
+    def generate_playbook(
+        self,
+        request,
+        text: str = "",
+        create_outline: bool = False,
+        outline: str = "",
+        generation_id: str = "",
+    ) -> tuple[str, str]:
+        chain = self.get_generate_playbook_chain(request, create_outline, outline)
+        output = chain.invoke({"text": text, "outline": outline})
+        playbook, outline = unwrap_playbook_answer(output)
 
-        except requests.exceptions.Timeout:
-            raise ModelTimeoutError
+        if not create_outline:
+            outline = ""
 
-    def generate_playbook(
+        return playbook, outline
+
+    async def agenerate_playbook(
         self,
         request,
         text: str = "",
@@ -128,6 +171,37 @@ class LangChainClient(ModelMeshClient):
         outline: str = "",
         generation_id: str = "",
     ) -> tuple[str, str]:
+        chain = self.get_generate_playbook_chain(request, create_outline, outline)
+        output = await chain.ainvoke({"text": text, "outline": outline})
+        playbook, outline = unwrap_playbook_answer(output)
+
+        if not create_outline:
+            outline = ""
+
+        return playbook, outline
+
+    def stream_playbook(
+        self,
+        request,
+        text: str = "",
+        create_outline: bool = False,
+        outline: str = "",
+        generation_id: str = "",
+    ) -> Generator[str, None, tuple[str, str]]:
+        chain = self.get_generate_playbook_chain(request, create_outline, outline)
+        answer = ""
+        for chunk in chain.stream({"text": text, "outline": outline}):
+            chunk = get_chunk_text(chunk)
+            answer += chunk
+            yield chunk
+        playbook, outline = unwrap_playbook_answer(answer)
+
+        if not create_outline:
+            outline = ""
+
+        return playbook, outline
+
+    def get_generate_playbook_chain(self, request, create_outline: bool, outline: str):
         SYSTEM_MESSAGE_TEMPLATE = """
         You are an Ansible expert.
         Your role is to help Ansible developers write playbooks.
@@ -155,9 +229,6 @@ class LangChainClient(ModelMeshClient):
             SYSTEM_MESSAGE_TEMPLATE_WITH_OUTLINE if create_outline else SYSTEM_MESSAGE_TEMPLATE
         )
         human_template = HUMAN_MESSAGE_TEMPLATE_WITH_OUTLINE if outline else HUMAN_MESSAGE_TEMPLATE
-        from ansible_ai_connect.ai.api.model_client.langchain import (
-            unwrap_playbook_answer,
-        )
 
         model_id = self.get_model_id(request.user, None, "")
         llm = self.get_chat_model(model_id)
@@ -174,16 +245,30 @@ class LangChainClient(ModelMeshClient):
             ]
         )
 
-        chain = chat_template | llm
-        output = chain.invoke({"text": text, "outline": outline})
-        playbook, outline = unwrap_playbook_answer(output)
+        return chat_template | llm
 
-        if not create_outline:
-            outline = ""
+    def explain_playbook(self, request, content, explanation_id: str = "") -> str:
+        chain = self.get_explain_playbook_chain(request)
+        explanation = chain.invoke({"playbook": content})
+        return explanation
 
-        return playbook, outline
+    async def aexplain_playbook(self, request, content, explanation_id: str = "") -> str:
+        chain = self.get_explain_playbook_chain(request)
+        explanation = await chain.ainvoke({"playbook": content})
+        return explanation
 
-    def explain_playbook(self, request, content, explanation_id: str = "") -> str:
+    def stream_explanation(
+        self, request, content, explanation_id: str = ""
+    ) -> Generator[str, None, str]:
+        chain = self.get_explain_playbook_chain(request)
+        explanation = ""
+        for chunk in chain.stream({"playbook": content}):
+            chunk = get_chunk_text(chunk)
+            explanation += chunk
+            yield chunk
+        return explanation
+
+    def get_explain_playbook_chain(self, request):
         SYSTEM_MESSAGE_TEMPLATE = """
         You're an Ansible expert.
         You format your output with Markdown.
@@ -215,6 +300,4 @@ class LangChainClient(ModelMeshClient):
             ]
         )
 
-        chain = chat_template | llm
-        explanation = chain.invoke({"playbook": content})
-        return explanation
+        return chat_template | llm
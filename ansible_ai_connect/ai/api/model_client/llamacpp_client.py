@@ -19,7 +19,9 @@ from typing import Any, Dict
 import requests
 
 from ansible_ai_connect.ai.api.formatter import get_task_names_from_prompt
+from ansible_ai_connect.main.upstream import new_upstream_session
 
+from .async_session import AsyncSession
 from .base import ModelMeshClient
 from .exceptions import ModelTimeoutError
 
@@ -29,13 +31,51 @@ logger = logging.getLogger(__name__)
 class LlamaCPPClient(ModelMeshClient):
     def __init__(self, inference_url):
         super().__init__(inference_url=inference_url)
-        self.session = requests.Session()
+        self.session = new_upstream_session()
+        self.async_session = AsyncSession()
         self.headers = {"Content-Type": "application/json"}
 
     def infer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
         model_id = self.get_model_id(request.user, None, model_id)
         self._prediction_url = f"{self._inference_url}/completion"
 
+        prompt = model_input.get("instances", [{}])[0].get("prompt", "")
+        params = self.get_params(model_input, model_id)
+
+        try:
+            # TODO(rg): implement multitask here with a loop
+            task_count = len(get_task_names_from_prompt(prompt))
+            result = self.session.post(
+                self._prediction_url,
+                headers=self.headers,
+                json=params,
+                timeout=self.timeout(task_count),
+            )
+            return self.get_response(result)
+        except requests.exceptions.Timeout:
+            raise ModelTimeoutError
+
+    async def ainfer(self, request, model_input, model_id="", suggestion_id=None) -> Dict[str, Any]:
+        model_id = self.get_model_id(request.user, None, model_id)
+        prediction_url = f"{self._inference_url}/completion"
+
+        prompt = model_input.get("instances", [{}])[0].get("prompt", "")
+        params = self.get_params(model_input, model_id)
+
+        try:
+            task_count = len(get_task_names_from_prompt(prompt))
+            result = await self.async_session.post(
+                prediction_url,
+                headers=self.headers,
+                json=params,
+                timeout=self.timeout(task_count),
+            )
+            return self.get_response(result)
+        except requests.exceptions.Timeout:
+            raise ModelTimeoutError
+
+    @staticmethod
+    def get_params(model_input, model_id) -> Dict[str, Any]:
         prompt = model_input.get("instances", [{}])[0].get("prompt", "")
         context = model_input.get("instances", [{}])[0].get("context", "")
 
@@ -71,25 +111,15 @@ class LlamaCPPClient(ModelMeshClient):
         }
 
         logger.info(f"request: {params}")
+        return params
 
-        try:
-            # TODO(rg): implement multitask here with a loop
-            task_count = len(get_task_names_from_prompt(prompt))
-            result = self.session.post(
-                self._prediction_url,
-                headers=self.headers,
-                json=params,
-                timeout=self.timeout(task_count),
-            )
-            result.raise_for_status()
-            body = json.loads(result.text)
-            logger.info(f"response: {body}")
-            task = body["content"]
-            # TODO(rg): fragile and not always correct; remove when we've created a better tune
-            task = task.split("- name:")[0]
-            task = task.split("```")[0]
-            response = {"predictions": [task], "model_id": body["model"]}
-
-            return response
-        except requests.exceptions.Timeout:
-            raise ModelTimeoutError
+    @staticmethod
+    def get_response(result) -> Dict[str, Any]:
+        result.raise_for_status()
+        body = json.loads(result.text)
+        logger.info(f"response: {body}")
+        task = body["content"]
+        # TODO(rg): fragile and not always correct; remove when we've created a better tune
+        task = task.split("- name:")[0]
+        task = task.split("```")[0]
+        return {"predictions": [task], "model_id": body["model"]}
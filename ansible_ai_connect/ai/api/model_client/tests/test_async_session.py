@@ -0,0 +1,96 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.test import override_settings
+
+from ansible_ai_connect.ai.api.model_client.async_session import AsyncSession
+from ansible_ai_connect.main.circuit_breaker import (
+    CircuitBreakerOpen,
+    reset_circuit_breakers,
+)
+
+
+async def echo(request):
+    body = await request.json()
+    return web.json_response(
+        {"body": body, "headers": dict(request.headers)},
+        status=int(request.query.get("status", 200)),
+        headers={"X-Request-ID": "an-id"},
+    )
+
+
+async def slow(request):
+    await asyncio.sleep(1)
+    return web.json_response({})
+
+
+class TestAsyncSession(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app = web.Application()
+        app.router.add_post("/echo", echo)
+        app.router.add_post("/slow", slow)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = AsyncSession(limit=10, limit_per_host=0)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_post(self):
+        response = await self.session.post(
+            str(self.server.make_url("/echo")),
+            headers={"Content-Type": "application/json", "X-Dropped": None},
+            json={"prompt": "- name: foo"},
+        )
+        self.assertIsInstance(response, requests.Response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["x-request-id"], "an-id")
+        self.assertEqual(response.json()["body"], {"prompt": "- name: foo"})
+        self.assertNotIn("X-Dropped", response.json()["headers"])
+
+    async def test_post_http_error(self):
+        response = await self.session.post(str(self.server.make_url("/echo?status=503")), json={})
+        with self.assertRaises(requests.exceptions.HTTPError):
+            response.raise_for_status()
+
+    async def test_post_timeout(self):
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            await self.session.post(str(self.server.make_url("/slow")), json={}, timeout=0.1)
+
+    async def test_post_connection_error(self):
+        url = str(self.server.make_url("/echo"))
+        await self.server.close()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            await self.session.post(url, json={})
+
+    async def test_session_is_reused(self):
+        self.assertIs(self.session.get_client_session(), self.session.get_client_session())
+
+    async def test_circuit_breaker(self):
+        self.addCleanup(reset_circuit_breakers)
+        url = str(self.server.make_url("/echo?status=503"))
+        with override_settings(UPSTREAM_CIRCUIT_BREAKER_FAILURE_THRESHOLD=2):
+            reset_circuit_breakers()
+            for _ in range(2):
+                response = await self.session.post(url, json={})
+                self.assertEqual(response.status_code, 503)
+            with self.assertRaises(CircuitBreakerOpen):
+                await self.session.post(url, json={})
@@ -4,7 +4,7 @@ from textwrap import dedent
 from unittest.mock import Mock
 
 from django.test import TestCase
-from langchain.llms.fake import FakeListLLM
+from langchain.llms.fake import FakeListLLM, FakeStreamingListLLM
 from langchain_core.messages.base import BaseMessage
 
 from ansible_ai_connect.ai.api.model_client.langchain import (
@@ -134,3 +134,40 @@ class TestLangChainClient(TestCase):
     def test_explain_playbook(self):
         explanation = self.my_client.explain_playbook(request=Mock(), content="foo")
         self.assertTrue(explanation)
+
+
+class TestLangChainClientStreaming(TestCase):
+    def setUp(self):
+        self.my_client = LangChainClient("a")
+
+        def fake_get_chat_mode(self, model_id=None):
+            return FakeStreamingListLLM(responses=["\n```\nmy_playbook```\nmy outline\n\n"])
+
+        self.my_client.get_chat_model = fake_get_chat_mode
+
+    def consume(self, stream):
+        chunks = []
+        try:
+            while True:
+                chunks.append(next(stream))
+        except StopIteration as e:
+            return chunks, e.value
+
+    def test_stream_playbook(self):
+        chunks, result = self.consume(
+            self.my_client.stream_playbook(request=Mock(), text="foo", create_outline=True)
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), "\n```\nmy_playbook```\nmy outline\n\n")
+        self.assertEqual(result, ("my_playbook", "my outline"))
+
+    def test_stream_playbook_without_outline(self):
+        _, result = self.consume(self.my_client.stream_playbook(request=Mock(), text="foo"))
+        self.assertEqual(result, ("my_playbook", ""))
+
+    def test_stream_explanation(self):
+        chunks, result = self.consume(
+            self.my_client.stream_explanation(request=Mock(), content="foo")
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), result)
@@ -14,14 +14,16 @@
 
 import base64
 import json as JSON
+import threading
 import uuid
 from datetime import datetime
 from functools import wraps
 from http import HTTPStatus
-from unittest.mock import ANY, Mock, patch
+from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import django.utils.timezone
 import requests
+from asgiref.sync import async_to_sync
 from django.contrib.auth.models import Group
 from django.test import TestCase, override_settings
 from prometheus_client import Counter, Histogram
@@ -35,6 +37,7 @@ from ansible_ai_connect.ai.api.aws.wca_secret_manager import (
     WcaSecretManagerError,
 )
 from ansible_ai_connect.ai.api.model_client.exceptions import (
+    DeadlineExceeded,
     ModelTimeoutError,
     WcaBadRequest,
     WcaCodeMatchFailure,
@@ -62,6 +65,8 @@ from ansible_ai_connect.ai.api.model_client.wca_client import (
     wca_explain_playbook_hist,
     wca_explain_playbook_retry_counter,
 )
+from ansible_ai_connect.ai.api.model_client.wca_hedging import HEDGING_MIN_SAMPLES
+from ansible_ai_connect.main.circuit_breaker import CircuitBreakerOpen
 from ansible_ai_connect.test_utils import (
     WisdomAppsBackendMocking,
     WisdomServiceLogAwareTestCase,
@@ -249,6 +254,14 @@ class TestWCAClient(WisdomAppsBackendMocking, WisdomServiceLogAwareTestCase):
         b = WCAClient.fatal_exception(exc)
         self.assertTrue(b)
 
+        exc = CircuitBreakerOpen()
+        b = WCAClient.fatal_exception(exc)
+        self.assertTrue(b)
+
+        exc = DeadlineExceeded()
+        b = WCAClient.fatal_exception(exc)
+        self.assertTrue(b)
+
 
 @override_settings(ANSIBLE_AI_ENABLE_ONE_CLICK_DEFAULT_MODEL_ID="fancy-model")
 @override_settings(ANSIBLE_AI_ENABLE_ONE_CLICK_DEFAULT_API_KEY="and-my-key")
@@ -473,8 +486,26 @@ class TestWCACodegen(WisdomAppsBackendMocking, WisdomServiceLogAwareTestCase):
             headers=headers,
             data=data,
             auth=None,
+            timeout=None,
+        )
+
+    def test_get_token_is_cached(self):
+        response = MockResponse(
+            json={
+                "access_token": "access_token",
+                "token_type": "Bearer",
+                "expires_in": 3600,
+            },
+            status_code=200,
         )
 
+        model_client = WCAClient(inference_url="http://example.com/")
+        model_client.session.post = Mock(return_value=response)
+        token = model_client.get_token("abcdef")
+
+        self.assertEqual(model_client.get_token("abcdef"), token)
+        model_client.session.post.assert_called_once()
+
     @override_settings(ANSIBLE_WCA_IDP_URL="http://some-different-idp")
     @override_settings(ANSIBLE_WCA_IDP_LOGIN="jimmy")
     @override_settings(ANSIBLE_WCA_IDP_PASSWORD="jimmy")
@@ -491,6 +522,7 @@ class TestWCACodegen(WisdomAppsBackendMocking, WisdomServiceLogAwareTestCase):
             headers=ANY,
             data=ANY,
             auth=basic,
+            timeout=None,
         )
 
     @assert_call_count_metrics(metric=ibm_cloud_identity_token_hist)
@@ -507,6 +539,56 @@ class TestWCACodegen(WisdomAppsBackendMocking, WisdomServiceLogAwareTestCase):
             model_client.get_token("api-key")
             self.assertInLog("Caught retryable error after 1 tries.", log)
 
+    def _token_response(self, access_token):
+        return MockResponse(
+            json={"access_token": access_token, "expires_in": 3600}, status_code=200
+        )
+
+    def test_infer_renews_rejected_token(self):
+        predictions = {"predictions": ["      ansible.builtin.apt:\n        name: apache2"]}
+        model_client = WCAClient(inference_url="https://wca_api_url")
+        model_client.session.post = Mock(
+            side_effect=[
+                self._token_response("revoked"),
+                MockResponse(json={}, status_code=401),
+                self._token_response("renewed"),
+                MockResponse(
+                    json=predictions,
+                    status_code=200,
+                    headers={WCA_REQUEST_ID_HEADER: str(DEFAULT_REQUEST_ID)},
+                ),
+            ]
+        )
+
+        response = model_client.infer_from_parameters(
+            "org-api-key", "zavala", "", "- name: install ffmpeg on RHEL", DEFAULT_REQUEST_ID
+        )
+
+        self.assertEqual(response.json(), predictions)
+        codegen_call = model_client.session.post.call_args_list[3]
+        self.assertEqual(codegen_call.kwargs["headers"]["Authorization"], "Bearer renewed")
+        # The renewed token replaced the rejected one in the cache
+        self.assertEqual(model_client.get_token("org-api-key")["access_token"], "renewed")
+        self.assertEqual(model_client.session.post.call_count, 4)
+
+    def test_infer_rejected_token_is_renewed_once(self):
+        model_client = WCAClient(inference_url="https://wca_api_url")
+        model_client.session.post = Mock(
+            side_effect=[
+                self._token_response("revoked"),
+                MockResponse(json={}, status_code=401),
+                self._token_response("renewed"),
+                MockResponse(json={}, status_code=401),
+            ]
+        )
+
+        response = model_client.infer_from_parameters(
+            "org-api-key", "zavala", "", "- name: install ffmpeg on RHEL"
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(model_client.session.post.call_count, 4)
+
     @assert_call_count_metrics(metric=wca_codegen_hist)
     def test_infer(self):
         self._do_inference(
@@ -1044,6 +1126,188 @@ class TestWCACodematch(WisdomServiceLogAwareTestCase):
 
 
 @override_settings(ANSIBLE_AI_MODEL_MESH_MODEL_ID=None)
+def a_response(json, status_code=200, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response._content = JSON.dumps(json).encode("utf-8")
+    return response
+
+
+@override_settings(ENABLE_ANSIBLE_LINT_POSTPROCESS=False)
+class TestWCAClientAsync(WisdomAppsBackendMocking, WisdomServiceLogAwareTestCase):
+    def setUp(self):
+        super().setUp()
+        model_client = WCAClient(inference_url="https://example.com")
+        model_client.retries = 0
+        model_client.get_token = Mock(return_value={"access_token": "a-token"})
+        model_client.get_model_id = Mock(return_value="zavala")
+        model_client.get_api_key = Mock(return_value="abc123")
+        model_client.async_session.post = AsyncMock()
+        self.model_client = model_client
+
+    @assert_call_count_metrics(metric=wca_codegen_hist)
+    def test_ainfer(self):
+        predictions = {"predictions": ["      ansible.builtin.apt:\n        name: apache2"]}
+        self.model_client.async_session.post.return_value = a_response(
+            predictions, headers={WCA_REQUEST_ID_HEADER: str(DEFAULT_REQUEST_ID)}
+        )
+        model_input = {"instances": [{"context": "", "prompt": "- name: install ffmpeg on RHEL"}]}
+
+        result = async_to_sync(self.model_client.ainfer)(
+            request=Mock(),
+            model_input=model_input,
+            model_id="zavala",
+            suggestion_id=DEFAULT_REQUEST_ID,
+        )
+
+        self.model_client.async_session.post.assert_awaited_once_with(
+            "https://example.com/v1/wca/codegen/ansible",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": "Bearer a-token",
+                WCA_REQUEST_ID_HEADER: str(DEFAULT_REQUEST_ID),
+            },
+            json={"model_id": "zavala", "prompt": "- name: install ffmpeg on RHEL\n"},
+            timeout=None,
+        )
+        self.assertEqual(result, {**predictions, "model_id": "zavala"})
+
+    def test_ainfer_renews_rejected_token(self):
+        predictions = {"predictions": ["      ansible.builtin.apt:\n        name: apache2"]}
+        self.model_client.get_token.side_effect = [
+            {"access_token": "revoked"},
+            {"access_token": "renewed"},
+        ]
+        self.model_client.async_session.post.side_effect = [
+            a_response({}, status_code=401),
+            a_response(predictions, headers={WCA_REQUEST_ID_HEADER: str(DEFAULT_REQUEST_ID)}),
+        ]
+        model_input = {"instances": [{"context": "", "prompt": "- name: install ffmpeg on RHEL"}]}
+
+        result = async_to_sync(self.model_client.ainfer)(
+            request=Mock(),
+            model_input=model_input,
+            model_id="zavala",
+            suggestion_id=DEFAULT_REQUEST_ID,
+        )
+
+        self.assertEqual(result, {**predictions, "model_id": "zavala"})
+        codegen_call = self.model_client.async_session.post.await_args_list[1]
+        self.assertEqual(codegen_call.kwargs["headers"]["Authorization"], "Bearer renewed")
+
+    def test_ainfer_timeout(self):
+        self.model_client.async_session.post.side_effect = ReadTimeout()
+        with self.assertRaises(ModelTimeoutError) as e:
+            async_to_sync(self.model_client.ainfer)(
+                request=Mock(),
+                model_input={"instances": [{"context": "", "prompt": "- name: foo"}]},
+                model_id="zavala",
+            )
+        self.assertEqual(e.exception.model_id, "zavala")
+
+    def test_ainfer_request_id_correlation_failure(self):
+        self.model_client.async_session.post.return_value = a_response(
+            {"predictions": ["foo"]}, headers={WCA_REQUEST_ID_HEADER: "some-other-id"}
+        )
+        with self.assertRaises(WcaRequestIdCorrelationFailure) as e:
+            async_to_sync(self.model_client.ainfer)(
+                request=Mock(),
+                model_input={"instances": [{"context": "", "prompt": "- name: foo"}]},
+                model_id="zavala",
+                suggestion_id=DEFAULT_REQUEST_ID,
+            )
+        self.assertEqual(e.exception.x_request_id, "some-other-id")
+
+    def test_ainfer_http_error(self):
+        self.model_client.async_session.post.return_value = a_response({}, status_code=500)
+        with self.assertRaises(WcaInferenceFailure):
+            async_to_sync(self.model_client.ainfer)(
+                request=Mock(),
+                model_input={"instances": [{"context": "", "prompt": "- name: foo"}]},
+                model_id="zavala",
+            )
+
+    @assert_call_count_metrics(metric=wca_codematch_hist)
+    def test_acodematch(self):
+        code_matches = {"code_matches": [{"repo_name": "fiaasco.solr", "score": 0.7}]}
+        self.model_client.async_session.post.return_value = a_response(code_matches)
+
+        result = async_to_sync(self.model_client.acodematch)(
+            request=Mock(), model_input={"suggestions": ["- name: foo"]}, model_id="zavala"
+        )
+
+        self.model_client.async_session.post.assert_awaited_once_with(
+            "https://example.com/v1/wca/codematch/ansible",
+            headers={"Content-Type": "application/json", "Authorization": "Bearer a-token"},
+            json={"model_id": "zavala", "input": ["- name: foo"]},
+            timeout=None,
+        )
+        self.assertEqual(result, ("zavala", code_matches))
+
+    @assert_call_count_metrics(metric=wca_codegen_playbook_hist)
+    def test_agenerate_playbook(self):
+        self.model_client.async_session.post.return_value = a_response(
+            {"playbook": "Oh!", "outline": "Ahh!"}
+        )
+        playbook, outline = async_to_sync(self.model_client.agenerate_playbook)(
+            Mock(), text="Install Wordpress", create_outline=True
+        )
+        self.assertEqual(playbook, "Oh!")
+        self.assertEqual(outline, "Ahh!")
+
+    @assert_call_count_metrics(metric=wca_explain_playbook_hist)
+    def test_aexplain_playbook(self):
+        self.model_client.async_session.post.return_value = a_response({"explanation": "!Óh¡"})
+        explanation = async_to_sync(self.model_client.aexplain_playbook)(
+            Mock(), content="Some playbook"
+        )
+        self.assertEqual(explanation, "!Óh¡")
+
+
+@override_settings(ANSIBLE_WCA_HEDGING_ENABLED=True)
+@override_settings(ANSIBLE_WCA_HEDGING_PERCENTILE=50)
+@override_settings(ANSIBLE_WCA_HEDGING_MAX_RATE=1.0)
+@override_settings(ANSIBLE_AI_MODEL_MESH_API_TIMEOUT=None)
+class TestWCAClientHedging(WisdomServiceLogAwareTestCase):
+    def setUp(self):
+        super().setUp()
+        model_client = WCAClient(inference_url="https://example.com")
+        model_client.retries = 0
+        model_client.get_token = Mock(return_value={"access_token": "a-token"})
+        for _ in range(HEDGING_MIN_SAMPLES):
+            model_client.codegen_hedging.record_latency(0.05)
+        self.model_client = model_client
+
+    def test_infer_from_parameters_hedged(self):
+        released = threading.Event()
+        predictions = {"predictions": ["      ansible.builtin.apt:\n        name: apache2"]}
+
+        def post(*args, **kwargs):
+            if self.model_client.session.post.call_count == 1:
+                released.wait(timeout=5)
+                return MockResponse(json={"predictions": ["slow"]}, status_code=200)
+            return MockResponse(
+                json=predictions,
+                status_code=200,
+                headers={WCA_REQUEST_ID_HEADER: str(DEFAULT_REQUEST_ID)},
+            )
+
+        self.model_client.session.post = Mock(side_effect=post)
+        try:
+            response = self.model_client.infer_from_parameters(
+                "abc123", "zavala", "", "- name: install ffmpeg on RHEL", DEFAULT_REQUEST_ID
+            )
+        finally:
+            released.set()
+
+        self.assertEqual(response.json(), predictions)
+        self.assertEqual(self.model_client.session.post.call_count, 2)
+        # Both requests carry the suggestion ID
+        for call in self.model_client.session.post.call_args_list:
+            self.assertEqual(call.kwargs["headers"][WCA_REQUEST_ID_HEADER], str(DEFAULT_REQUEST_ID))
+
+
 class TestDummySecretManager(TestCase):
     def setUp(self):
         super().setUp()
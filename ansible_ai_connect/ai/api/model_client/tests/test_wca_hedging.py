@@ -0,0 +1,196 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import threading
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import Mock
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.ai.api.model_client.wca_hedging import (
+    HEDGING_MIN_SAMPLES,
+    Hedging,
+)
+
+
+def get_sample(name):
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def new_hedging(max_rate=1.0):
+    hedging = Hedging(percentile=50, max_rate=max_rate, max_workers=4)
+    for _ in range(HEDGING_MIN_SAMPLES):
+        hedging.record_latency(0.05)
+    return hedging
+
+
+class SlowFirstCall:
+    """The first call blocks until released, the next ones answer right away."""
+
+    def __init__(self, first_error=None, next_error=None):
+        self.calls = 0
+        self.released = threading.Event()
+        self.first_error = first_error
+        self.next_error = next_error
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls == 1:
+            self.released.wait(timeout=5)
+            if self.first_error:
+                raise self.first_error
+            return "primary"
+        if self.next_error:
+            self.released.set()
+            raise self.next_error
+        return "hedge"
+
+
+class TestHedging(TestCase):
+    def test_delay(self):
+        hedging = Hedging(percentile=90, max_rate=1.0, max_workers=1)
+        self.assertIsNone(hedging.get_delay())
+        for i in range(1, 101):
+            hedging.record_latency(i / 100)
+        self.assertEqual(hedging.get_delay(), 0.9)
+
+    def test_not_hedged_without_enough_samples(self):
+        hedging = Hedging(percentile=50, max_rate=1.0, max_workers=1)
+        fired = get_sample("wca_codegen_hedges_fired_total")
+        self.assertEqual(hedging.run(lambda: "primary"), "primary")
+        self.assertEqual(get_sample("wca_codegen_hedges_fired_total"), fired)
+
+    def test_fast_request_is_not_hedged(self):
+        fired = get_sample("wca_codegen_hedges_fired_total")
+        self.assertEqual(new_hedging().run(lambda: "primary"), "primary")
+        self.assertEqual(get_sample("wca_codegen_hedges_fired_total"), fired)
+
+    def test_hedge_wins(self):
+        fired = get_sample("wca_codegen_hedges_fired_total")
+        won = get_sample("wca_codegen_hedges_won_total")
+        fn = SlowFirstCall()
+        try:
+            self.assertEqual(new_hedging().run(fn), "hedge")
+        finally:
+            fn.released.set()
+        self.assertEqual(fn.calls, 2)
+        self.assertEqual(get_sample("wca_codegen_hedges_fired_total"), fired + 1)
+        self.assertEqual(get_sample("wca_codegen_hedges_won_total"), won + 1)
+
+    def test_failed_hedge_waits_for_the_primary(self):
+        won = get_sample("wca_codegen_hedges_won_total")
+        fn = SlowFirstCall(next_error=ValueError("hedge"))
+        self.assertEqual(new_hedging().run(fn), "primary")
+        self.assertEqual(get_sample("wca_codegen_hedges_won_total"), won)
+
+    def test_hedge_error_response_waits_for_the_primary(self):
+        won = get_sample("wca_codegen_hedges_won_total")
+        ok, unavailable = Mock(status_code=200), Mock(status_code=503)
+        calls = []
+        hedge_answered = threading.Event()
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                # The primary answers slowly, after the hedge
+                hedge_answered.wait(timeout=5)
+                return ok
+            hedge_answered.set()
+            return unavailable
+
+        self.assertIs(new_hedging().run(fn), ok)
+        self.assertEqual(get_sample("wca_codegen_hedges_won_total"), won)
+
+    def test_both_error_responses(self):
+        primary, hedge = Mock(status_code=429), Mock(status_code=503)
+        calls = []
+        hedge_answered = threading.Event()
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                hedge_answered.wait(timeout=5)
+                return primary
+            hedge_answered.set()
+            return hedge
+
+        # The response of the original request is reported
+        self.assertIs(new_hedging().run(fn), primary)
+
+    def test_both_failed(self):
+        fn = SlowFirstCall(first_error=KeyError("primary"), next_error=ValueError("hedge"))
+        with self.assertRaises(KeyError):
+            new_hedging().run(fn)
+
+    def test_hedge_rate_cap(self):
+        hedging = new_hedging(max_rate=0.5)
+        hedging.run(lambda: "primary")
+        fn = SlowFirstCall()
+        try:
+            self.assertEqual(hedging.run(fn), "hedge")
+        finally:
+            fn.released.set()
+
+        # A second slow request would bring the hedge rate over 50%
+        fired = get_sample("wca_codegen_hedges_fired_total")
+        fn = SlowFirstCall()
+        threading.Timer(0.1, fn.released.set).start()
+        self.assertEqual(hedging.run(fn), "primary")
+        self.assertEqual(fn.calls, 1)
+        self.assertEqual(get_sample("wca_codegen_hedges_fired_total"), fired)
+
+
+class TestHedgingAsync(IsolatedAsyncioTestCase):
+    async def test_hedge_wins(self):
+        won = get_sample("wca_codegen_hedges_won_total")
+        cancelled = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return "primary"
+            return "hedge"
+
+        self.assertEqual(await new_hedging().arun(fn), "hedge")
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        self.assertEqual(get_sample("wca_codegen_hedges_won_total"), won + 1)
+
+    async def test_hedge_error_response_waits_for_the_primary(self):
+        ok, unavailable = Mock(status_code=200), Mock(status_code=503)
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(0.3)
+                return ok
+            return unavailable
+
+        self.assertIs(await new_hedging().arun(fn), ok)
+        self.assertEqual(len(calls), 2)
+
+    async def test_fast_request_is_not_hedged(self):
+        async def fn():
+            return "primary"
+
+        self.assertEqual(await new_hedging().arun(fn), "primary")
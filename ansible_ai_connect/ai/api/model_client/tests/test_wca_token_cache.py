@@ -0,0 +1,144 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from ansible_ai_connect.ai.api.model_client.exceptions import WcaTokenFailure
+from ansible_ai_connect.ai.api.model_client.wca_token_cache import WcaTokenCache
+
+
+def a_token(access_token="a-token", expires_in=3600):
+    return {"access_token": access_token, "expires_in": expires_in}
+
+
+class TestWcaTokenCache(SimpleTestCase):
+    def test_cache_hit(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        fetch = Mock(return_value=a_token())
+        self.assertEqual(cache.get("api-key", fetch), a_token())
+        self.assertEqual(cache.get("api-key", fetch), a_token())
+        fetch.assert_called_once()
+
+    def test_cache_is_keyed_by_api_key(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        cache.get("api-key-1", Mock(return_value=a_token("token-1")))
+        cache.get("api-key-2", Mock(return_value=a_token("token-2")))
+        self.assertEqual(cache.get("api-key-1", Mock())["access_token"], "token-1")
+        self.assertEqual(cache.get("api-key-2", Mock())["access_token"], "token-2")
+
+    def test_api_key_is_not_stored(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        cache.get("api-key", Mock(return_value=a_token()))
+        self.assertNotIn("api-key", cache._tokens)
+
+    def test_proactive_refresh(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        now = time.time()
+        with patch("time.time", return_value=now):
+            cache.get("api-key", Mock(return_value=a_token("old")))
+        fetch = Mock(return_value=a_token("new"))
+        with patch("time.time", return_value=now + 3600 - 299):
+            self.assertEqual(cache.get("api-key", fetch)["access_token"], "new")
+        fetch.assert_called_once()
+
+    def test_refresh_failure_uses_current_token(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        now = time.time()
+        with patch("time.time", return_value=now):
+            cache.get("api-key", Mock(return_value=a_token("old")))
+        with patch("time.time", return_value=now + 3600 - 299):
+            token = cache.get("api-key", Mock(side_effect=WcaTokenFailure))
+        self.assertEqual(token["access_token"], "old")
+
+    def test_expired_token_is_fetched(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        now = time.time()
+        with patch("time.time", return_value=now):
+            cache.get("api-key", Mock(return_value=a_token("old")))
+        with (
+            patch("time.time", return_value=now + 3601),
+            self.assertRaises(WcaTokenFailure),
+        ):
+            cache.get("api-key", Mock(side_effect=WcaTokenFailure))
+
+    def test_refresh_margin_is_capped_by_lifetime(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        fetch = Mock(return_value=a_token(expires_in=60))
+        cache.get("api-key", fetch)
+        cache.get("api-key", fetch)
+        fetch.assert_called_once()
+
+    def test_expiration_fallback(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        fetch = Mock(return_value={"access_token": "a-token", "expiration": time.time() + 3600})
+        cache.get("api-key", fetch)
+        cache.get("api-key", fetch)
+        fetch.assert_called_once()
+
+    def test_token_without_expiry_is_not_cached(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        fetch = Mock(return_value={"access_token": "a-token"})
+        cache.get("api-key", fetch)
+        cache.get("api-key", fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_invalidate(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        fetch = Mock(return_value=a_token())
+        cache.get("api-key", fetch)
+        cache.invalidate("api-key")
+        cache.get("api-key", fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_concurrent_misses_share_one_fetch(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        release = threading.Event()
+
+        def fetch():
+            release.wait(5)
+            return a_token()
+
+        fetch_mock = Mock(side_effect=fetch)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(cache.get, "api-key", fetch_mock) for _ in range(8)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        fetch_mock.assert_called_once()
+        self.assertTrue(all(r == a_token() for r in results))
+
+    def test_concurrent_misses_share_failure(self):
+        cache = WcaTokenCache(refresh_margin=300)
+        release = threading.Event()
+
+        def fetch():
+            release.wait(5)
+            raise WcaTokenFailure
+
+        fetch_mock = Mock(side_effect=fetch)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(cache.get, "api-key", fetch_mock) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            for f in futures:
+                with self.assertRaises(WcaTokenFailure):
+                    f.result()
+
+        fetch_mock.assert_called_once()
@@ -21,6 +21,7 @@ from typing import TYPE_CHECKING, Any, Dict, Optional, cast
 
 import backoff
 import requests
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.conf import settings
 from django_prometheus.conf import NAMESPACE
@@ -42,6 +43,8 @@ from ansible_ai_connect.ai.api.model_client.wca_utils import (
     TokenContext,
     TokenResponseChecks,
 )
+from ansible_ai_connect.ai.api.utils.deadline import get_deadline, remaining_time
+from ansible_ai_connect.ai.api.utils.timing import span
 from ansible_ai_connect.healthcheck.backends import (
     ERROR_MESSAGE,
     MODEL_MESH_HEALTH_CHECK_MODELS,
@@ -49,10 +52,14 @@ from ansible_ai_connect.healthcheck.backends import (
     HealthCheckSummary,
     HealthCheckSummaryException,
 )
+from ansible_ai_connect.main.circuit_breaker import CircuitBreakerOpen
+from ansible_ai_connect.main.upstream import new_upstream_session
 
 from ..aws.wca_secret_manager import Suffixes, WcaSecretManagerError
+from .async_session import AsyncSession
 from .base import ModelMeshClient
 from .exceptions import (
+    DeadlineExceeded,
     ModelTimeoutError,
     WcaCodeMatchFailure,
     WcaInferenceFailure,
@@ -63,6 +70,8 @@ from .exceptions import (
     WcaTokenFailure,
     WcaUsernameNotFound,
 )
+from .wca_hedging import Hedging
+from .wca_token_cache import WcaTokenCache
 
 if TYPE_CHECKING:
     from ansible_ai_connect.users.models import User
@@ -191,12 +200,28 @@ class DummyWCAClient(ModelMeshClient):
 class BaseWCAClient(ModelMeshClient):
     def __init__(self, inference_url):
         super().__init__(inference_url=inference_url)
-        self.session = requests.Session()
+        self.session = new_upstream_session()
+        self.async_session = AsyncSession()
         self.retries = settings.ANSIBLE_WCA_RETRY_COUNT
+        self.codegen_hedging = (
+            Hedging(
+                settings.ANSIBLE_WCA_HEDGING_PERCENTILE,
+                settings.ANSIBLE_WCA_HEDGING_MAX_RATE,
+                settings.UPSTREAM_HTTP_POOL_MAXSIZE,
+            )
+            if settings.ANSIBLE_WCA_HEDGING_ENABLED
+            else None
+        )
 
     @staticmethod
     def fatal_exception(exc) -> bool:
         """Determine if an exception is fatal or not"""
+        if isinstance(exc, CircuitBreakerOpen):
+            # fail fast, the service is known to be down
+            return True
+        if isinstance(exc, DeadlineExceeded):
+            # the request was abandoned
+            return True
         if isinstance(exc, requests.RequestException):
             status_code = getattr(getattr(exc, "response", None), "status_code", None)
             # retry on server errors and client errors
@@ -241,32 +266,79 @@ class BaseWCAClient(ModelMeshClient):
         BaseWCAClient.log_backoff_exception(details)
         ibm_cloud_identity_token_retry_counter.inc()
 
-    def infer(self, request, model_input, model_id: str = "", suggestion_id=None) -> Dict[str, Any]:
-        logger.debug(f"Input prompt: {model_input}")
+    @staticmethod
+    def check_request_id(response, request_id, model_id) -> None:
+        x_request_id = response.headers.get(WCA_REQUEST_ID_HEADER)
+        if request_id and x_request_id:
+            # request/payload suggestion_id is a UUID not a string whereas
+            # HTTP headers are strings.
+            if x_request_id != str(request_id):
+                raise WcaRequestIdCorrelationFailure(model_id=model_id, x_request_id=x_request_id)
 
+    @staticmethod
+    def get_prompt_and_context(model_input) -> tuple[str, str]:
         prompt = model_input.get("instances", [{}])[0].get("prompt", "")
         context = model_input.get("instances", [{}])[0].get("context", "")
 
-        organization_id = request.user.org_id
         # WCA codegen fails if a multitask prompt includes the task preamble
         # https://github.com/rh-ibm-synergy/wca-feedback/issues/34
         prompt = strip_task_preamble_from_multi_task_prompt(prompt)
 
         prompt = unify_prompt_ending(prompt)
+        return prompt, context
+
+    @staticmethod
+    def get_inference_response(result, model_id) -> Dict[str, Any]:
+        response = result.json()
+        response["model_id"] = model_id
+        logger.debug(f"Inference API response: {response}")
+        return response
+
+    def infer(self, request, model_input, model_id: str = "", suggestion_id=None) -> Dict[str, Any]:
+        logger.debug(f"Input prompt: {model_input}")
+
+        prompt, context = self.get_prompt_and_context(model_input)
+        organization_id = request.user.org_id
 
         try:
-            api_key = self.get_api_key(request.user, organization_id)
-            model_id = self.get_model_id(request.user, organization_id, model_id)
+            with span("wca_secret_lookup"):
+                api_key = self.get_api_key(request.user, organization_id)
+                model_id = self.get_model_id(request.user, organization_id, model_id)
             result = self.infer_from_parameters(api_key, model_id, context, prompt, suggestion_id)
+            return self.get_inference_response(result, model_id)
+
+        except requests.exceptions.Timeout:
+            raise ModelTimeoutError(model_id=model_id)
+
+    async def ainfer(
+        self, request, model_input, model_id: str = "", suggestion_id=None
+    ) -> Dict[str, Any]:
+        logger.debug(f"Input prompt: {model_input}")
+
+        prompt, context = self.get_prompt_and_context(model_input)
+        # The user and the organization settings are read from the database
+        organization_id = await sync_to_async(lambda: request.user.org_id)()
 
-            response = result.json()
-            response["model_id"] = model_id
-            logger.debug(f"Inference API response: {response}")
-            return response
+        try:
+            with span("wca_secret_lookup"):
+                api_key = await sync_to_async(self.get_api_key)(request.user, organization_id)
+                model_id = await sync_to_async(self.get_model_id)(
+                    request.user, organization_id, model_id
+                )
+            result = await self.ainfer_from_parameters(
+                api_key, model_id, context, prompt, suggestion_id
+            )
+            return self.get_inference_response(result, model_id)
 
         except requests.exceptions.Timeout:
             raise ModelTimeoutError(model_id=model_id)
 
+    def check_inference_response(self, response, model_id, suggestion_id, task_count) -> None:
+        self.check_request_id(response, suggestion_id, model_id)
+        context = Context(model_id, response, task_count > 1)
+        InferenceResponseChecks().run_checks(context)
+        response.raise_for_status()
+
     def infer_from_parameters(self, api_key, model_id, context, prompt, suggestion_id=None):
         data = {
             "model_id": model_id,
@@ -274,41 +346,95 @@ class BaseWCAClient(ModelMeshClient):
         }
         logger.debug(f"Inference API request payload: {json.dumps(data)}")
 
-        headers = self.get_request_headers(api_key, suggestion_id)
+        with span("wca_token"):
+            headers = self.get_request_headers(api_key, suggestion_id)
         task_count = len(get_task_names_from_prompt(prompt))
         prediction_url = f"{self._inference_url}/v1/wca/codegen/ansible"
 
+        def post():
+            return self.session.post(
+                prediction_url,
+                headers=headers,
+                json=data,
+                timeout=self.timeout(task_count),
+            )
+
         @backoff.on_exception(
             backoff.expo,
             Exception,
             max_tries=self.retries + 1,
+            max_time=remaining_time,
             giveup=self.fatal_exception,
             on_backoff=self.on_backoff_inference,
         )
         @wca_codegen_hist.time()
         def post_request():
-            return self.session.post(
+            # A hedged request carries the same X-Request-ID, either response
+            # correlates with the suggestion.
+            if self.codegen_hedging:
+                return self.codegen_hedging.run(post)
+            return post()
+
+        try:
+            with span("wca_codegen"):
+                response = post_request()
+                if self.token_rejected(response, api_key):
+                    headers = self.get_request_headers(api_key, suggestion_id)
+                    response = post_request()
+            self.check_inference_response(response, model_id, suggestion_id, task_count)
+
+        except HTTPError as e:
+            logger.error(f"WCA inference failed for suggestion {suggestion_id} due to {e}.")
+            raise WcaInferenceFailure(model_id=model_id)
+
+        return response
+
+    async def ainfer_from_parameters(self, api_key, model_id, context, prompt, suggestion_id=None):
+        data = {
+            "model_id": model_id,
+            "prompt": f"{context}{prompt}",
+        }
+        logger.debug(f"Inference API request payload: {json.dumps(data)}")
+
+        # Getting the headers may involve a blocking IAM token request
+        with span("wca_token"):
+            headers = await sync_to_async(self.get_request_headers, thread_sensitive=False)(
+                api_key, suggestion_id
+            )
+        task_count = len(get_task_names_from_prompt(prompt))
+        prediction_url = f"{self._inference_url}/v1/wca/codegen/ansible"
+
+        def post():
+            return self.async_session.post(
                 prediction_url,
                 headers=headers,
                 json=data,
                 timeout=self.timeout(task_count),
             )
 
-        try:
-            response = post_request()
+        @backoff.on_exception(
+            backoff.expo,
+            Exception,
+            max_tries=self.retries + 1,
+            max_time=remaining_time,
+            giveup=self.fatal_exception,
+            on_backoff=self.on_backoff_inference,
+        )
+        async def post_request():
+            with wca_codegen_hist.time():
+                if self.codegen_hedging:
+                    return await self.codegen_hedging.arun(post)
+                return await post()
 
-            x_request_id = response.headers.get(WCA_REQUEST_ID_HEADER)
-            if suggestion_id and x_request_id:
-                # request/payload suggestion_id is a UUID not a string whereas
-                # HTTP headers are strings.
-                if x_request_id != str(suggestion_id):
-                    raise WcaRequestIdCorrelationFailure(
-                        model_id=model_id, x_request_id=x_request_id
+        try:
+            with span("wca_codegen"):
+                response = await post_request()
+                if self.token_rejected(response, api_key):
+                    headers = await sync_to_async(self.get_request_headers, thread_sensitive=False)(
+                        api_key, suggestion_id
                     )
-
-            context = Context(model_id, response, task_count > 1)
-            InferenceResponseChecks().run_checks(context)
-            response.raise_for_status()
+                    response = await post_request()
+            self.check_inference_response(response, model_id, suggestion_id, task_count)
 
         except HTTPError as e:
             logger.error(f"WCA inference failed for suggestion {suggestion_id} due to {e}.")
@@ -345,6 +471,7 @@ class BaseWCAClient(ModelMeshClient):
                 backoff.expo,
                 Exception,
                 max_tries=self.retries + 1,
+                max_time=remaining_time,
                 giveup=self.fatal_exception,
                 on_backoff=self.on_backoff_codematch,
             )
@@ -358,14 +485,64 @@ class BaseWCAClient(ModelMeshClient):
                 )
 
             result = post_request()
-            context = Context(model_id, result, suggestion_count > 1)
-            ContentMatchResponseChecks().run_checks(context)
-            result.raise_for_status()
+            if self.token_rejected(result, api_key):
+                headers = self.get_codematch_headers(api_key)
+                result = post_request()
+            return model_id, self.get_codematch_response(result, model_id, suggestion_count)
+
+        except HTTPError:
+            raise WcaCodeMatchFailure(model_id=model_id)
+
+        except requests.exceptions.ReadTimeout:
+            raise ModelTimeoutError(model_id=model_id)
+
+    async def acodematch(self, request, model_input, model_id: str = ""):
+        logger.debug(f"Input prompt: {model_input}")
+        search_url = f"{self._inference_url}/v1/wca/codematch/ansible"
+
+        suggestions = model_input.get("suggestions", "")
+        organization_id = model_input.get("organization_id", None)
+
+        model_id = await sync_to_async(self.get_model_id)(request.user, organization_id, model_id)
+
+        data = {
+            "model_id": model_id,
+            "input": suggestions,
+        }
+
+        logger.debug(f"Codematch API request payload: {data}")
+
+        try:
+            api_key = await sync_to_async(self.get_api_key)(request.user, organization_id)
+            headers = await sync_to_async(self.get_codematch_headers, thread_sensitive=False)(
+                api_key
+            )
+            suggestion_count = len(suggestions)
 
-            response = result.json()
-            logger.debug(f"Codematch API response: {response}")
+            @backoff.on_exception(
+                backoff.expo,
+                Exception,
+                max_tries=self.retries + 1,
+                max_time=remaining_time,
+                giveup=self.fatal_exception,
+                on_backoff=self.on_backoff_codematch,
+            )
+            async def post_request():
+                with wca_codematch_hist.time():
+                    return await self.async_session.post(
+                        search_url,
+                        headers=headers,
+                        json=data,
+                        timeout=self.timeout(suggestion_count),
+                    )
 
-            return model_id, response
+            result = await post_request()
+            if self.token_rejected(result, api_key):
+                headers = await sync_to_async(self.get_codematch_headers, thread_sensitive=False)(
+                    api_key
+                )
+                result = await post_request()
+            return model_id, self.get_codematch_response(result, model_id, suggestion_count)
 
         except HTTPError:
             raise WcaCodeMatchFailure(model_id=model_id)
@@ -373,6 +550,16 @@ class BaseWCAClient(ModelMeshClient):
         except requests.exceptions.ReadTimeout:
             raise ModelTimeoutError(model_id=model_id)
 
+    @staticmethod
+    def get_codematch_response(result, model_id, suggestion_count):
+        context = Context(model_id, result, suggestion_count > 1)
+        ContentMatchResponseChecks().run_checks(context)
+        result.raise_for_status()
+
+        response = result.json()
+        logger.debug(f"Codematch API response: {response}")
+        return response
+
     @abstractmethod
     def get_request_headers(
         self, api_key: str, identifier: Optional[str]
@@ -383,6 +570,13 @@ class BaseWCAClient(ModelMeshClient):
     def get_codematch_headers(self, api_key: str) -> dict[str, str]:
         raise NotImplementedError
 
+    def token_rejected(self, response, api_key: str) -> bool:
+        """
+        Returns True when WCA rejected the credentials derived from api_key, and they
+        were renewed: the request can then be sent once more with new headers.
+        """
+        return False
+
     def supports_ari_postprocessing(self) -> bool:
         return settings.ENABLE_ARI_POSTPROCESS and settings.WCA_ENABLE_ARI_POSTPROCESS
 
@@ -390,12 +584,23 @@ class BaseWCAClient(ModelMeshClient):
 class WCAClient(BaseWCAClient):
     def __init__(self, inference_url):
         super().__init__(inference_url=inference_url)
+        self._token_cache = WcaTokenCache(settings.ANSIBLE_WCA_IDP_TOKEN_REFRESH_MARGIN)
 
     def get_token(self, api_key):
+        return self._token_cache.get(api_key, lambda: self._fetch_token(api_key))
+
+    def token_rejected(self, response, api_key: str) -> bool:
+        # The cached IAM token may be revoked before its expiry
+        if getattr(response, "status_code", None) != 401:
+            return False
+        logger.warning("WCA rejected the IAM token, fetching a new one.")
+        self._token_cache.invalidate(api_key)
+        return True
+
+    def _fetch_token(self, api_key):
         basic = None
         if settings.ANSIBLE_WCA_IDP_LOGIN:
             basic = HTTPBasicAuth(settings.ANSIBLE_WCA_IDP_LOGIN, settings.ANSIBLE_WCA_IDP_PASSWORD)
-        # TODO: store token and only fetch a new one if it has expired
         # https://cloud.ibm.com/docs/account?topic=account-iamtoken_from_apikey
         logger.debug("Fetching WCA token")
         headers = {
@@ -408,6 +613,7 @@ class WCAClient(BaseWCAClient):
             backoff.expo,
             Exception,
             max_tries=self.retries + 1,
+            max_time=remaining_time,
             giveup=self.fatal_exception,
             on_backoff=self.on_backoff_ibm_cloud_identity_token,
         )
@@ -418,6 +624,7 @@ class WCAClient(BaseWCAClient):
                 headers=headers,
                 data=data,
                 auth=basic,
+                timeout=get_deadline().timeout(None, "wca_token"),
             )
 
         try:
@@ -566,23 +773,18 @@ class WCAClient(BaseWCAClient):
         outline: str = "",
         generation_id: str = "",
     ) -> tuple[str, str]:
-        organization_id = request.user.organization.id if request.user.organization else None
+        organization_id = self.get_organization_id(request.user)
         api_key = self.get_api_key(request.user, organization_id)
         model_id = self.get_model_id(request.user, organization_id)
 
         headers = self.get_request_headers(api_key, generation_id)
-        data = {
-            "model_id": model_id,
-            "text": text,
-            "create_outline": create_outline,
-        }
-        if outline:
-            data["outline"] = outline
+        data = self.get_generate_playbook_data(model_id, text, create_outline, outline)
 
         @backoff.on_exception(
             backoff.expo,
             Exception,
             max_tries=self.retries + 1,
+            max_time=remaining_time,
             giveup=self.fatal_exception,
             on_backoff=self.on_backoff_codegen_playbook,
         )
@@ -595,33 +797,91 @@ class WCAClient(BaseWCAClient):
             )
 
         result = post_request()
+        if self.token_rejected(result, api_key):
+            headers = self.get_request_headers(api_key, generation_id)
+            result = post_request()
+        playbook, outline = self.get_generate_playbook_response(result, model_id, generation_id)
+        return self.lint_playbook(playbook), outline
 
-        x_request_id = result.headers.get(WCA_REQUEST_ID_HEADER)
-        if generation_id and x_request_id:
-            # request/payload suggestion_id is a UUID not a string whereas
-            # HTTP headers are strings.
-            if x_request_id != str(generation_id):
-                raise WcaRequestIdCorrelationFailure(model_id=model_id, x_request_id=x_request_id)
+    async def agenerate_playbook(
+        self,
+        request,
+        text: str = "",
+        create_outline: bool = False,
+        outline: str = "",
+        generation_id: str = "",
+    ) -> tuple[str, str]:
+        organization_id = await sync_to_async(self.get_organization_id)(request.user)
+        api_key = await sync_to_async(self.get_api_key)(request.user, organization_id)
+        model_id = await sync_to_async(self.get_model_id)(request.user, organization_id)
+
+        headers = await sync_to_async(self.get_request_headers, thread_sensitive=False)(
+            api_key, generation_id
+        )
+        data = self.get_generate_playbook_data(model_id, text, create_outline, outline)
+
+        @backoff.on_exception(
+            backoff.expo,
+            Exception,
+            max_tries=self.retries + 1,
+            max_time=remaining_time,
+            giveup=self.fatal_exception,
+            on_backoff=self.on_backoff_codegen_playbook,
+        )
+        async def post_request():
+            with wca_codegen_playbook_hist.time():
+                return await self.async_session.post(
+                    f"{self._inference_url}/v1/wca/codegen/ansible/playbook",
+                    headers=headers,
+                    json=data,
+                )
+
+        result = await post_request()
+        if self.token_rejected(result, api_key):
+            headers = await sync_to_async(self.get_request_headers, thread_sensitive=False)(
+                api_key, generation_id
+            )
+            result = await post_request()
+        playbook, outline = self.get_generate_playbook_response(result, model_id, generation_id)
+        playbook = await sync_to_async(self.lint_playbook, thread_sensitive=False)(playbook)
+        return playbook, outline
+
+    @staticmethod
+    def get_organization_id(user) -> Optional[int]:
+        return user.organization.id if user.organization else None
+
+    @staticmethod
+    def get_generate_playbook_data(model_id, text, create_outline, outline) -> dict[str, Any]:
+        data = {
+            "model_id": model_id,
+            "text": text,
+            "create_outline": create_outline,
+        }
+        if outline:
+            data["outline"] = outline
+        return data
+
+    def get_generate_playbook_response(self, result, model_id, generation_id) -> tuple[str, str]:
+        self.check_request_id(result, generation_id, model_id)
 
         context = Context(model_id, result, False)
         InferenceResponseChecks().run_checks(context)
         result.raise_for_status()
 
         response = json.loads(result.text)
+        return response["playbook"], response["outline"]
 
-        playbook = response["playbook"]
-        outline = response["outline"]
-
+    @staticmethod
+    def lint_playbook(playbook: str) -> str:
         from ansible_ai_connect.ai.apps import AiConfig
 
         ai_config = cast(AiConfig, apps.get_app_config("ai"))
         if ansible_lint_caller := ai_config.get_ansible_lint_caller():
             playbook = ansible_lint_caller.run_linter(playbook)
-
-        return playbook, outline
+        return playbook
 
     def explain_playbook(self, request, content: str, explanation_id: str = "") -> str:
-        organization_id = request.user.organization.id if request.user.organization else None
+        organization_id = self.get_organization_id(request.user)
         api_key = self.get_api_key(request.user, organization_id)
         model_id = self.get_model_id(request.user, organization_id)
 
@@ -635,6 +895,7 @@ class WCAClient(BaseWCAClient):
             backoff.expo,
             Exception,
             max_tries=self.retries + 1,
+            max_time=remaining_time,
             giveup=self.fatal_exception,
             on_backoff=self.on_backoff_explain_playbook,
         )
@@ -647,13 +908,50 @@ class WCAClient(BaseWCAClient):
             )
 
         result = post_request()
+        if self.token_rejected(result, api_key):
+            headers = self.get_request_headers(api_key, explanation_id)
+            result = post_request()
+        return self.get_explain_playbook_response(result, model_id, explanation_id)
 
-        x_request_id = result.headers.get(WCA_REQUEST_ID_HEADER)
-        if explanation_id and x_request_id:
-            # request/payload suggestion_id is a UUID not a string whereas
-            # HTTP headers are strings.
-            if x_request_id != str(explanation_id):
-                raise WcaRequestIdCorrelationFailure(model_id=model_id, x_request_id=x_request_id)
+    async def aexplain_playbook(self, request, content: str, explanation_id: str = "") -> str:
+        organization_id = await sync_to_async(self.get_organization_id)(request.user)
+        api_key = await sync_to_async(self.get_api_key)(request.user, organization_id)
+        model_id = await sync_to_async(self.get_model_id)(request.user, organization_id)
+
+        headers = await sync_to_async(self.get_request_headers, thread_sensitive=False)(
+            api_key, explanation_id
+        )
+        data = {
+            "model_id": model_id,
+            "playbook": content,
+        }
+
+        @backoff.on_exception(
+            backoff.expo,
+            Exception,
+            max_tries=self.retries + 1,
+            max_time=remaining_time,
+            giveup=self.fatal_exception,
+            on_backoff=self.on_backoff_explain_playbook,
+        )
+        async def post_request():
+            with wca_explain_playbook_hist.time():
+                return await self.async_session.post(
+                    f"{self._inference_url}/v1/wca/explain/ansible/playbook",
+                    headers=headers,
+                    json=data,
+                )
+
+        result = await post_request()
+        if self.token_rejected(result, api_key):
+            headers = await sync_to_async(self.get_request_headers, thread_sensitive=False)(
+                api_key, explanation_id
+            )
+            result = await post_request()
+        return self.get_explain_playbook_response(result, model_id, explanation_id)
+
+    def get_explain_playbook_response(self, result, model_id, explanation_id) -> str:
+        self.check_request_id(result, explanation_id, model_id)
 
         context = Context(model_id, result, False)
         InferenceResponseChecks().run_checks(context)
@@ -0,0 +1,179 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+wca_codegen_hedges_fired_counter = Counter(
+    "wca_codegen_hedges_fired",
+    "Counter of hedged WCA codegen API requests sent",
+    namespace=NAMESPACE,
+)
+wca_codegen_hedges_won_counter = Counter(
+    "wca_codegen_hedges_won",
+    "Counter of hedged WCA codegen API requests answering before the original request",
+    namespace=NAMESPACE,
+)
+
+# Number of recent requests the latency percentile and the hedge rate are computed on
+HEDGING_WINDOW = 1000
+# Requests are not hedged until this many latencies were observed
+HEDGING_MIN_SAMPLES = 20
+
+
+def succeeded(result: Any) -> bool:
+    """Rate limited and server error responses lose the race, like exceptions."""
+    status_code = getattr(result, "status_code", None)
+    if not isinstance(status_code, int):
+        return True
+    return status_code != 429 and status_code < 500
+
+
+class Hedging:
+    """
+    Sends a second, identical request when the first one has not answered within
+    the given percentile of the recent latencies, the first successful answer wins.
+
+    At most `max_rate` of the recent requests are hedged, so a slow upstream
+    service does not get twice the load.
+    """
+
+    def __init__(self, percentile: float, max_rate: float, max_workers: int):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=HEDGING_WINDOW)
+        self._hedged: deque[bool] = deque(maxlen=HEDGING_WINDOW)
+        self._hedge_count = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="wca-hedging"
+        )
+
+    def get_delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < HEDGING_MIN_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        index = max(math.ceil(len(latencies) * self.percentile / 100) - 1, 0)
+        return latencies[index]
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _record_request(self, hedged: bool) -> None:
+        # Called with the lock held
+        if len(self._hedged) == self._hedged.maxlen and self._hedged[0]:
+            self._hedge_count -= 1
+        self._hedged.append(hedged)
+        if hedged:
+            self._hedge_count += 1
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._record_request(False)
+
+    def acquire_hedge(self) -> bool:
+        with self._lock:
+            hedged = self._hedge_count + 1 <= self.max_rate * (len(self._hedged) + 1)
+            self._record_request(hedged)
+        if hedged:
+            wca_codegen_hedges_fired_counter.inc()
+        return hedged
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        start_time = time.monotonic()
+        result = fn()
+        self.record_latency(time.monotonic() - start_time)
+        return result
+
+    async def _atimed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        start_time = time.monotonic()
+        result = await fn()
+        self.record_latency(time.monotonic() - start_time)
+        return result
+
+    def run(self, fn: Callable[[], Any]) -> Any:
+        delay = self.get_delay()
+        if delay is None:
+            self.record_request()
+            return self._timed(fn)
+
+        # The worker threads see the context of the caller, its request deadline included
+        primary = self._executor.submit(contextvars.copy_context().run, self._timed, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            self.record_request()
+            return primary.result()
+        if not self.acquire_hedge():
+            return primary.result()
+
+        logger.debug(f"WCA request did not answer within {delay:.2f}s, hedging")
+        hedge = self._executor.submit(contextvars.copy_context().run, self._timed, fn)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and succeeded(future.result()):
+                    if future is hedge:
+                        wca_codegen_hedges_won_counter.inc()
+                    return future.result()
+        # Both requests failed, report the error of the original one
+        return primary.result()
+
+    async def arun(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        delay = self.get_delay()
+        if delay is None:
+            self.record_request()
+            return await self._atimed(fn)
+
+        primary = asyncio.ensure_future(self._atimed(fn))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                self.record_request()
+                return primary.result()
+            if not self.acquire_hedge():
+                return await primary
+
+            logger.debug(f"WCA request did not answer within {delay:.2f}s, hedging")
+            hedge = asyncio.ensure_future(self._atimed(fn))
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and succeeded(task.result()):
+                        if task is hedge:
+                            wca_codegen_hedges_won_counter.inc()
+                        return task.result()
+            # Both requests failed, report the error of the original one
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,141 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+ibm_cloud_identity_token_cache_hit_counter = Counter(
+    "ibm_cloud_identity_token_cache_hits",
+    "Counter of IBM Cloud identity tokens served from the cache",
+    namespace=NAMESPACE,
+)
+ibm_cloud_identity_token_cache_miss_counter = Counter(
+    "ibm_cloud_identity_token_cache_misses",
+    "Counter of IBM Cloud identity token lookups without a valid cached token",
+    namespace=NAMESPACE,
+)
+ibm_cloud_identity_token_cache_refresh_counter = Counter(
+    "ibm_cloud_identity_token_cache_refreshes",
+    "Counter of proactive IBM Cloud identity token refreshes ahead of expiry",
+    namespace=NAMESPACE,
+)
+
+
+class CachedToken(NamedTuple):
+    token: Dict[str, Any]
+    refresh_at: float
+    expires_at: float
+
+
+class WcaTokenCache:
+    """
+    Cache of IBM Cloud IAM tokens keyed by a digest of the API Key.
+
+    Tokens are refreshed ahead of their expiry. Concurrent lookups for the same
+    API Key share a single refresh; while a refresh is in flight, callers keep
+    being served the current token if it has not expired yet.
+    """
+
+    def __init__(self, refresh_margin: int):
+        self._refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, CachedToken] = {}
+        self._refreshing: Dict[str, Future] = {}
+
+    @staticmethod
+    def cache_key(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def get(self, api_key: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        key = self.cache_key(api_key)
+        now = time.time()
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached and now < cached.refresh_at:
+                ibm_cloud_identity_token_cache_hit_counter.inc()
+                return cached.token
+
+            still_valid = cached is not None and now < cached.expires_at
+            future = self._refreshing.get(key)
+            if future is not None and still_valid:
+                # Another thread is already refreshing this token
+                ibm_cloud_identity_token_cache_hit_counter.inc()
+                return cached.token
+
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._refreshing[key] = future
+
+        if still_valid:
+            ibm_cloud_identity_token_cache_refresh_counter.inc()
+        else:
+            ibm_cloud_identity_token_cache_miss_counter.inc()
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            token = fetch()
+        except Exception as e:
+            with self._lock:
+                self._refreshing.pop(key, None)
+            future.set_exception(e)
+            if still_valid:
+                logger.warning("Failed to refresh the WCA token, using the current one.")
+                return cached.token
+            raise
+
+        entry = self._new_entry(token, now)
+        with self._lock:
+            if entry:
+                self._evict_expired(now)
+                self._tokens[key] = entry
+            self._refreshing.pop(key, None)
+        future.set_result(token)
+        return token
+
+    def invalidate(self, api_key: str) -> None:
+        with self._lock:
+            self._tokens.pop(self.cache_key(api_key), None)
+
+    def _new_entry(self, token: Dict[str, Any], now: float) -> Optional[CachedToken]:
+        # https://cloud.ibm.com/docs/account?topic=account-iamtoken_from_apikey
+        # Prefer the relative 'expires_in' to be immune to clock skew with IAM.
+        expires_in = token.get("expires_in") if isinstance(token, dict) else None
+        expiration = token.get("expiration") if isinstance(token, dict) else None
+        if isinstance(expires_in, (int, float)) and expires_in > 0:
+            lifetime = float(expires_in)
+        elif isinstance(expiration, (int, float)):
+            lifetime = float(expiration) - now
+        else:
+            logger.info("WCA token has no usable expiry, it will not be cached.")
+            return None
+        if lifetime <= 0:
+            return None
+        margin = min(self._refresh_margin, lifetime / 2)
+        return CachedToken(token, now + lifetime - margin, now + lifetime)
+
+    def _evict_expired(self, now: float) -> None:
+        for key in [k for k, v in self._tokens.items() if v.expires_at <= now]:
+            del self._tokens[key]
@@ -12,12 +12,9 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from django.apps import apps
 from django.conf import settings
 from rest_framework import permissions
 
-from ansible_ai_connect.ai.api.aws.wca_secret_manager import Suffixes
-
 CONTINUE = True
 BLOCK = False
 
@@ -65,14 +62,10 @@ class BlockWCANotReadyButTrialAvailable(permissions.BasePermission):
             return CONTINUE
 
         # accept user with active Trial period
-        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and any(
-            up.is_active for up in request.user.userplan_set.all()
-        ):
+        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and request.user.has_active_trial:
             return CONTINUE
 
-        secret_manager = apps.get_app_config("ai").get_wca_secret_manager()
-        org_has_api_key = secret_manager.secret_exists(user.organization.id, Suffixes.API_KEY)
-        return CONTINUE if org_has_api_key else BLOCK
+        return CONTINUE if user.org_has_api_key else BLOCK
 
 
 # See: https://issues.redhat.com/browse/AAP-18386
@@ -95,14 +88,10 @@ class BlockUserWithoutSeatAndWCAReadyOrg(permissions.BasePermission):
             return CONTINUE
 
         # accept user with active Trial period
-        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and any(
-            up.is_active for up in request.user.userplan_set.all()
-        ):
+        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and request.user.has_active_trial:
             return CONTINUE
 
-        secret_manager = apps.get_app_config("ai").get_wca_secret_manager()
-        org_has_api_key = secret_manager.secret_exists(user.organization.id, Suffixes.API_KEY)
-        return BLOCK if org_has_api_key else CONTINUE
+        return BLOCK if user.org_has_api_key else CONTINUE
 
 
 # See: https://issues.redhat.com/browse/AAP-18386
@@ -123,14 +112,10 @@ class BlockUserWithSeatButWCANotReady(permissions.BasePermission):
             return CONTINUE
 
         # If the user has an active Trial, we continue
-        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and any(
-            up.is_active for up in request.user.userplan_set.all()
-        ):
+        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and request.user.has_active_trial:
             return CONTINUE
 
-        secret_manager = apps.get_app_config("ai").get_wca_secret_manager()
-        org_has_api_key = secret_manager.secret_exists(user.organization.id, Suffixes.API_KEY)
-        return CONTINUE if org_has_api_key else BLOCK
+        return CONTINUE if user.org_has_api_key else BLOCK
 
 
 # See: https://issues.redhat.com/browse/AAP-19427
@@ -148,9 +133,7 @@ class BlockUserWithoutSeat(permissions.BasePermission):
             return CONTINUE
 
         # If the user has an active Trial, we continue
-        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and any(
-            up.is_active for up in request.user.userplan_set.all()
-        ):
+        if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and request.user.has_active_trial:
             return CONTINUE
 
         return CONTINUE if user.rh_user_has_seat else BLOCK
@@ -12,15 +12,28 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import re
 from abc import abstractmethod
 from typing import Generic, TypeVar
 
+from asgiref.sync import sync_to_async
+
 
 class PipelineElement:
+    @property
+    def name(self) -> str:
+        """Name of the stage in the timings, e.g. "post_process" for PostProcessStage."""
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", type(self).__name__.removesuffix("Stage")).lower()
+
     @abstractmethod
     def process(self, context) -> None:
         pass
 
+    async def aprocess(self, context) -> None:
+        # Elements without a native asyncio implementation run in the thread
+        # that also holds the database connection of the request.
+        await sync_to_async(self.process)(context=context)
+
 
 T = TypeVar("T")
 C = TypeVar("C")
@@ -34,3 +47,6 @@ class Pipeline(Generic[T, C]):
     @abstractmethod
     def execute(self) -> T:
         pass
+
+    async def aexecute(self) -> T:
+        raise NotImplementedError
@@ -0,0 +1,89 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter
+
+completion_cache_hit_counter = Counter(
+    "completion_cache_hit",
+    "Counter of completion requests served from the completion cache",
+    namespace=NAMESPACE,
+)
+completion_cache_miss_counter = Counter(
+    "completion_cache_miss",
+    "Counter of completion requests not found in the completion cache",
+    namespace=NAMESPACE,
+)
+
+
+class CachedCompletion(NamedTuple):
+    model_id: str
+    predictions: dict[str, Any]
+    post_processed_predictions: dict[str, Any]
+    task_results: list[dict[str, str]]
+    # (name, event) of the Segment events of the request that computed the completion
+    segment_events: tuple[tuple[str, dict[str, Any]], ...] = ()
+
+
+class CompletionCache:
+    """
+    Bounded, in-memory cache of post-processed completions.
+
+    Entries expire `ttl` seconds after being stored, the least recently used entry
+    is evicted when `max_size` is reached. Entries are copied in and out, so the
+    requests served from the cache cannot alter each other.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[CachedCompletion, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedCompletion]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now >= entry[1]:
+                del self._entries[key]
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+        if entry is None:
+            completion_cache_miss_counter.inc()
+            return None
+        completion_cache_hit_counter.inc()
+        return copy.deepcopy(entry[0])
+
+    def set(self, key: str, completion: CachedCompletion) -> None:
+        entry = (copy.deepcopy(completion), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
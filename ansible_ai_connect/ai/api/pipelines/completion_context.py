@@ -13,12 +13,15 @@
 #  limitations under the License.
 
 from dataclasses import dataclass, field
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from ansible_ai_connect.ai.api.data.data_model import APIPayload
+from ansible_ai_connect.ai.api.utils.deadline import Deadline
+from ansible_ai_connect.ai.api.utils.documents import YamlDocuments
+from ansible_ai_connect.ai.api.utils.timing import Timings
 
 
 @dataclass
@@ -37,3 +40,12 @@ class CompletionContext:
     post_processed_predictions: dict[str, Union[list[str], str]] = field(default_factory=dict)
 
     task_results: list[dict[str, str]] = field(default_factory=list)
+
+    cache_key: Optional[str] = None
+    # The prediction and post-processing events of the request, as they were before
+    # being sent to Segment, replayed when the completion is served from the cache
+    segment_events: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+
+    deadline: Deadline = field(default_factory=Deadline)
+    timings: Timings = field(default_factory=Timings)
+    documents: YamlDocuments = field(default_factory=YamlDocuments)
@@ -0,0 +1,122 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+
+from ansible_ai_connect.ai.api.pipelines.common import PipelineElement
+from ansible_ai_connect.ai.api.pipelines.completion_cache import CachedCompletion
+from ansible_ai_connect.ai.api.pipelines.completion_context import CompletionContext
+from ansible_ai_connect.ai.api.pipelines.completion_stages.inference import (
+    InferenceStage,
+    get_model_key,
+)
+from ansible_ai_connect.ai.api.pipelines.completion_stages.response import ResponseStage
+from ansible_ai_connect.ai.api.utils.segment import send_segment_event
+
+logger = logging.getLogger(__name__)
+
+
+def get_completion_cache_key(context: CompletionContext) -> Optional[str]:
+    user = context.request.user
+    organization = getattr(user, "organization", None)
+    if organization and organization.completion_cache_opt_out:
+        return None
+    # Completions are only shared within an organization, or by a user without one
+    tenant = f"org:{organization.id}" if organization else f"user:{user.pk}"
+    model_mesh_client = apps.get_app_config("ai").model_mesh_client
+    payload = context.payload
+    key = [
+        tenant,
+        *get_model_key(context),
+        # The context and prompt were normalized by the pre-process stage
+        payload.context,
+        payload.prompt,
+        payload.original_prompt,
+        context.original_indent,
+        context.metadata.get("ansibleFileType", "playbook"),
+        # Settings affecting the post-processing
+        user.rh_user_has_seat,
+        model_mesh_client.supports_ari_postprocessing(),
+        settings.ENABLE_ANSIBLE_LINT_POSTPROCESS,
+    ]
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+
+class CacheLookupStage(PipelineElement):
+    """
+    Serves the completion from the completion cache when an identical request was
+    post-processed recently, skipping the inference and the post-processing.
+    """
+
+    def process(self, context: CompletionContext) -> None:
+        completion_cache = apps.get_app_config("ai").get_completion_cache()
+        if completion_cache is None:
+            return
+        start_time = time.time()
+        context.cache_key = get_completion_cache_key(context)
+        if context.cache_key is None:
+            return
+        cached = completion_cache.get(context.cache_key)
+        if cached is None:
+            return
+
+        logger.debug(
+            f"completion for suggestion id {context.payload.suggestionId} "
+            "served from the completion cache"
+        )
+        context.model_id = cached.model_id
+        context.predictions = cached.predictions
+        context.post_processed_predictions = cached.post_processed_predictions
+        context.task_results = cached.task_results
+        self.send_segment_events(context, cached, start_time)
+        # The response carries the suggestionId of this request
+        ResponseStage().process(context)
+
+    @staticmethod
+    def send_segment_events(context: CompletionContext, cached: CachedCompletion, start_time):
+        """
+        Send the prediction and post-processing events of the cached completion again, for
+        this request, flagged as cached and with the duration of the lookup.
+        """
+        duration = round((time.time() - start_time) * 1000, 2)
+        suggestion_id = str(context.payload.suggestionId)
+        for event_name, event in cached.segment_events:
+            event |= {"suggestionId": suggestion_id, "duration": duration, "cached": True}
+            if event_name == "prediction":
+                event["request"] = InferenceStage.get_model_mesh_input(context)
+            send_segment_event(event, event_name, context.request.user)
+
+
+class CacheStoreStage(PipelineElement):
+    def process(self, context: CompletionContext) -> None:
+        completion_cache = apps.get_app_config("ai").get_completion_cache()
+        if completion_cache is None or context.cache_key is None:
+            return
+        completion_cache.set(
+            context.cache_key,
+            CachedCompletion(
+                model_id=context.model_id,
+                predictions=context.predictions,
+                post_processed_predictions=context.post_processed_predictions,
+                task_results=context.task_results,
+                segment_events=tuple(context.segment_events),
+            ),
+        )
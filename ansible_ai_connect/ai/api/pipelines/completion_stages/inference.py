@@ -12,21 +12,25 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import copy
+import hashlib
 import json
 import logging
 import time
 from string import Template
 
 from ansible_anonymizer import anonymizer
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.conf import settings
 from django_prometheus.conf import NAMESPACE
-from prometheus_client import Histogram
+from prometheus_client import Counter, Histogram
 
 from ansible_ai_connect.ai.api.data.data_model import ModelMeshPayload
 from ansible_ai_connect.ai.api.exceptions import (
     BaseWisdomAPIException,
     ModelTimeoutException,
+    RequestDeadlineExceededException,
     ServiceUnavailable,
     WcaBadRequestException,
     WcaCloudflareRejectionException,
@@ -41,6 +45,7 @@ from ansible_ai_connect.ai.api.exceptions import (
     process_error_count,
 )
 from ansible_ai_connect.ai.api.model_client.exceptions import (
+    DeadlineExceeded,
     ModelTimeoutError,
     WcaBadRequest,
     WcaCloudflareRejection,
@@ -56,6 +61,7 @@ from ansible_ai_connect.ai.api.model_client.exceptions import (
 from ansible_ai_connect.ai.api.pipelines.common import PipelineElement
 from ansible_ai_connect.ai.api.pipelines.completion_context import CompletionContext
 from ansible_ai_connect.ai.api.utils.segment import send_segment_event
+from ansible_ai_connect.ai.api.utils.single_flight import SingleFlight
 from ansible_ai_connect.ai.feature_flags import FeatureFlags
 
 logger = logging.getLogger(__name__)
@@ -67,19 +73,89 @@ completions_hist = Histogram(
     "Histogram of model prediction processing time",
     namespace=NAMESPACE,
 )
+completions_coalesced_counter = Counter(
+    "model_prediction_coalesced",
+    "Counter of completion requests served by an identical in-flight model prediction",
+    namespace=NAMESPACE,
+)
+
+# Identical completion requests (same organization, model, context and prompt) in
+# flight at the same time share a single model prediction.
+inflight_predictions = SingleFlight()
+
+
+def get_model_key(context: CompletionContext) -> list:
+    """
+    The model and the API key of a completion request, as far as they differ between the
+    users of an organization: the users of a trial are served by the default model, with
+    the default API key, whatever model they request.
+    """
+    user = context.request.user
+    if settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL and user.has_active_trial:
+        return ["trial", settings.ANSIBLE_AI_ENABLE_ONE_CLICK_DEFAULT_MODEL_ID]
+    return ["organization", context.payload.model]
 
 
 class InferenceStage(PipelineElement):
     def process(self, context: CompletionContext) -> None:
-        request = context.request
-        payload = context.payload
         model_mesh_client = apps.get_app_config("ai").model_mesh_client
-        # We have a little inconsistency of the "model" term throughout the application:
-        # - FeatureFlags use 'model_name'
-        # - ModelMeshClient uses 'model_id'
-        # - Public completion API uses 'model'
-        # - Segment Events use 'modelName'
-        model_id = payload.model
+        data = self.get_model_mesh_input(context)
+
+        def infer():
+            return model_mesh_client.infer(
+                context.request,
+                data,
+                model_id=context.payload.model,
+                suggestion_id=context.payload.suggestionId,
+            )
+
+        predictions = None
+        exception = None
+        start_time = time.time()
+        try:
+            if settings.ANSIBLE_AI_ENABLE_COMPLETION_COALESCING:
+                key = self.get_coalescing_key(context)
+                predictions, shared = inflight_predictions.do(key, infer)
+                predictions = self.coalesced_predictions(context, predictions, shared)
+            else:
+                predictions = infer()
+        except Exception as e:
+            exception = e
+        self.process_predictions(context, data, start_time, predictions, exception)
+
+    async def aprocess(self, context: CompletionContext) -> None:
+        model_mesh_client = apps.get_app_config("ai").model_mesh_client
+        data = self.get_model_mesh_input(context)
+
+        def ainfer():
+            return model_mesh_client.ainfer(
+                context.request,
+                data,
+                model_id=context.payload.model,
+                suggestion_id=context.payload.suggestionId,
+            )
+
+        predictions = None
+        exception = None
+        start_time = time.time()
+        try:
+            if settings.ANSIBLE_AI_ENABLE_COMPLETION_COALESCING:
+                # Reading the user's organization may hit the database
+                key = await sync_to_async(self.get_coalescing_key)(context)
+                predictions, shared = await inflight_predictions.ado(key, ainfer)
+                predictions = self.coalesced_predictions(context, predictions, shared)
+            else:
+                predictions = await ainfer()
+        except Exception as e:
+            exception = e
+        # Sending the Segment event reads the user from the database
+        await sync_to_async(self.process_predictions)(
+            context, data, start_time, predictions, exception
+        )
+
+    @staticmethod
+    def get_model_mesh_input(context: CompletionContext) -> dict:
+        payload = context.payload
         suggestion_id = payload.suggestionId
 
         model_mesh_payload = ModelMeshPayload(
@@ -93,17 +169,62 @@ class InferenceStage(PipelineElement):
         )
         data = model_mesh_payload.dict()
         logger.debug(f"input to inference for suggestion id {suggestion_id}:\n{data}")
+        return data
+
+    @staticmethod
+    def get_coalescing_key(context: CompletionContext) -> tuple:
+        user = context.request.user
+        organization = getattr(user, "organization", None)
+        # Predictions are only shared within an organization, or by a user without one
+        tenant = f"org:{organization.id}" if organization else f"user:{user.pk}"
+        payload = context.payload
+        # The context was normalized by the pre-process stage
+        digest = hashlib.sha256(
+            json.dumps([payload.context, payload.prompt]).encode("utf-8")
+        ).hexdigest()
+        return tenant, *get_model_key(context), digest
+
+    @staticmethod
+    def coalesced_predictions(context: CompletionContext, predictions, shared: bool):
+        if shared:
+            completions_coalesced_counter.inc()
+            logger.debug(
+                f"suggestion id {context.payload.suggestionId} served by an identical "
+                "in-flight prediction"
+            )
+        # Each request gets its own copy, the later stages update the predictions in place
+        return copy.deepcopy(predictions)
+
+    def process_predictions(
+        self,
+        context: CompletionContext,
+        data: dict,
+        start_time: float,
+        predictions,
+        infer_exception: Exception | None,
+    ) -> None:
+        request = context.request
+        payload = context.payload
+        # We have a little inconsistency of the "model" term throughout the application:
+        # - FeatureFlags use 'model_name'
+        # - ModelMeshClient uses 'model_id'
+        # - Public completion API uses 'model'
+        # - Segment Events use 'modelName'
+        model_id = payload.model
+        suggestion_id = payload.suggestionId
 
-        predictions = None
         exception = None
         event = None
         event_name = None
-        start_time = time.time()
         try:
-            predictions = model_mesh_client.infer(
-                request, data, model_id=model_id, suggestion_id=suggestion_id
-            )
+            if infer_exception is not None:
+                raise infer_exception
             model_id = predictions.get("model_id", model_id)
+        except DeadlineExceeded as e:
+            exception = e
+            logger.warning(f"request deadline exceeded for suggestion {suggestion_id}")
+            raise RequestDeadlineExceededException(cause=e)
+
         except ModelTimeoutError as e:
             exception = e
             logger.warning(
@@ -212,6 +333,7 @@ class InferenceStage(PipelineElement):
                     "suggestionId": str(suggestion_id),
                 }
             event_name = event_name if event_name else "prediction"
+            context.segment_events.append((event_name, copy.deepcopy(event)))
             send_segment_event(event, event_name, request.user)
 
         logger.debug(f"response from inference for suggestion id {suggestion_id}:\n{predictions}")
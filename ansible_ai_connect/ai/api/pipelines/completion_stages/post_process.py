@@ -12,6 +12,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import copy
 import json
 import logging
 import time
@@ -27,9 +28,12 @@ from ansible_ai_connect.ai.api.exceptions import (
     PostprocessException,
     process_error_count,
 )
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
 from ansible_ai_connect.ai.api.pipelines.common import PipelineElement
 from ansible_ai_connect.ai.api.pipelines.completion_context import CompletionContext
+from ansible_ai_connect.ai.api.utils.documents import load_yaml
 from ansible_ai_connect.ai.api.utils.segment import send_segment_event
+from ansible_ai_connect.ai.api.utils.timing import span
 
 logger = logging.getLogger(__name__)
 
@@ -92,7 +96,9 @@ def write_to_segment(
 
     if model_id:
         event["modelName"] = model_id
+    sent = (event_name, copy.deepcopy(event))
     send_segment_event(event, event_name, user)
+    return sent
 
 
 def trim_whitespace_lines(input: str):
@@ -166,7 +172,7 @@ def completion_post_process(context: CompletionContext):
 
     # check if the recommendation_yaml is a valid YAML
     try:
-        _ = yaml.safe_load(recommendation_yaml)
+        _ = load_yaml(recommendation_yaml)
     except Exception as exc:
         # the recommendation YAML can have a broken line at the bottom
         # because the token size of the wisdom model is limited.
@@ -174,7 +180,7 @@ def completion_post_process(context: CompletionContext):
         truncated, truncated_yaml = truncate_recommendation_yaml(recommendation_yaml)
         if truncated:
             try:
-                _ = yaml.safe_load(truncated_yaml)
+                _ = load_yaml(truncated_yaml)
                 logger.debug(
                     f"suggestion id: {suggestion_id}, "
                     f"truncated recommendation: \n{truncated_yaml}"
@@ -193,6 +199,7 @@ def completion_post_process(context: CompletionContext):
             # if the recommentation is not a valid yaml, record it as an exception
             exception = recommendation_problem
     if ari_caller:
+        context.deadline.check("ari")
         start_time = time.time()
         postprocess_details = []
         try:
@@ -201,9 +208,10 @@ def completion_post_process(context: CompletionContext):
                 f"suggestion id: {suggestion_id}, "
                 f"original recommendation: \n{recommendation_yaml}"
             )
-            postprocessed_yaml, ari_results = ari_caller.postprocess(
-                recommendation_yaml, original_prompt, payload_context
-            )
+            with span("ari"):
+                postprocessed_yaml, ari_results = ari_caller.postprocess(
+                    recommendation_yaml, original_prompt, payload_context
+                )
             logger.debug(
                 f"suggestion id: {suggestion_id}, "
                 f"post-processed recommendation: \n{postprocessed_yaml}"
@@ -265,7 +273,7 @@ def completion_post_process(context: CompletionContext):
                 f"context {payload_context} and model recommendation {post_processed_predictions}"
             )
         finally:
-            write_to_segment(
+            sent = write_to_segment(
                 user,
                 suggestion_id,
                 anonymized_recommendation_yaml,
@@ -277,10 +285,12 @@ def completion_post_process(context: CompletionContext):
                 "ARI",
                 model_id,
             )
+            context.segment_events.append(sent)
             if exception:
                 raise exception
 
     if ansible_lint_caller:
+        context.deadline.check("ansible_lint")
         start_time = time.time()
         try:
             # Ansible Lint the ARI processed yaml else the model prediction
@@ -290,7 +300,8 @@ def completion_post_process(context: CompletionContext):
                 input_yaml = (
                     f"{original_prompt.lstrip() if ari_caller else original_prompt}{input_yaml}"
                 )
-            postprocessed_yaml = ansible_lint_caller.run_linter(input_yaml)
+            with span("ansible_lint"):
+                postprocessed_yaml = ansible_lint_caller.run_linter(input_yaml)
             # Stripping the leading STRIP_YAML_LINE that was added by above processing
             if postprocessed_yaml.startswith(STRIP_YAML_LINE):
                 postprocessed_yaml = postprocessed_yaml[len(STRIP_YAML_LINE) :]
@@ -309,7 +320,7 @@ def completion_post_process(context: CompletionContext):
             anonymized_input_yaml = (
                 postprocessed_yaml if postprocessed_yaml else anonymized_recommendation_yaml
             )
-            write_to_segment(
+            sent = write_to_segment(
                 user,
                 suggestion_id,
                 anonymized_input_yaml,
@@ -321,6 +332,7 @@ def completion_post_process(context: CompletionContext):
                 "ansible-lint",
                 model_id,
             )
+            context.segment_events.append(sent)
             if exception:
                 raise exception
 
@@ -330,11 +342,12 @@ def completion_post_process(context: CompletionContext):
             post_processed_predictions["predictions"][0]
         )
 
-    # adjust indentation as per default ansible-lint configuration
-    indented_yaml = fmtr.adjust_indentation(post_processed_predictions["predictions"][0])
+    with span("adjust_indentation"):
+        # adjust indentation as per default ansible-lint configuration
+        indented_yaml = fmtr.adjust_indentation(post_processed_predictions["predictions"][0])
 
-    # restore original indentation
-    indented_yaml = fmtr.restore_indentation(indented_yaml, original_indent)
+        # restore original indentation
+        indented_yaml = fmtr.restore_indentation(indented_yaml, original_indent)
 
     # blank any lines containing only whitespace
     indented_yaml = trim_whitespace_lines(indented_yaml)
@@ -385,6 +398,9 @@ class PostProcessStage(PipelineElement):
         predictions = context.predictions
         try:
             completion_post_process(context)
+        except DeadlineExceeded:
+            # Reported by the pipeline
+            raise
         except Exception:
             process_error_count.labels(stage="post-processing").inc()
             logger.exception(
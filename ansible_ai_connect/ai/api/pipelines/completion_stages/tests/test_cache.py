@@ -0,0 +1,207 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import uuid
+from unittest.mock import Mock, patch
+
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+
+from ansible_ai_connect.ai.api.data.data_model import APIPayload
+from ansible_ai_connect.ai.api.pipelines.completion_cache import (
+    CachedCompletion,
+    CompletionCache,
+)
+from ansible_ai_connect.ai.api.pipelines.completion_context import CompletionContext
+from ansible_ai_connect.ai.api.pipelines.completion_stages.cache import (
+    CacheLookupStage,
+    CacheStoreStage,
+    get_completion_cache_key,
+)
+
+
+def completion(prediction="    ansible.builtin.ping:\n"):
+    return CachedCompletion(
+        model_id="a-model",
+        predictions={"model_id": "a-model", "predictions": [prediction]},
+        post_processed_predictions={"predictions": [prediction]},
+        task_results=[{"name": "ping", "prediction": prediction}],
+    )
+
+
+class TestCompletionCache(SimpleTestCase):
+    def test_get_set(self):
+        cache = CompletionCache(max_size=2, ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", completion())
+        self.assertEqual(cache.get("a"), completion())
+
+    def test_entries_are_copied(self):
+        cache = CompletionCache(max_size=2, ttl=60)
+        cached = completion()
+        cache.set("a", cached)
+        cached.post_processed_predictions["predictions"][0] = "changed"
+        cache.get("a").task_results[0]["prediction"] = "changed"
+        self.assertEqual(cache.get("a"), completion())
+
+    def test_least_recently_used_is_evicted(self):
+        cache = CompletionCache(max_size=2, ttl=60)
+        cache.set("a", completion("a"))
+        cache.set("b", completion("b"))
+        cache.get("a")
+        cache.set("c", completion("c"))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), completion("a"))
+        self.assertEqual(cache.get("c"), completion("c"))
+
+    @patch("time.monotonic")
+    def test_entries_expire(self, monotonic):
+        cache = CompletionCache(max_size=2, ttl=60)
+        monotonic.return_value = 1000
+        cache.set("a", completion())
+        monotonic.return_value = 1059
+        self.assertIsNotNone(cache.get("a"))
+        monotonic.return_value = 1060
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+def get_context(organization=None, user_pk=1, prompt="    - name: ping\n", trial=False):
+    user = Mock(
+        pk=user_pk, organization=organization, rh_user_has_seat=True, has_active_trial=trial
+    )
+    payload = APIPayload(
+        model="a-model",
+        prompt=prompt,
+        context="---\n",
+        original_prompt=prompt,
+        suggestionId=uuid.uuid4(),
+    )
+    return CompletionContext(request=Mock(user=user), payload=payload)
+
+
+class TestCompletionCacheKey(SimpleTestCase):
+    def test_same_request(self):
+        organization = Mock(id=1, completion_cache_opt_out=False)
+        self.assertEqual(
+            get_completion_cache_key(get_context(organization, user_pk=1)),
+            get_completion_cache_key(get_context(organization, user_pk=2)),
+        )
+
+    def test_organizations(self):
+        self.assertNotEqual(
+            get_completion_cache_key(get_context(Mock(id=1, completion_cache_opt_out=False))),
+            get_completion_cache_key(get_context(Mock(id=2, completion_cache_opt_out=False))),
+        )
+
+    def test_users_without_organization(self):
+        self.assertNotEqual(
+            get_completion_cache_key(get_context(user_pk=1)),
+            get_completion_cache_key(get_context(user_pk=2)),
+        )
+
+    def test_prompts(self):
+        self.assertNotEqual(
+            get_completion_cache_key(get_context(prompt="    - name: ping\n")),
+            get_completion_cache_key(get_context(prompt="    - name: pong\n")),
+        )
+
+    def test_postprocess_settings(self):
+        context = get_context()
+        with override_settings(ENABLE_ANSIBLE_LINT_POSTPROCESS=False):
+            key = get_completion_cache_key(context)
+        with override_settings(ENABLE_ANSIBLE_LINT_POSTPROCESS=True):
+            self.assertNotEqual(get_completion_cache_key(context), key)
+
+    @override_settings(ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL=True)
+    def test_trial_users(self):
+        # The users of a trial are served by another model, with another API key
+        organization = Mock(id=1, completion_cache_opt_out=False)
+        self.assertNotEqual(
+            get_completion_cache_key(get_context(organization, user_pk=1, trial=True)),
+            get_completion_cache_key(get_context(organization, user_pk=2)),
+        )
+        self.assertEqual(
+            get_completion_cache_key(get_context(organization, user_pk=1, trial=True)),
+            get_completion_cache_key(get_context(organization, user_pk=2, trial=True)),
+        )
+
+    def test_organization_opt_out(self):
+        organization = Mock(id=1, completion_cache_opt_out=True)
+        self.assertIsNone(get_completion_cache_key(get_context(organization)))
+
+
+@patch("ansible_ai_connect.ai.api.pipelines.completion_stages.cache.ResponseStage", Mock())
+@patch("ansible_ai_connect.ai.api.pipelines.completion_stages.cache.send_segment_event")
+class TestCacheStages(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = CompletionCache(max_size=2, ttl=60)
+        patcher = patch.object(
+            apps.get_app_config("ai"), "get_completion_cache", return_value=self.cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.organization = Mock(id=1, completion_cache_opt_out=False)
+
+    def store(self):
+        context = get_context(self.organization)
+        CacheLookupStage().process(context)
+        cached = completion()
+        context.model_id = cached.model_id
+        context.predictions = cached.predictions
+        context.post_processed_predictions = cached.post_processed_predictions
+        context.task_results = cached.task_results
+        context.segment_events = [
+            (
+                "prediction",
+                {
+                    "duration": 800.0,
+                    "request": {"instances": [{"suggestionId": str(context.payload.suggestionId)}]},
+                    "response": cached.predictions,
+                    "suggestionId": str(context.payload.suggestionId),
+                },
+            ),
+            ("postprocess", {"duration": 50.0, "suggestionId": str(context.payload.suggestionId)}),
+        ]
+        CacheStoreStage().process(context)
+        return context
+
+    def test_hit_sends_segment_events(self, send_segment_event):
+        self.store()
+        context = get_context(self.organization, user_pk=2)
+        CacheLookupStage().process(context)
+
+        self.assertEqual(
+            context.post_processed_predictions, completion().post_processed_predictions
+        )
+        self.assertEqual(
+            [call[0][1] for call in send_segment_event.call_args_list],
+            ["prediction", "postprocess"],
+        )
+        suggestion_id = str(context.payload.suggestionId)
+        for call in send_segment_event.call_args_list:
+            event, _, user = call[0]
+            self.assertEqual(event["suggestionId"], suggestion_id)
+            self.assertTrue(event["cached"])
+            self.assertLess(event["duration"], 50.0)
+            self.assertIs(user, context.request.user)
+        prediction = send_segment_event.call_args_list[0][0][0]
+        self.assertEqual(prediction["request"]["instances"][0]["suggestionId"], suggestion_id)
+        self.assertEqual(prediction["response"], completion().predictions)
+
+    def test_miss_sends_no_events(self, send_segment_event):
+        CacheLookupStage().process(get_context(self.organization))
+        send_segment_event.assert_not_called()
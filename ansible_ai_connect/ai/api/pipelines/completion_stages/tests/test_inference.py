@@ -0,0 +1,159 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.ai.api.data.data_model import APIPayload
+from ansible_ai_connect.ai.api.exceptions import RequestDeadlineExceededException
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
+from ansible_ai_connect.ai.api.pipelines.completion_context import CompletionContext
+from ansible_ai_connect.ai.api.pipelines.completion_stages import inference
+from ansible_ai_connect.ai.api.pipelines.completion_stages.inference import (
+    InferenceStage,
+)
+from ansible_ai_connect.ai.api.utils.single_flight import SingleFlight
+
+PREDICTIONS = {"model_id": "a-model", "predictions": ["    ansible.builtin.ping:\n"]}
+
+
+class ObservedSingleFlight(SingleFlight):
+    """Lets the inference wait until all the requests have joined a call."""
+
+    def __init__(self, expected_claims):
+        super().__init__()
+        self.claims = 0
+        self.expected_claims = expected_claims
+        self.all_claimed = threading.Event()
+
+    def _claim(self, key):
+        claim = super()._claim(key)
+        with self._lock:
+            self.claims += 1
+            if self.claims == self.expected_claims:
+                self.all_claimed.set()
+        return claim
+
+
+def get_coalesced_count():
+    name = "model_prediction_coalesced_total"
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def get_context(org_id=None, user_pk=1, prompt="- name: ping\n", trial=False):
+    organization = Mock(id=org_id) if org_id else None
+    user = Mock(pk=user_pk, organization=organization, has_active_trial=trial)
+    payload = APIPayload(model="a-model", prompt=prompt, context="---\n", suggestionId=uuid.uuid4())
+    return CompletionContext(request=Mock(user=user), payload=payload)
+
+
+@patch("ansible_ai_connect.ai.api.pipelines.completion_stages.inference.send_segment_event")
+class TestInferenceStageCoalescing(SimpleTestCase):
+    def run_concurrently(self, contexts):
+        flight = ObservedSingleFlight(len(contexts))
+        calls = []
+
+        def infer(*args, **kwargs):
+            calls.append(kwargs["suggestion_id"])
+            flight.all_claimed.wait(timeout=5)
+            return {"model_id": "a-model", "predictions": ["    ansible.builtin.ping:\n"]}
+
+        client = Mock(infer=Mock(side_effect=infer))
+        with (
+            patch.object(apps.get_app_config("ai"), "model_mesh_client", client),
+            patch.object(inference, "inflight_predictions", flight),
+            ThreadPoolExecutor(max_workers=len(contexts)) as executor,
+        ):
+            futures = [executor.submit(InferenceStage().process, c) for c in contexts]
+            for f in futures:
+                f.result(timeout=5)
+        return calls
+
+    def test_identical_requests_are_coalesced(self, send_segment_event):
+        coalesced = get_coalesced_count()
+        contexts = [get_context(org_id=1, user_pk=pk) for pk in range(3)]
+
+        calls = self.run_concurrently(contexts)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(get_coalesced_count(), coalesced + 2)
+        for context in contexts:
+            self.assertEqual(context.predictions, PREDICTIONS)
+        # Each request owns its predictions
+        contexts[0].predictions["predictions"][0] = "changed"
+        self.assertEqual(contexts[1].predictions, PREDICTIONS)
+        # Every request still reports its own prediction event
+        self.assertEqual(send_segment_event.call_count, 3)
+        suggestion_ids = {c[0][0]["suggestionId"] for c in send_segment_event.call_args_list}
+        self.assertEqual(suggestion_ids, {str(c.payload.suggestionId) for c in contexts})
+
+    def test_organizations_are_not_coalesced(self, _):
+        calls = self.run_concurrently([get_context(org_id=1), get_context(org_id=2)])
+        self.assertEqual(len(calls), 2)
+
+    def test_users_without_organization_are_not_coalesced(self, _):
+        calls = self.run_concurrently([get_context(user_pk=1), get_context(user_pk=2)])
+        self.assertEqual(len(calls), 2)
+
+    def test_different_prompts_are_not_coalesced(self, _):
+        calls = self.run_concurrently(
+            [get_context(org_id=1), get_context(org_id=1, prompt="- name: pong\n")]
+        )
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL=True)
+    def test_trial_and_seated_users_are_not_coalesced(self, _):
+        # The users of a trial are served by another model, with another API key
+        calls = self.run_concurrently(
+            [get_context(org_id=1, user_pk=1, trial=True), get_context(org_id=1, user_pk=2)]
+        )
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL=True)
+    def test_trial_users_are_coalesced(self, _):
+        calls = self.run_concurrently(
+            [
+                get_context(org_id=1, user_pk=1, trial=True),
+                get_context(org_id=1, user_pk=2, trial=True),
+            ]
+        )
+        self.assertEqual(len(calls), 1)
+
+    @override_settings(ANSIBLE_AI_ENABLE_COMPLETION_COALESCING=False)
+    def test_coalescing_disabled(self, _):
+        contexts = [get_context(org_id=1), get_context(org_id=1)]
+        client = Mock(infer=Mock(return_value=PREDICTIONS))
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", client):
+            for context in contexts:
+                InferenceStage().process(context)
+        self.assertEqual(client.infer.call_count, 2)
+
+
+@patch("ansible_ai_connect.ai.api.pipelines.completion_stages.inference.send_segment_event")
+class TestInferenceStageDeadline(SimpleTestCase):
+    def test_deadline_exceeded(self, send_segment_event):
+        client = Mock(infer=Mock(side_effect=DeadlineExceeded()))
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", client):
+            with self.assertRaises(RequestDeadlineExceededException):
+                InferenceStage().process(get_context())
+        event = send_segment_event.call_args[0][0]
+        self.assertEqual(event["problem"], "DeadlineExceeded")
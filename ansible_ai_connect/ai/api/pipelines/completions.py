@@ -14,11 +14,20 @@
 
 import logging
 
+from django.conf import settings
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from ansible_ai_connect.ai.api.exceptions import InternalServerError
+from ansible_ai_connect.ai.api.exceptions import (
+    InternalServerError,
+    RequestDeadlineExceededException,
+)
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
 from ansible_ai_connect.ai.api.pipelines.common import Pipeline
+from ansible_ai_connect.ai.api.pipelines.completion_stages.cache import (
+    CacheLookupStage,
+    CacheStoreStage,
+)
 from ansible_ai_connect.ai.api.pipelines.completion_stages.deserialise import (
     DeserializeStage,
 )
@@ -32,6 +41,7 @@ from ansible_ai_connect.ai.api.pipelines.completion_stages.pre_process import (
     PreProcessStage,
 )
 from ansible_ai_connect.ai.api.pipelines.completion_stages.response import ResponseStage
+from ansible_ai_connect.ai.api.utils.deadline import Deadline
 
 from .completion_context import CompletionContext
 
@@ -40,23 +50,57 @@ logger = logging.getLogger(__name__)
 
 class CompletionsPipeline(Pipeline[Response, CompletionContext]):
     def __init__(self, request: Request):
-        self.context = CompletionContext(request=request)
+        self.context = CompletionContext(
+            request=request, deadline=Deadline(settings.ANSIBLE_AI_COMPLETION_DEADLINE)
+        )
         super().__init__(
             [
                 DeserializeStage(),
                 PreProcessStage(),
+                CacheLookupStage(),
                 InferenceStage(),
                 PostProcessStage(),
+                CacheStoreStage(),
                 ResponseStage(),
             ],
             self.context,
         )
 
     def execute(self) -> Response:
-        for pe in self.pipeline:
-            pe.process(context=self.context)
-            if self.context.response:
-                return self.context.response
+        deadline = self.context.deadline
+        timings = self.context.timings
+        try:
+            with deadline.activate(), timings.activate(), self.context.documents.activate():
+                for pe in self.pipeline:
+                    deadline.check(type(pe).__name__)
+                    with timings.span(pe.name):
+                        pe.process(context=self.context)
+                    if self.context.response:
+                        return self.add_server_timing(self.context.response)
+        except DeadlineExceeded as e:
+            raise RequestDeadlineExceededException(cause=e)
+        raise InternalServerError(
+            "Pipeline terminated abnormally. 'response' not found in context."
+        )
+
+    async def aexecute(self) -> Response:
+        deadline = self.context.deadline
+        timings = self.context.timings
+        try:
+            with deadline.activate(), timings.activate(), self.context.documents.activate():
+                for pe in self.pipeline:
+                    deadline.check(type(pe).__name__)
+                    with timings.span(pe.name):
+                        await pe.aprocess(context=self.context)
+                    if self.context.response:
+                        return self.add_server_timing(self.context.response)
+        except DeadlineExceeded as e:
+            raise RequestDeadlineExceededException(cause=e)
         raise InternalServerError(
             "Pipeline terminated abnormally. 'response' not found in context."
         )
+
+    def add_server_timing(self, response: Response) -> Response:
+        if settings.ANSIBLE_AI_ENABLE_SERVER_TIMING:
+            response["Server-Timing"] = self.context.timings.server_timing()
+        return response
@@ -18,7 +18,6 @@ DRF Serializer classes for input/output validations and OpenAPI document generat
 
 import uuid
 
-import yaml
 from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -35,6 +34,7 @@ from .fields import (
     AnonymizedCharField,
     AnonymizedPromptCharField,
 )
+from .utils.documents import load_yaml
 
 
 class Metadata(serializers.Serializer):
@@ -129,7 +129,7 @@ class CompletionRequestSerializer(Metadata):
                 raise serializers.ValidationError({"prompt": "maximum task request size exceeded"})
         else:
             # Confirm the prompt contains some flavor of '- name:'
-            prompt_list = yaml.load(prompt, Loader=yaml.SafeLoader)
+            prompt_list = load_yaml(prompt)
             if (
                 not isinstance(prompt_list, list)
                 or len(prompt_list) != 1
@@ -367,6 +367,15 @@ class ExplanationRequestSerializer(Metadata):
             "A UUID that identifies the particular explanation data is being requested for."
         ),
     )
+    stream = serializers.BooleanField(
+        required=False,
+        default=False,
+        label="stream",
+        help_text=(
+            "Indicates whether the explanation should be streamed as Server-Sent Events "
+            "while it is generated."
+        ),
+    )
     metadata = Metadata(required=False)
 
 
@@ -392,6 +401,7 @@ class GenerationRequestSerializer(serializers.Serializer):
             "createOutline",
             "ansibleExtensionVersion",
             "outline",
+            "stream",
         ]
 
     text = AnonymizedCharField(
@@ -425,6 +435,15 @@ class GenerationRequestSerializer(serializers.Serializer):
         label="wizard ID",
         help_text=("A UUID to track the succession of interaction from the user."),
     )
+    stream = serializers.BooleanField(
+        required=False,
+        default=False,
+        label="stream",
+        help_text=(
+            "Indicates whether the playbook should be streamed as Server-Sent Events "
+            "while it is generated."
+        ),
+    )
 
     metadata = Metadata(required=False)
 
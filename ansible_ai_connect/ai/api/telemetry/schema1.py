@@ -66,7 +66,7 @@ class Schema1Event:
         self._user = user
         self.rh_user_has_seat = user.rh_user_has_seat
         self.rh_user_org_id = user.org_id
-        self.groups = list(user.groups.values_list("name", flat=True))
+        self.groups = list(getattr(user, "group_names", []))
 
     def set_request(self, request):
         self.set_user(request.user)
@@ -23,7 +23,7 @@ class TestSchema1Event(TestCase):
         m_user = mock.Mock()
         m_user.rh_user_has_seat = True
         m_user.org_id = 123
-        m_user.groups.values_list.return_value = ["mecano"]
+        m_user.group_names = ["mecano"]
         event1 = Schema1Event()
         event1.set_user(m_user)
         self.assertEqual(event1.rh_user_has_seat, True)
@@ -32,7 +32,7 @@ class TestSchema1Event(TestCase):
 
     def test_set_request(self):
         m_request = mock.Mock()
-        m_request.user.groups.values_list.return_value = []
+        m_request.user.group_names = []
         m_request.path = "/trial"
         m_request.method = "POST"
         event1 = Schema1Event()
@@ -61,7 +61,7 @@ class TestOneClickTrialStartedEvent(TestCase):
         m_plan.expired_at = str(datetime.now() + timedelta(days=30))
         m_plan.is_expired = False
         m_user = mock.Mock()
-        m_user.groups.values_list.return_value = []
+        m_user.group_names = []
         m_user.userplan_set.all.return_value = [m_plan]
         event1 = OneClickTrialStartedEvent()
         event1.set_user(m_user)
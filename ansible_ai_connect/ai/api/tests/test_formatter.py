@@ -14,7 +14,11 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from multiprocessing.pool import ThreadPool
+from unittest import mock
+
 from ansible_ai_connect.ai.api import formatter as fmtr
+from ansible_ai_connect.ai.api.utils.documents import YamlDocuments, load_yaml
 from ansible_ai_connect.test_utils import WisdomServiceLogAwareTestCase
 
 
@@ -178,6 +182,60 @@ class AnsibleDumperTestCase(WisdomServiceLogAwareTestCase):
         expected = 'loop:\n  - ssh\n  - nginx\n  - "{{ name }}"'
         self.assertEqual(fmtr.adjust_indentation(original_yaml), expected)
 
+    def test_adjust_indentation_reuses_yaml(self):
+        samples = [
+            ("loop:\n- 'ssh'\n- nginx", "loop:\n  - ssh\n  - nginx"),
+            (
+                "- name: a\n  debug:\n    msg: '{{ b }}'",
+                '  - name: a\n    debug:\n      msg: "{{ b }}"',
+            ),
+        ] * 4
+        fmtr.clear_caches()
+        with ThreadPool(2) as pool:
+            results = pool.starmap(
+                lambda yaml, expected: (fmtr.adjust_indentation(yaml), expected), samples
+            )
+        for result, expected in results:
+            self.assertEqual(result, expected)
+        self.assertIs(fmtr._get_indentation_yaml(), fmtr._get_indentation_yaml())
+
+    def test_normalize_yaml_cache(self):
+        yaml = "- name: cached\n  debug:\n    msg: hello\n"
+        fmtr.clear_caches()
+        with mock.patch.object(fmtr, "_dump_yaml", wraps=fmtr._dump_yaml) as dump_yaml:
+            first = fmtr.normalize_yaml(yaml)
+            second = fmtr.normalize_yaml(yaml)
+            # Expanding the variables of the context is not cached
+            fmtr.normalize_yaml(
+                yaml,
+                "tasks",
+                {"standaloneTaskContext": {"includeVars": {"vars.yml": "var1: value1"}}},
+            )
+        self.assertEqual(first, second)
+        self.assertEqual(dump_yaml.call_count, 2)
+
+    def test_preprocess_context_is_not_cached(self):
+        fmtr.clear_caches()
+        fmtr.preprocess("- hosts: all\n  tasks:\n", "    - name: install nginx\n")
+        self.assertEqual(len(fmtr._get_cache("formatter_normalize")), 0)
+
+    def test_cache_max_bytes(self):
+        fmtr.clear_caches()
+        with self.settings(ANSIBLE_AI_FORMATTER_CACHE_MAX_BYTES=1024):
+            for i in range(100):
+                fmtr.normalize_yaml(f"- name: task {i}\n  debug:\n    msg: hello\n")
+            cache = fmtr._get_cache("formatter_normalize")
+            self.assertLessEqual(cache.size, 1024)
+            self.assertLess(len(cache), 100)
+        fmtr.clear_caches()
+
+    def test_cache_disabled(self):
+        fmtr.clear_caches()
+        with self.settings(ANSIBLE_AI_FORMATTER_CACHE_MAX_BYTES=0):
+            self.assertEqual(fmtr.adjust_indentation("loop:\n- ssh"), "loop:\n  - ssh")
+            self.assertIsNone(fmtr._get_cache("formatter_indentation"))
+        fmtr.clear_caches()
+
     def test_empty_yaml(self):
         # make sure no preprocessing is performed against an empty input
         context = "---"
@@ -309,6 +367,17 @@ var3: value3
         returned = fmtr.load_and_merge_vars_in_context(vars_in_context)
         self.assertEqual(expected, returned)
 
+    def test_normalize_yaml_with_documents(self):
+        tasks = "- name: Install ssh\n  ansible.builtin.package:\n    name: ssh\n"
+        additional_context = {
+            "standaloneTaskContext": {"includeVars": {"vars.yml": "var1: value1"}}
+        }
+        with YamlDocuments().activate():
+            normalized = fmtr.normalize_yaml(tasks, "tasks", additional_context)
+            # The shared document is left as loaded
+            self.assertEqual(len(load_yaml(tasks)), 1)
+        self.assertIn("Set variables from context", normalized)
+
     def test_insert_set_fact_task(self):
         data = [{"dummy data"}]
         merged_vars = {"var1": "value1", "var2": {"key": "value2"}, "var3": "value3"}
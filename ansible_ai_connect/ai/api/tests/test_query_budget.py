@@ -0,0 +1,153 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import datetime
+import uuid
+from http import HTTPStatus
+from unittest.mock import Mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from oauth2_provider.models import AccessToken
+
+from ansible_ai_connect.ai.api.tests.test_views import WisdomServiceAPITestCaseBaseOIDC
+from ansible_ai_connect.test_utils import WisdomAppsBackendMocking
+
+PLAYBOOK = """---
+- name: Setup nginx
+  hosts: all
+  become: true
+  tasks:
+    - name: Install nginx on RHEL9
+      ansible.builtin.dnf:
+        name: nginx
+        state: present
+"""
+
+# The most queries a request to each endpoint may run, with the authentication, the
+# throttling (6 queries with the database cache) and the entitlement checks. Raise a
+# budget only for a query the endpoint really needs, not one more per use of the user.
+QUERY_BUDGETS = {
+    "me": 10,
+    "completions": 11,
+    "feedback": 10,
+    "contentmatches": 11,
+    "explanations": 11,
+    "generations": 11,
+}
+# With the access token resolved from the cache, only its user is read from the database
+CACHED_TOKEN_QUERY_BUDGETS = {endpoint: budget - 1 for endpoint, budget in QUERY_BUDGETS.items()}
+
+
+@override_settings(WCA_SECRET_BACKEND_TYPE="dummy")
+@override_settings(WCA_SECRET_DUMMY_SECRETS="1981:valid")
+@override_settings(AUTHZ_BACKEND_TYPE="dummy")
+@override_settings(AUTHZ_DUMMY_ORGS_WITH_SUBSCRIPTION="1981")
+# The entitlements are checked by every request, as when their cache expires
+@override_settings(ENTITLEMENTS_CACHE_TTL=0)
+class TestQueryBudget(WisdomAppsBackendMocking, WisdomServiceAPITestCaseBaseOIDC):
+    budgets = QUERY_BUDGETS
+
+    def setUp(self):
+        super().setUp()
+        token = AccessToken.objects.create(
+            token=uuid.uuid4().hex,
+            user=self.user,
+            scope="read write",
+            expires=now() + datetime.timedelta(minutes=10),
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.token}")
+
+        model_client = Mock()
+        model_client.supports_ari_postprocessing.return_value = False
+        model_client.get_model_id.return_value = "a-model-id"
+        model_client.infer.return_value = {
+            "predictions": ["      ansible.builtin.dnf:\n        name: nginx\n"],
+            "model_id": "a-model-id",
+        }
+        model_client.codematch.return_value = (
+            "a-model-id",
+            [
+                {
+                    "code_matches": [
+                        {
+                            "repo_name": "fake.collection",
+                            "repo_url": "https://galaxy.ansible.com/fake/collection",
+                            "path": "plugins/modules/dnf.py",
+                            "license": "gpl-3.0",
+                            "data_source_description": "Ansible Galaxy collections",
+                            "score": 0.9,
+                        }
+                    ],
+                    "meta": {"encode_duration": 1.0, "search_duration": 2.0},
+                }
+            ],
+        )
+        model_client.explain_playbook.return_value = "# Information\nInstalls nginx.\n"
+        model_client.generate_playbook.return_value = (PLAYBOOK, "1. Install nginx")
+        self.mock_model_client_with(model_client)
+
+    def assertQueryBudget(self, endpoint, method, payload=None):
+        # The first request warms up the caches shared by the requests
+        getattr(self.client, method)(reverse(endpoint), payload, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            r = getattr(self.client, method)(reverse(endpoint), payload, format="json")
+        self.assertEqual(r.status_code, HTTPStatus.OK, r.content)
+        self.assertLessEqual(
+            len(queries),
+            self.budgets[endpoint],
+            "\n".join(q["sql"][:150] for q in queries.captured_queries),
+        )
+
+    def test_me(self):
+        self.assertQueryBudget("me", "get")
+
+    def test_completions(self):
+        payload = {
+            "prompt": PLAYBOOK + "    - name: Start nginx\n",
+            "suggestionId": str(uuid.uuid4()),
+        }
+        self.assertQueryBudget("completions", "post", payload)
+
+    def test_feedback(self):
+        payload = {"sentimentFeedback": {"value": 4, "feedback": "Nice"}}
+        self.assertQueryBudget("feedback", "post", payload)
+
+    def test_contentmatches(self):
+        payload = {
+            "suggestions": ["      ansible.builtin.dnf:\n        name: nginx\n"],
+            "suggestionId": str(uuid.uuid4()),
+        }
+        self.assertQueryBudget("contentmatches", "post", payload)
+
+    def test_explanations(self):
+        payload = {"content": PLAYBOOK, "explanationId": str(uuid.uuid4())}
+        self.assertQueryBudget("explanations", "post", payload)
+
+    def test_generations(self):
+        payload = {"text": "Install nginx", "generationId": str(uuid.uuid4())}
+        self.assertQueryBudget("generations", "post", payload)
+
+
+@override_settings(OAUTH2_TOKEN_CACHE_TTL=60)
+class TestQueryBudgetWithTokenCache(TestQueryBudget):
+    budgets = CACHED_TOKEN_QUERY_BUDGETS
+
+    def setUp(self):
+        super().setUp()
+        caches["oauth2_tokens"].clear()
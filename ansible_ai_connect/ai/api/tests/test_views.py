@@ -23,9 +23,10 @@ import uuid
 from http import HTTPStatus
 from typing import Any, Dict, Optional, Union
 from unittest import skip
-from unittest.mock import ANY, Mock, patch
+from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import requests
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -38,7 +39,11 @@ from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_core.runnables.utils import Input, Output
 from requests.exceptions import ReadTimeout
 from rest_framework.exceptions import APIException
-from rest_framework.test import APITransactionTestCase
+from rest_framework.test import (
+    APIRequestFactory,
+    APITransactionTestCase,
+    force_authenticate,
+)
 from segment import analytics
 
 from ansible_ai_connect.ai.api.data.data_model import APIPayload
@@ -88,6 +93,7 @@ from ansible_ai_connect.ai.api.pipelines.completion_stages.response import (
 )
 from ansible_ai_connect.ai.api.serializers import CompletionRequestSerializer
 from ansible_ai_connect.ai.api.utils import segment_analytics_telemetry
+from ansible_ai_connect.ai.api.views import AsyncCompletions
 from ansible_ai_connect.main.tests.test_views import create_user_with_provider
 from ansible_ai_connect.organizations.models import Organization
 from ansible_ai_connect.test_utils import (
@@ -190,6 +196,23 @@ class MockedMeshClient(ModelMeshClient):
         return self.response_data
 
 
+def get_sse_events(response) -> list[tuple[str, Any]]:
+    content = b"".join(response.streaming_content).decode()
+    events = []
+    for block in content.split("\n\n"):
+        if block:
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def streamed_answer(chunks, result=None, error=None):
+    yield from chunks
+    if error:
+        raise error
+    return result
+
+
 class WisdomServiceAPITestCaseBase(APITransactionTestCase, WisdomServiceLogAwareTestCase):
     @classmethod
     def setUpClass(cls):
@@ -1381,6 +1404,100 @@ class TestCompletionView(WisdomServiceAPITestCaseBase):
                 self.assertSegmentTimestamp(log)
 
 
+@override_settings(ANSIBLE_AI_ENABLE_TECH_PREVIEW=True)
+@override_settings(ANSIBLE_AI_COMPLETION_CACHE_SIZE=10)
+class TestCompletionCacheView(WisdomServiceAPITestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.user.organization = Organization.objects.get_or_create(id=1)[0]
+        self.user.save()
+        patcher = patch.object(apps.get_app_config("ai"), "_completion_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post_twice(self):
+        prompt = "---\n- hosts: all\n  become: yes\n\n  tasks:\n    - name: Install Apache\n"
+        response_data = {
+            "model_id": settings.ANSIBLE_AI_MODEL_MESH_MODEL_ID,
+            "predictions": ["      ansible.builtin.apt:\n        name: apache2"],
+        }
+        model_client = MockedMeshClient(self, {}, response_data, test_inference_match=False)
+        self.client.force_authenticate(user=self.user)
+        responses = []
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", model_client):
+            with patch.object(model_client, "infer", wraps=model_client.infer) as infer:
+                for _ in range(2):
+                    payload = {"prompt": prompt, "suggestionId": str(uuid.uuid4())}
+                    r = self.client.post(reverse("completions"), payload)
+                    self.assertEqual(r.status_code, HTTPStatus.OK)
+                    self.assertEqual(r.data["suggestionId"], uuid.UUID(payload["suggestionId"]))
+                    responses.append(r)
+        return infer.call_count, responses
+
+    def test_hit(self):
+        infer_count, responses = self.post_twice()
+        self.assertEqual(infer_count, 1)
+        self.assertEqual(responses[0].data["predictions"], responses[1].data["predictions"])
+
+    def test_organization_opt_out(self):
+        self.user.organization.completion_cache_opt_out = True
+        self.user.organization.save()
+        infer_count, _ = self.post_twice()
+        self.assertEqual(infer_count, 2)
+
+    @override_settings(ANSIBLE_AI_COMPLETION_CACHE_SIZE=0)
+    def test_disabled(self):
+        infer_count, _ = self.post_twice()
+        self.assertEqual(infer_count, 2)
+
+
+@override_settings(ANSIBLE_AI_ENABLE_TECH_PREVIEW=True)
+class TestAsyncCompletionView(WisdomServiceAPITestCaseBase):
+    def post(self, payload):
+        request = APIRequestFactory().post(reverse("completions"), payload, format="json")
+        force_authenticate(request, user=self.user)
+        return async_to_sync(AsyncCompletions.as_view())(request)
+
+    def test_view_is_async(self):
+        self.assertTrue(iscoroutinefunction(AsyncCompletions.as_view()))
+
+    def test_full_payload(self):
+        payload = {
+            "prompt": "---\n- hosts: all\n  become: yes\n\n  tasks:\n    - name: Install Apache\n",
+            "suggestionId": str(uuid.uuid4()),
+        }
+        response_data = {
+            "model_id": settings.ANSIBLE_AI_MODEL_MESH_MODEL_ID,
+            "predictions": ["      ansible.builtin.apt:\n        name: apache2"],
+        }
+        with patch.object(
+            apps.get_app_config("ai"),
+            "model_mesh_client",
+            MockedMeshClient(self, payload, response_data),
+        ):
+            r = self.post(payload)
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            r.data["predictions"], ["      ansible.builtin.apt:\n        name: apache2\n"]
+        )
+
+    def test_model_timeout(self):
+        payload = {
+            "prompt": "---\n- hosts: all\n  become: yes\n\n  tasks:\n    - name: Install Apache\n",
+            "suggestionId": str(uuid.uuid4()),
+        }
+        model_client = MockedMeshClient(self, payload, {})
+        model_client.ainfer = AsyncMock(side_effect=ModelTimeoutError)
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", model_client):
+            r = self.post(payload)
+        self.assertEqual(r.status_code, HTTPStatus.NO_CONTENT)
+
+    def test_unauthenticated(self):
+        request = APIRequestFactory().post(reverse("completions"), {}, format="json")
+        r = async_to_sync(AsyncCompletions.as_view())(request)
+        self.assertEqual(r.status_code, HTTPStatus.UNAUTHORIZED)
+
+
 @modify_settings()
 @override_settings(SEGMENT_WRITE_KEY="DUMMY_KEY_VALUE")
 class TestFeedbackView(WisdomServiceAPITestCaseBase):
@@ -2546,6 +2663,67 @@ This playbook emails admin@redhat.com with a list of passwords.
             r = self.client.post(reverse("explanations"), payload, format="json")
             self.assertEqual(r.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
 
+    def test_stream(self):
+        explanation_id = str(uuid.uuid4())
+        payload = {
+            "content": "- hosts: all\n",
+            "explanationId": explanation_id,
+            "stream": True,
+            "ansibleExtensionVersion": "24.4.0",
+        }
+        mocked_client = Mock()
+        mocked_client.get_model_id.return_value = "a-model"
+        mocked_client.stream_explanation.return_value = streamed_answer(
+            [
+                "# Information\nThis playbook emails ad",
+                "min@redhat.com with a list of passwords.\n",
+            ],
+            self.response_pii_data,
+        )
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", mocked_client):
+            self.client.force_authenticate(user=self.user)
+            with self.assertLogs(logger="root", level="DEBUG") as log:
+                r = self.client.post(reverse("explanations"), payload, format="json")
+                self.assertEqual(r.status_code, HTTPStatus.OK)
+                self.assertEqual(r["Content-Type"], "text/event-stream")
+                events = get_sse_events(r)
+                segment_events = self.extractSegmentEventsFromLog(log)
+
+        self.assertEqual([e for e, _ in events], ["token", "token", "done"])
+        # The second chunk is held until its line is complete
+        self.assertTrue(events[1][1]["content"].startswith("This playbook emails"))
+        self.assertNotIn("admin@redhat.com", events[1][1]["content"])
+        streamed = "".join(data["content"] for _, data in events[:2])
+        self.assertEqual(streamed, events[2][1]["content"])
+        self.assertEqual(events[2][1]["format"], "markdown")
+        self.assertEqual(events[2][1]["explanationId"], explanation_id)
+        self.assertNotIn("admin@redhat.com", events[2][1]["content"])
+        self.assertEqual(segment_events[0]["event"], "explainPlaybook")
+        self.assertFalse(segment_events[0]["properties"]["exception"])
+
+    def test_stream_interrupted(self):
+        payload = {
+            "content": "- hosts: all\n",
+            "stream": True,
+            "ansibleExtensionVersion": "24.4.0",
+        }
+        mocked_client = Mock()
+        mocked_client.get_model_id.return_value = "a-model"
+        mocked_client.stream_explanation.return_value = streamed_answer(
+            ["# Information\n"], error=Exception("Dummy Exception")
+        )
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", mocked_client):
+            self.client.force_authenticate(user=self.user)
+            with self.assertLogs(logger="root", level="DEBUG") as log:
+                r = self.client.post(reverse("explanations"), payload, format="json")
+                events = get_sse_events(r)
+                segment_events = self.extractSegmentEventsFromLog(log)
+
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual([e for e, _ in events], ["token", "error"])
+        self.assertEqual(events[1][1]["code"], "service_unavailable")
+        self.assertTrue(segment_events[0]["properties"]["exception"])
+
 
 @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="wca")
 class TestExplanationViewWithWCA(WisdomAppsBackendMocking, WisdomServiceAPITestCaseBase):
@@ -2871,6 +3049,46 @@ class TestGenerationView(WisdomAppsBackendMocking, WisdomServiceAPITestCaseBase)
             r = self.client.post(reverse("generations"), payload, format="json")
             self.assertEqual(r.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
 
+    @override_settings(ANSIBLE_AI_ENABLE_TECH_PREVIEW=True)
+    def test_stream(self):
+        generation_id = str(uuid.uuid4())
+        payload = {
+            "text": "Install nginx on RHEL9",
+            "generationId": generation_id,
+            "createOutline": True,
+            "stream": True,
+            "ansibleExtensionVersion": "24.4.0",
+        }
+        mocked_client = Mock()
+        mocked_client.stream_playbook.return_value = streamed_answer(
+            ["- hosts: rhel9\n", "  tasks:\n"], ("- hosts: rhel9\n  tasks:\n", "1. Nothing")
+        )
+        with patch.object(apps.get_app_config("ai"), "model_mesh_client", mocked_client):
+            self.client.force_authenticate(user=self.user)
+            r = self.client.post(reverse("generations"), payload, format="json")
+            self.assertEqual(r.status_code, HTTPStatus.OK)
+            events = get_sse_events(r)
+
+        mocked_client.stream_playbook.assert_called_with(
+            ANY, "Install nginx on RHEL9", True, "", generation_id
+        )
+        self.assertEqual(
+            events,
+            [
+                ("token", {"content": "- hosts: rhel9\n"}),
+                ("token", {"content": "  tasks:\n"}),
+                (
+                    "done",
+                    {
+                        "playbook": "- hosts: rhel9\n  tasks:\n",
+                        "outline": "1. Nothing",
+                        "format": "plaintext",
+                        "generationId": generation_id,
+                    },
+                ),
+            ],
+        )
+
 
 @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="wca")
 class TestGenerationViewWithWCA(WisdomAppsBackendMocking, WisdomServiceAPITestCaseBase):
@@ -2951,6 +3169,20 @@ class TestGenerationViewWithWCA(WisdomAppsBackendMocking, WisdomServiceAPITestCa
             "A WCA Api Key was expected but not found for playbook generation",
         )
 
+    def test_stream_missing_api_key(self):
+        # Errors raised before the model answers keep their status code
+        model_client = self.stub_wca_client(
+            403,
+            mock_api_key=Mock(side_effect=WcaKeyNotFound),
+        )
+        self.payload = {**self.payload, "stream": True}
+        self.assert_test(
+            model_client,
+            HTTPStatus.FORBIDDEN,
+            WcaKeyNotFoundException,
+            "A WCA Api Key was expected but not found for playbook generation",
+        )
+
     def test_missing_model_id(self):
         model_client = self.stub_wca_client(
             403,
@@ -12,12 +12,22 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from django.conf import settings
 from django.urls import path
 
-from .views import Completions, ContentMatches, Explanation, Feedback, Generation
+from .views import (
+    AsyncCompletions,
+    Completions,
+    ContentMatches,
+    Explanation,
+    Feedback,
+    Generation,
+)
+
+completions_view = AsyncCompletions if settings.ANSIBLE_AI_ENABLE_ASYNC_COMPLETIONS else Completions
 
 urlpatterns = [
-    path("completions/", Completions.as_view(), name="completions"),
+    path("completions/", completions_view.as_view(), name="completions"),
     path("contentmatches/", ContentMatches.as_view(), name="contentmatches"),
     path("explanations/", Explanation.as_view(), name="explanations"),
     path("generations/", Generation.as_view(), name="generations"),
@@ -0,0 +1,96 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Per-request deadline, shared by the completion pipeline stages and the model clients.
+"""
+
+import contextlib
+import contextvars
+import logging
+import time
+from typing import Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter
+
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+deadline_exceeded_counter = Counter(
+    "request_deadline_exceeded",
+    "Counter of requests abandoned because their deadline expired",
+    ["stage"],
+    namespace=NAMESPACE,
+)
+
+
+class Deadline:
+    """
+    Point in time a request must be answered by. Work that cannot complete before
+    it is abandoned. A deadline of None seconds never expires.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self._expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, None when there is no deadline."""
+        if self._expires_at is None:
+            return None
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self._expires_at is not None and time.monotonic() >= self._expires_at
+
+    def check(self, stage: str) -> None:
+        """Raises DeadlineExceeded, and counts it against stage, once expired."""
+        if self.expired():
+            logger.warning(f"Request deadline exceeded before {stage}")
+            deadline_exceeded_counter.labels(stage=stage).inc()
+            raise DeadlineExceeded()
+
+    def timeout(self, timeout: Optional[float], stage: str) -> Optional[float]:
+        """Clamps the timeout of a call made for stage to the remaining time."""
+        self.check(stage)
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Makes the deadline the current one, including in sync_to_async threads."""
+        token = _current_deadline.set(self)
+        try:
+            yield self
+        finally:
+            _current_deadline.reset(token)
+
+
+_no_deadline = Deadline()
+_current_deadline: contextvars.ContextVar[Deadline] = contextvars.ContextVar(
+    "deadline", default=_no_deadline
+)
+
+
+def get_deadline() -> Deadline:
+    """Returns the deadline of the request being processed, if any."""
+    return _current_deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Usable as backoff max_time, so retries stop when the deadline expires."""
+    return get_deadline().remaining()
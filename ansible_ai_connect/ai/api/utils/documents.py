@@ -0,0 +1,89 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+YAML documents of a request, parsed once and shared by the completion pipeline stages.
+"""
+
+import contextlib
+import contextvars
+import threading
+from typing import Any, Optional
+
+import yaml
+
+# libyaml parses much faster than the pure Python parser, and builds the same objects
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def safe_load(text: str) -> Any:
+    return yaml.load(text, Loader=SafeLoader)
+
+
+class YamlDocuments:
+    """
+    Parsed YAML texts. A text is parsed the first time it is loaded, later loads
+    return the same object, or raise the same error, so it must not be modified.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._documents: dict[str, tuple[Any, Optional[Exception]]] = {}
+        self.hits = 0
+
+    def load(self, text: str) -> Any:
+        with self._lock:
+            document = self._documents.get(text)
+            if document is not None:
+                self.hits += 1
+        if document is None:
+            try:
+                document = (safe_load(text), None)
+            except yaml.YAMLError as e:
+                document = (None, e)
+            # ARI tasks may load the same text in parallel, the first one is kept
+            with self._lock:
+                document = self._documents.setdefault(text, document)
+        data, error = document
+        if error is not None:
+            raise error
+        return data
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Makes load_yaml() use these documents, including in sync_to_async threads."""
+        token = _current_documents.set(self)
+        try:
+            yield self
+        finally:
+            _current_documents.reset(token)
+
+
+_current_documents: contextvars.ContextVar[Optional[YamlDocuments]] = contextvars.ContextVar(
+    "documents", default=None
+)
+
+
+def load_yaml(text: str) -> Any:
+    """
+    Safe loads text, through the documents of the request being processed if any.
+    The result must not be modified.
+    """
+    documents = _current_documents.get()
+    if documents is None:
+        return safe_load(text)
+    return documents.load(text)
@@ -0,0 +1,115 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Content-addressed cache of the ARI and ansible-lint post-processing results.
+"""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Gauge
+
+postprocess_cache_hit_counter = Counter(
+    "postprocess_cache_hit",
+    "Counter of post-processing results served from the cache",
+    ["cache"],
+    namespace=NAMESPACE,
+)
+postprocess_cache_miss_counter = Counter(
+    "postprocess_cache_miss",
+    "Counter of post-processing results not found in the cache",
+    ["cache"],
+    namespace=NAMESPACE,
+)
+postprocess_cache_entries_gauge = Gauge(
+    "postprocess_cache_entries",
+    "Number of post-processing results in the cache",
+    ["cache"],
+    namespace=NAMESPACE,
+)
+postprocess_cache_bytes_gauge = Gauge(
+    "postprocess_cache_bytes",
+    "Size of the post-processing results in the cache",
+    ["cache"],
+    namespace=NAMESPACE,
+)
+
+
+def cache_key(*parts: str) -> str:
+    """Digest of the parts, each part is length prefixed so they cannot run into each other."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class PostProcessCache:
+    """
+    Bounded, in-memory cache of post-processing results, keyed by the digest of
+    their input and of the configuration producing them.
+
+    Results are stored pickled, which makes their size known and hands out a new
+    copy on every hit. The least recently used results are evicted to keep the
+    cache under `max_bytes`.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+        if data is None:
+            postprocess_cache_miss_counter.labels(cache=self.name).inc()
+            return None
+        postprocess_cache_hit_counter.labels(cache=self.name).inc()
+        return pickle.loads(data)
+
+    def set(self, key: str, value: Any) -> None:
+        data = pickle.dumps(value)
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+            entries, size = len(self._entries), self._bytes
+        postprocess_cache_entries_gauge.labels(cache=self.name).set(entries)
+        postprocess_cache_bytes_gauge.labels(cache=self.name).set(size)
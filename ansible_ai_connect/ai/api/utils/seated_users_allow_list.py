@@ -76,6 +76,7 @@ ALLOW_LIST = {
     },
     "prediction": {
         "duration": None,
+        "cached": None,
         "exception": None,
         "problem": None,
         "request": {
@@ -107,6 +108,7 @@ ALLOW_LIST = {
         "exception": None,
         "problem": None,
         "duration": None,
+        "cached": None,
         "suggestionId": None,
         "modelName": None,
         "imageTags": None,
@@ -120,6 +122,7 @@ ALLOW_LIST = {
         "exception": None,
         "problem": None,
         "duration": None,
+        "cached": None,
         "recommendation": None,
         "truncated": None,
         "suggestionId": None,
@@ -65,7 +65,7 @@ def send_segment_event(event: Dict[str, Any], event_name: str, user: User) -> No
         event["hostname"] = platform.node()
 
     if "groups" not in event:
-        event["groups"] = list(user.groups.values_list("name", flat=True))
+        event["groups"] = list(getattr(user, "group_names", []))
 
     if "rh_user_has_seat" not in event:
         event["rh_user_has_seat"] = getattr(user, "rh_user_has_seat", False)
@@ -0,0 +1,85 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key into a single execution.
+
+    The first caller for a key (the leader) runs the function, the callers arriving
+    while it is in flight wait for it and receive the same result, or the same
+    exception. Nothing is kept once the call completes: a later caller with the same
+    key starts a new execution. Works across threads and event loops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def _claim(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Runs fn, unless a call for key is already in flight, in which case its outcome
+        is shared. Returns the result and whether it was shared.
+        """
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self._release(key, future)
+            future.set_exception(e)
+            raise
+        self._release(key, future)
+        future.set_result(result)
+        return result, False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Asynchronous counterpart of do(), fn returns an awaitable."""
+        future, leader = self._claim(key)
+        if not leader:
+            # A cancelled follower must not cancel the call the others are waiting for
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._release(key, future)
+            future.set_exception(e)
+            raise
+        self._release(key, future)
+        future.set_result(result)
+        return result, False
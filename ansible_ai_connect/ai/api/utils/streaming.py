@@ -0,0 +1,101 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Helpers of the Server-Sent Events responses streaming the answers of the models.
+"""
+
+import json
+from string import Template
+from typing import Any, Generator, Iterator, Optional
+
+from ansible_anonymizer import anonymizer
+from django.http import StreamingHttpResponse
+
+from ansible_ai_connect.ai.api.exceptions import ServiceUnavailable
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Formats a Server-Sent Event carrying JSON data."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_error_event() -> str:
+    """The event ending a stream interrupted by an error."""
+    return sse_event(
+        "error",
+        {"code": ServiceUnavailable.default_code, "message": ServiceUnavailable.default_detail},
+    )
+
+
+def sse_response(events: Iterator[str]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Disable the response buffering of the reverse proxies
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class TextStream:
+    """
+    Iterates over the text chunks a model client yields and keeps the value the
+    client returns once done in `result`.
+
+    The first chunk is requested on creation, so the errors occurring before the
+    model starts answering (missing API key, invalid model, ...) are raised to
+    the view, which still can answer with the matching error status.
+    """
+
+    def __init__(self, chunks: Generator[str, None, Any]):
+        self._chunks = chunks
+        self.result = None
+        self._first_chunk = self._next_chunk()
+
+    def _next_chunk(self) -> Optional[str]:
+        try:
+            return next(self._chunks)
+        except StopIteration as e:
+            self.result = e.value
+            return None
+
+    def __iter__(self) -> Iterator[str]:
+        if self._first_chunk is None:
+            return
+        yield self._first_chunk
+        self.result = yield from self._chunks
+
+
+class LineAnonymizer:
+    """
+    Anonymizes a text as it is streamed. The text is released line by line, a
+    line being held until it is complete, so a value to anonymize is never split
+    between two chunks.
+    """
+
+    def __init__(self):
+        self._pending = ""
+
+    @staticmethod
+    def anonymize(text: str) -> str:
+        return anonymizer.anonymize_struct(
+            text, value_template=Template("{{ _${variable_name}_ }}")
+        )
+
+    def feed(self, chunk: str) -> str:
+        lines, newline, self._pending = (self._pending + chunk).rpartition("\n")
+        return self.anonymize(lines + newline) if newline else ""
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ""
+        return self.anonymize(pending) if pending else ""
@@ -0,0 +1,138 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from unittest.mock import Mock, patch
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, override_settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.ai.api.exceptions import RequestDeadlineExceededException
+from ansible_ai_connect.ai.api.model_client.base import ModelMeshClient
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
+from ansible_ai_connect.ai.api.pipelines.common import PipelineElement
+from ansible_ai_connect.ai.api.pipelines.completions import CompletionsPipeline
+from ansible_ai_connect.ai.api.utils.deadline import (
+    Deadline,
+    get_deadline,
+    remaining_time,
+)
+
+
+def get_exceeded_count(stage):
+    name = "request_deadline_exceeded_total"
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name, {"stage": stage}) or 0.0
+
+
+class TestDeadline(SimpleTestCase):
+    def test_no_deadline(self):
+        deadline = Deadline()
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+        deadline.check("a-stage")
+        self.assertIsNone(deadline.timeout(None, "a-stage"))
+        self.assertEqual(deadline.timeout(10, "a-stage"), 10)
+
+    @patch("time.monotonic")
+    def test_deadline(self, monotonic):
+        monotonic.return_value = 1000
+        deadline = Deadline(30)
+        monotonic.return_value = 1020
+        self.assertEqual(deadline.remaining(), 10)
+        self.assertFalse(deadline.expired())
+        self.assertEqual(deadline.timeout(None, "a-stage"), 10)
+        self.assertEqual(deadline.timeout(5, "a-stage"), 5)
+        self.assertEqual(deadline.timeout(20, "a-stage"), 10)
+
+    @patch("time.monotonic")
+    def test_expired(self, monotonic):
+        count = get_exceeded_count("a-stage")
+        monotonic.return_value = 1000
+        deadline = Deadline(30)
+        monotonic.return_value = 1030
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertTrue(deadline.expired())
+        with self.assertRaises(DeadlineExceeded):
+            deadline.check("a-stage")
+        with self.assertRaises(DeadlineExceeded):
+            deadline.timeout(10, "a-stage")
+        self.assertEqual(get_exceeded_count("a-stage"), count + 2)
+
+    def test_activate(self):
+        deadline = Deadline(30)
+        self.assertIsNone(remaining_time())
+        with deadline.activate():
+            self.assertIs(get_deadline(), deadline)
+            self.assertLessEqual(remaining_time(), 30)
+        self.assertIsNot(get_deadline(), deadline)
+        self.assertIsNone(remaining_time())
+
+    async def test_activate_sync_to_async(self):
+        deadline = Deadline(30)
+        with deadline.activate():
+            self.assertIs(await sync_to_async(get_deadline)(), deadline)
+
+    @override_settings(ANSIBLE_AI_MODEL_MESH_API_TIMEOUT=20)
+    @patch("time.monotonic")
+    def test_model_timeout(self, monotonic):
+        model_client = ModelMeshClient(inference_url="http://example.com/")
+        monotonic.return_value = 1000
+        deadline = Deadline(30)
+        self.assertEqual(model_client.timeout(1), 20)
+        with deadline.activate():
+            self.assertEqual(model_client.timeout(1), 20)
+            self.assertEqual(model_client.timeout(2), 30)
+            monotonic.return_value = 1025
+            self.assertEqual(model_client.timeout(1), 5)
+            monotonic.return_value = 1030
+            with self.assertRaises(DeadlineExceeded):
+                model_client.timeout(1)
+
+
+class SlowStage(PipelineElement):
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def process(self, context):
+        # Spends the time left
+        self.deadline._expires_at = 0
+
+
+class TestCompletionsPipelineDeadline(SimpleTestCase):
+    def get_pipeline(self):
+        pipeline = CompletionsPipeline(Mock())
+        self.next_stage = Mock(spec=PipelineElement)
+        pipeline.pipeline = [SlowStage(pipeline.context.deadline), self.next_stage]
+        return pipeline
+
+    @override_settings(ANSIBLE_AI_COMPLETION_DEADLINE=30)
+    def test_execute(self):
+        count = get_exceeded_count("Mock")
+        with self.assertRaises(RequestDeadlineExceededException):
+            self.get_pipeline().execute()
+        self.next_stage.process.assert_not_called()
+        self.assertEqual(get_exceeded_count("Mock"), count + 1)
+
+    @override_settings(ANSIBLE_AI_COMPLETION_DEADLINE=30)
+    async def test_aexecute(self):
+        with self.assertRaises(RequestDeadlineExceededException):
+            await self.get_pipeline().aexecute()
+        self.next_stage.aprocess.assert_not_called()
+
+    @override_settings(ANSIBLE_AI_COMPLETION_DEADLINE=0)
+    def test_no_deadline(self):
+        pipeline = CompletionsPipeline(Mock())
+        self.assertIsNone(pipeline.context.deadline.remaining())
@@ -0,0 +1,55 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from unittest import TestCase, mock
+
+import yaml
+
+from ansible_ai_connect.ai.api.utils import documents as documents_module
+from ansible_ai_connect.ai.api.utils.documents import YamlDocuments, load_yaml
+
+
+class TestYamlDocuments(TestCase):
+    def test_load(self):
+        documents = YamlDocuments()
+        with mock.patch.object(
+            documents_module, "safe_load", wraps=documents_module.safe_load
+        ) as safe_load:
+            first = documents.load("- name: install nginx\n")
+            second = documents.load("- name: install nginx\n")
+            documents.load("- name: start nginx\n")
+        self.assertEqual(first, [{"name": "install nginx"}])
+        self.assertIs(first, second)
+        self.assertEqual(safe_load.call_count, 2)
+        self.assertEqual(documents.hits, 1)
+        self.assertEqual(len(documents), 2)
+
+    def test_load_error(self):
+        documents = YamlDocuments()
+        with mock.patch.object(
+            documents_module, "safe_load", wraps=documents_module.safe_load
+        ) as safe_load:
+            with self.assertRaises(yaml.YAMLError):
+                documents.load("- name: [")
+            with self.assertRaises(yaml.YAMLError):
+                documents.load("- name: [")
+        self.assertEqual(safe_load.call_count, 1)
+
+    def test_load_yaml(self):
+        documents = YamlDocuments()
+        with documents.activate():
+            self.assertIs(load_yaml("a: 1"), load_yaml("a: 1"))
+        self.assertEqual(documents.hits, 1)
+        # Without active documents, each load parses the text
+        self.assertIsNot(load_yaml("a: 1"), load_yaml("a: 1"))
@@ -0,0 +1,88 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pickle
+from unittest import TestCase
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.ai.api.utils.postprocess_cache import (
+    PostProcessCache,
+    cache_key,
+)
+
+
+def sample_value(name, labels):
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestPostProcessCache(TestCase):
+    def test_cache_key(self):
+        self.assertEqual(cache_key("a", "b"), cache_key("a", "b"))
+        self.assertNotEqual(cache_key("a", "b"), cache_key("b", "a"))
+        self.assertNotEqual(cache_key("ab", ""), cache_key("a", "b"))
+
+    def test_get_set(self):
+        cache = PostProcessCache("test", 1024)
+        value = ("- name: install nginx\n", [{"rule": "W007"}])
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", value)
+        first = cache.get("key")
+        self.assertEqual(first, value)
+        # Every hit is a copy the caller may modify
+        first[1][0]["rule"] = "modified"
+        self.assertEqual(cache.get("key"), value)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, len(pickle.dumps(value)))
+
+    def test_evict_least_recently_used(self):
+        size = len(pickle.dumps("a" * 10))
+        cache = PostProcessCache("test", size * 2)
+        cache.set("a", "a" * 10)
+        cache.set("b", "b" * 10)
+        cache.get("a")
+        cache.set("c", "c" * 10)
+        self.assertEqual(cache.get("a"), "a" * 10)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "c" * 10)
+        self.assertEqual(cache.size, size * 2)
+
+    def test_replace(self):
+        cache = PostProcessCache("test", 1024)
+        cache.set("key", "first")
+        cache.set("key", "second")
+        self.assertEqual(cache.get("key"), "second")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, len(pickle.dumps("second")))
+
+    def test_value_too_large(self):
+        cache = PostProcessCache("test", 16)
+        cache.set("key", "a" * 100)
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.size, 0)
+
+    def test_metrics(self):
+        labels = {"cache": "metrics"}
+        hits = sample_value("postprocess_cache_hit_total", labels)
+        misses = sample_value("postprocess_cache_miss_total", labels)
+        cache = PostProcessCache("metrics", 1024)
+        cache.get("key")
+        cache.set("key", "value")
+        cache.get("key")
+        self.assertEqual(sample_value("postprocess_cache_hit_total", labels), hits + 1)
+        self.assertEqual(sample_value("postprocess_cache_miss_total", labels), misses + 1)
+        self.assertEqual(sample_value("postprocess_cache_entries", labels), 1)
+        self.assertEqual(sample_value("postprocess_cache_bytes", labels), cache.size)
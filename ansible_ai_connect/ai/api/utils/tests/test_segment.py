@@ -13,7 +13,7 @@
 #  limitations under the License.
 
 from unittest import TestCase, mock
-from unittest.mock import MagicMock, Mock
+from unittest.mock import Mock
 
 from django.test import override_settings
 from segment import analytics
@@ -158,9 +158,7 @@ class TestSegment(TestCase):
     @override_settings(ENABLE_ARI_POSTPROCESS=False)
     @override_settings(SEGMENT_WRITE_KEY="DUMMY_KEY_VALUE")
     def test_send_segment_event_commercial_forbidden_event(self, *args):
-        g = Mock()
-        g.values_list = MagicMock(return_value=[])
-        user = Mock(rh_user_has_seat=True, groups=g)
+        user = Mock(rh_user_has_seat=True, group_names=[])
         event = {
             "rh_user_has_seat": True,
         }
@@ -177,9 +175,7 @@ class TestSegment(TestCase):
     @override_settings(ENABLE_ARI_POSTPROCESS=False)
     @override_settings(SEGMENT_WRITE_KEY="DUMMY_KEY_VALUE")
     def test_send_segment_event_community_user(self, track_method):
-        g = Mock()
-        g.values_list = MagicMock(return_value=[])
-        user = Mock(rh_user_has_seat=False, groups=g)
+        user = Mock(rh_user_has_seat=False, group_names=[])
         event = {
             "rh_user_has_seat": False,
             "exception": "SomeException",
@@ -195,9 +191,7 @@ class TestSegment(TestCase):
     @override_settings(ENABLE_ARI_POSTPROCESS=False)
     @override_settings(SEGMENT_WRITE_KEY="DUMMY_KEY_VALUE")
     def test_send_segment_event_seated_user(self, track_method):
-        g = Mock()
-        g.values_list = MagicMock(return_value=[])
-        user = Mock(rh_user_has_seat=True, groups=g)
+        user = Mock(rh_user_has_seat=True, group_names=[])
         event = {
             "rh_user_has_seat": True,
             "exception": "SomeException",
@@ -282,9 +276,7 @@ class TestSegment(TestCase):
     @override_settings(ENABLE_ARI_POSTPROCESS=False)
     @override_settings(SEGMENT_WRITE_KEY="DUMMY_KEY_VALUE")
     def test_segment_client_in_use(self):
-        g = Mock()
-        g.values_list = MagicMock(return_value=[])
-        user = Mock(rh_user_has_seat=False, groups=g)
+        user = Mock(rh_user_has_seat=False, group_names=[])
         event = {
             "rh_user_has_seat": False,
             "exception": "SomeException",
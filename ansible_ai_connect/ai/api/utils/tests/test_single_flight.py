@@ -0,0 +1,132 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from ansible_ai_connect.ai.api.utils.single_flight import SingleFlight
+
+
+class ObservedSingleFlight(SingleFlight):
+    """Lets the tests wait until the expected callers have joined a call."""
+
+    def __init__(self, expected_claims):
+        super().__init__()
+        self.claims = 0
+        self.expected_claims = expected_claims
+        self.all_claimed = threading.Event()
+
+    def _claim(self, key):
+        claim = super()._claim(key)
+        with self._lock:
+            self.claims += 1
+            if self.claims == self.expected_claims:
+                self.all_claimed.set()
+        return claim
+
+
+class TestSingleFlight(TestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        flight = ObservedSingleFlight(4)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            assert flight.all_claimed.wait(timeout=5)
+            return {"predictions": ["- name: foo"]}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, "key", fn) for _ in range(4)]
+            results = [f.result(timeout=5) for f in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True])
+        for result, _ in results:
+            self.assertEqual(result, {"predictions": ["- name: foo"]})
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exception_is_shared(self):
+        flight = ObservedSingleFlight(2)
+
+        def fn():
+            assert flight.all_claimed.wait(timeout=5)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(flight.do, "key", fn) for _ in range(2)]
+            for f in futures:
+                with self.assertRaises(ValueError):
+                    f.result(timeout=5)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_different_keys_are_not_coalesced(self):
+        flight = ObservedSingleFlight(2)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            assert flight.all_claimed.wait(timeout=5)
+            return len(calls)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(flight.do, key, fn) for key in ("a", "b")]
+            results = [f.result(timeout=5) for f in futures]
+
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(any(shared for _, shared in results))
+
+    def test_completed_call_is_not_cached(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("key", lambda: 1), (1, False))
+        self.assertEqual(flight.do("key", lambda: 2), (2, False))
+
+
+class TestSingleFlightAsync(IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_are_coalesced(self):
+        flight = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return "result"
+
+        tasks = [asyncio.create_task(flight.ado("key", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("result", False), ("result", True), ("result", True)])
+
+    async def test_cancelled_follower_does_not_cancel_the_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "result"
+
+        leader = asyncio.create_task(flight.ado("key", fn))
+        follower = asyncio.create_task(flight.ado("key", fn))
+        await asyncio.sleep(0)
+        follower.cancel()
+        release.set()
+
+        self.assertEqual(await leader, ("result", False))
+        with self.assertRaises(asyncio.CancelledError):
+            await follower
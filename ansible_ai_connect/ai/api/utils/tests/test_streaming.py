@@ -0,0 +1,73 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from django.test import SimpleTestCase
+
+from ansible_ai_connect.ai.api.utils.streaming import (
+    LineAnonymizer,
+    TextStream,
+    sse_event,
+)
+
+
+def answer(chunks, result):
+    yield from chunks
+    return result
+
+
+def failure():
+    raise ValueError("no API key")
+    yield
+
+
+class TestSseEvent(SimpleTestCase):
+    def test_sse_event(self):
+        self.assertEqual(
+            sse_event("token", {"content": "a\nb"}), 'event: token\ndata: {"content": "a\\nb"}\n\n'
+        )
+
+
+class TestTextStream(SimpleTestCase):
+    def test_stream(self):
+        stream = TextStream(answer(["a", "b"], "ab"))
+        self.assertIsNone(stream.result)
+        self.assertEqual(list(stream), ["a", "b"])
+        self.assertEqual(stream.result, "ab")
+
+    def test_empty_stream(self):
+        stream = TextStream(answer([], ""))
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.result, "")
+
+    def test_early_errors_are_raised(self):
+        with self.assertRaises(ValueError):
+            TextStream(failure())
+
+
+class TestLineAnonymizer(SimpleTestCase):
+    def test_lines_are_released_when_complete(self):
+        line_anonymizer = LineAnonymizer()
+        self.assertEqual(line_anonymizer.feed("- name: "), "")
+        self.assertEqual(line_anonymizer.feed("ping\n  ansible"), "- name: ping\n")
+        self.assertEqual(line_anonymizer.feed(".builtin.ping:"), "")
+        self.assertEqual(line_anonymizer.flush(), "  ansible.builtin.ping:")
+        self.assertEqual(line_anonymizer.flush(), "")
+
+    def test_values_split_between_chunks_are_anonymized(self):
+        text = "    to: admin@redhat.com\n    password: hunter2\n"
+        line_anonymizer = LineAnonymizer()
+        streamed = "".join(line_anonymizer.feed(c) for c in text) + line_anonymizer.flush()
+        self.assertEqual(streamed, LineAnonymizer.anonymize(text))
+        self.assertNotIn("admin@redhat.com", streamed)
+        self.assertNotIn("hunter2", streamed)
@@ -14,7 +14,20 @@
 
 from unittest import TestCase, mock
 
+from django.test import SimpleTestCase, override_settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+from rest_framework.response import Response
+
 import ansible_ai_connect.ai.api.utils.timing as timing
+from ansible_ai_connect.ai.api.pipelines.common import PipelineElement
+from ansible_ai_connect.ai.api.pipelines.completions import CompletionsPipeline
+
+
+def get_observed_count(stage):
+    name = "completion_stage_latency_seconds_count"
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name, {"stage": stage}) or 0.0
 
 
 class TestTiming(TestCase):
@@ -33,3 +46,54 @@ class TestTiming(TestCase):
                 ],
                 log.output,
             )
+
+
+class TestTimings(TestCase):
+    @mock.patch("timeit.default_timer")
+    def test_span(self, default_timer):
+        default_timer.side_effect = [0, 1, 1.5, 2]
+        timings = timing.Timings()
+        count = get_observed_count("post_process.ari")
+        with timings.activate():
+            with timings.span("post_process"):
+                with timing.span("ari"):
+                    pass
+        self.assertEqual(timings.spans, [("post_process.ari", 0.5), ("post_process", 2)])
+        self.assertEqual(
+            timings.server_timing(), "post_process.ari;dur=500.0, post_process;dur=2000.0"
+        )
+        self.assertEqual(get_observed_count("post_process.ari"), count + 1)
+
+    def test_span_not_active(self):
+        with timing.span("ari"):
+            pass
+
+
+class ResponseStage(PipelineElement):
+    def process(self, context):
+        context.response = Response({})
+
+
+class TestCompletionsPipelineTimings(SimpleTestCase):
+    def get_pipeline(self):
+        pipeline = CompletionsPipeline(mock.Mock())
+        pipeline.pipeline = [ResponseStage()]
+        return pipeline
+
+    def test_stage_name(self):
+        self.assertEqual(ResponseStage().name, "response")
+
+    @override_settings(ANSIBLE_AI_ENABLE_SERVER_TIMING=True)
+    def test_server_timing(self):
+        response = self.get_pipeline().execute()
+        self.assertRegex(response["Server-Timing"], r"^response;dur=\d+\.\d$")
+
+    @override_settings(ANSIBLE_AI_ENABLE_SERVER_TIMING=True)
+    async def test_server_timing_async(self):
+        response = await self.get_pipeline().aexecute()
+        self.assertRegex(response["Server-Timing"], r"^response;dur=\d+\.\d$")
+
+    @override_settings(ANSIBLE_AI_ENABLE_SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        response = self.get_pipeline().execute()
+        self.assertNotIn("Server-Timing", response)
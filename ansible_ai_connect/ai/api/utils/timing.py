@@ -13,11 +13,24 @@
 #  limitations under the License.
 
 import contextlib
+import contextvars
 import logging
+import threading
 import timeit
+from typing import Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Histogram
 
 logger = logging.getLogger(__name__)
 
+stage_latency_hist = Histogram(
+    "completion_stage_latency_seconds",
+    "Histogram of the completion pipeline stages and sub-stages processing time",
+    ["stage"],
+    namespace=NAMESPACE,
+)
+
 
 @contextlib.contextmanager
 def time_activity(activity_name: str):
@@ -29,3 +42,61 @@ def time_activity(activity_name: str):
     finally:
         duration = timeit.default_timer() - start
         logger.info(f"[Timing] {activity_name} finished (Took {duration:.2f}s)")
+
+
+class Timings:
+    """
+    Spans of the processing of a request. Spans opened within another one are
+    named after it, e.g. "post_process.ari".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: list[tuple[str, float]] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        parent = _current_span.get()
+        if parent:
+            name = f"{parent}.{name}"
+        token = _current_span.set(name)
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+            self.record(name, timeit.default_timer() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        stage_latency_hist.labels(stage=name).observe(seconds)
+        # Spans may be recorded by the worker threads of the request
+        with self._lock:
+            self.spans.append((name, seconds))
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Makes the spans recorded by span() go to these timings."""
+        token = _current_timings.set(self)
+        try:
+            yield self
+        finally:
+            _current_timings.reset(token)
+
+    def server_timing(self) -> str:
+        """The value of the Server-Timing header listing the spans, in milliseconds."""
+        with self._lock:
+            return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans)
+
+
+_current_timings: contextvars.ContextVar[Optional[Timings]] = contextvars.ContextVar(
+    "timings", default=None
+)
+_current_span: contextvars.ContextVar[str] = contextvars.ContextVar("span", default="")
+
+
+def span(name: str):
+    """Times a sub-stage of the request being processed, if any."""
+    timings = _current_timings.get()
+    if timings is None:
+        return contextlib.nullcontext()
+    return timings.span(name)
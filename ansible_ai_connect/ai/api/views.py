@@ -62,6 +62,7 @@ from ansible_ai_connect.ai.api.model_client.exceptions import (
     WcaUserTrialExpired,
 )
 from ansible_ai_connect.ai.api.pipelines.completions import CompletionsPipeline
+from ansible_ai_connect.main.base_views import AsyncAPIView
 from ansible_ai_connect.users.models import User
 
 from ..feature_flags import FeatureFlags
@@ -99,6 +100,13 @@ from .utils.analytics_telemetry_model import (
 )
 from .utils.segment import send_segment_event
 from .utils.segment_analytics_telemetry import send_segment_analytics_event
+from .utils.streaming import (
+    LineAnonymizer,
+    TextStream,
+    sse_error_event,
+    sse_event,
+    sse_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -136,6 +144,20 @@ PERMISSIONS_MAP = {
 }
 
 
+completions_schema = extend_schema(
+    request=CompletionRequestSerializer,
+    responses={
+        200: CompletionResponseSerializer,
+        204: OpenApiResponse(description="Empty response"),
+        400: OpenApiResponse(description="Bad Request"),
+        401: OpenApiResponse(description="Unauthorized"),
+        429: OpenApiResponse(description="Request was throttled"),
+        503: OpenApiResponse(description="Service Unavailable"),
+    },
+    summary="Inline code suggestions",
+)
+
+
 class Completions(APIView):
     """
     Returns inline code suggestions based on a given Ansible editor context.
@@ -147,23 +169,27 @@ class Completions(APIView):
 
     throttle_cache_key_suffix = "_completions"
 
-    @extend_schema(
-        request=CompletionRequestSerializer,
-        responses={
-            200: CompletionResponseSerializer,
-            204: OpenApiResponse(description="Empty response"),
-            400: OpenApiResponse(description="Bad Request"),
-            401: OpenApiResponse(description="Unauthorized"),
-            429: OpenApiResponse(description="Request was throttled"),
-            503: OpenApiResponse(description="Service Unavailable"),
-        },
-        summary="Inline code suggestions",
-    )
+    @completions_schema
     def post(self, request) -> Response:
         pipeline = CompletionsPipeline(request)
         return pipeline.execute()
 
 
+class AsyncCompletions(AsyncAPIView, Completions):
+    """
+    Returns inline code suggestions based on a given Ansible editor context.
+
+    The model server is awaited rather than blocking the worker, this view is
+    served instead of Completions when ANSIBLE_AI_ENABLE_ASYNC_COMPLETIONS is set
+    and the service runs under ASGI.
+    """
+
+    @completions_schema
+    async def post(self, request) -> Response:
+        pipeline = CompletionsPipeline(request)
+        return await pipeline.aexecute()
+
+
 class Feedback(APIView):
     """
     Feedback API for the AI service
@@ -636,6 +662,7 @@ class Explanation(APIView):
         explanation_id = None
         playbook = ""
         answer = {}
+        streaming = False
         request_serializer = ExplanationRequestSerializer(data=request.data)
         try:
             request_serializer.is_valid(raise_exception=True)
@@ -644,6 +671,12 @@ class Explanation(APIView):
 
             llm = apps.get_app_config("ai").model_mesh_client
             start_time = time.time()
+            if request_serializer.validated_data["stream"]:
+                stream = TextStream(llm.stream_explanation(request, playbook, explanation_id))
+                streaming = True
+                return sse_response(
+                    self.stream_events(request.user, explanation_id, playbook, stream, start_time)
+                )
             explanation = llm.explain_playbook(request, playbook, explanation_id)
             duration = round((time.time() - start_time) * 1000, 2)
 
@@ -735,20 +768,57 @@ class Explanation(APIView):
             logger.exception(f"An exception {exc.__class__} occurred during a playbook explanation")
             raise
 
+        finally:
+            # A streamed explanation is reported once the stream ends
+            if not streaming:
+                self.write_to_segment(
+                    request.user,
+                    explanation_id,
+                    exception,
+                    duration,
+                    playbook_length=len(playbook),
+                )
+
+        return Response(
+            answer,
+            status=rest_framework_status.HTTP_200_OK,
+        )
+
+    def stream_events(self, user, explanation_id, playbook, stream: TextStream, start_time):
+        exception = None
+        duration = None
+        line_anonymizer = LineAnonymizer()
+        try:
+            for chunk in stream:
+                if content := line_anonymizer.feed(chunk):
+                    yield sse_event("token", {"content": content})
+            if content := line_anonymizer.flush():
+                yield sse_event("token", {"content": content})
+            duration = round((time.time() - start_time) * 1000, 2)
+
+            yield sse_event(
+                "done",
+                {
+                    "content": LineAnonymizer.anonymize(stream.result),
+                    "format": "markdown",
+                    "explanationId": explanation_id,
+                },
+            )
+
+        except Exception as exc:
+            exception = exc
+            logger.exception(f"An exception {exc.__class__} occurred during a playbook explanation")
+            yield sse_error_event()
+
         finally:
             self.write_to_segment(
-                request.user,
+                user,
                 explanation_id,
                 exception,
                 duration,
                 playbook_length=len(playbook),
             )
 
-        return Response(
-            answer,
-            status=rest_framework_status.HTTP_200_OK,
-        )
-
     def write_to_segment(self, user, explanation_id, exception, duration, playbook_length):
         model_name = ""
         try:
@@ -816,6 +886,7 @@ class Generation(APIView):
         playbook = ""
         request_serializer = GenerationRequestSerializer(data=request.data)
         answer = {}
+        streaming = False
         try:
             request_serializer.is_valid(raise_exception=True)
             generation_id = str(request_serializer.validated_data.get("generationId", ""))
@@ -826,6 +897,16 @@ class Generation(APIView):
 
             llm = apps.get_app_config("ai").model_mesh_client
             start_time = time.time()
+            if request_serializer.validated_data["stream"]:
+                stream = TextStream(
+                    llm.stream_playbook(request, text, create_outline, outline, generation_id)
+                )
+                streaming = True
+                return sse_response(
+                    self.stream_events(
+                        request.user, generation_id, wizard_id, create_outline, stream, start_time
+                    )
+                )
             playbook, outline = llm.generate_playbook(
                 request, text, create_outline, outline, generation_id
             )
@@ -923,9 +1004,59 @@ class Generation(APIView):
             logger.exception(f"An exception {exc.__class__} occurred during a playbook generation")
             raise
 
+        finally:
+            # A streamed playbook is reported once the stream ends
+            if not streaming:
+                self.write_to_segment(
+                    request.user,
+                    generation_id,
+                    wizard_id,
+                    exception,
+                    duration,
+                    create_outline,
+                    playbook_length=len(anonymized_playbook),
+                )
+
+        return Response(
+            answer,
+            status=rest_framework_status.HTTP_200_OK,
+        )
+
+    def stream_events(
+        self, user, generation_id, wizard_id, create_outline, stream: TextStream, start_time
+    ):
+        exception = None
+        duration = None
+        anonymized_playbook = ""
+        line_anonymizer = LineAnonymizer()
+        try:
+            for chunk in stream:
+                if content := line_anonymizer.feed(chunk):
+                    yield sse_event("token", {"content": content})
+            if content := line_anonymizer.flush():
+                yield sse_event("token", {"content": content})
+            duration = round((time.time() - start_time) * 1000, 2)
+
+            playbook, outline = stream.result
+            anonymized_playbook = LineAnonymizer.anonymize(playbook)
+            yield sse_event(
+                "done",
+                {
+                    "playbook": anonymized_playbook,
+                    "outline": LineAnonymizer.anonymize(outline),
+                    "format": "plaintext",
+                    "generationId": generation_id,
+                },
+            )
+
+        except Exception as exc:
+            exception = exc
+            logger.exception(f"An exception {exc.__class__} occurred during a playbook generation")
+            yield sse_error_event()
+
         finally:
             self.write_to_segment(
-                request.user,
+                user,
                 generation_id,
                 wizard_id,
                 exception,
@@ -934,11 +1065,6 @@ class Generation(APIView):
                 playbook_length=len(anonymized_playbook),
             )
 
-        return Response(
-            answer,
-            status=rest_framework_status.HTTP_200_OK,
-        )
-
     def write_to_segment(
         self, user, generation_id, wizard_id, exception, duration, create_outline, playbook_length
     ):
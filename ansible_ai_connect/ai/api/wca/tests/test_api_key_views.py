@@ -41,6 +41,7 @@ from ansible_ai_connect.test_utils import WisdomAppsBackendMocking
 
 @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="wca")
 @override_settings(WCA_SECRET_BACKEND_TYPE="aws_sm")
+@override_settings(WCA_SECRET_MANAGER_CACHE_TTL=0)
 @patch.object(IsOrganisationAdministrator, "has_permission", return_value=True)
 @patch.object(IsOrganisationLightspeedSubscriber, "has_permission", return_value=True)
 class TestWCAApiKeyView(WisdomAppsBackendMocking, WisdomServiceAPITestCaseBase):
@@ -285,6 +286,7 @@ class TestWCAApiKeyViewAsNonSubscriber(WisdomServiceAPITestCaseBase):
 
 @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="wca")
 @override_settings(WCA_SECRET_BACKEND_TYPE="aws_sm")
+@override_settings(WCA_SECRET_MANAGER_CACHE_TTL=0)
 @patch.object(IsOrganisationAdministrator, "has_permission", return_value=True)
 @patch.object(IsOrganisationLightspeedSubscriber, "has_permission", return_value=True)
 class TestWCAApiKeyValidatorView(WisdomAppsBackendMocking, WisdomServiceAPITestCaseBase):
@@ -13,22 +13,33 @@
 #  limitations under the License.
 
 import logging
-from typing import Union
+import resource
+import threading
+import time
+from typing import Optional
 
 from ansible_risk_insight.scanner import Config
 from django.apps import AppConfig
 from django.conf import settings
 
 from ansible_ai_connect.ansible_lint import lintpostprocessing
+from ansible_ai_connect.ansible_lint.worker_pool import LintWorkerPool
 from ansible_ai_connect.ari import postprocessing
 from ansible_ai_connect.users.authz_checker import AMSCheck, CIAMCheck, DummyCheck
 
-from .api.aws.wca_secret_manager import AWSSecretManager, DummySecretManager
+from .api.aws.wca_secret_manager import (
+    AWSSecretManager,
+    BaseSecretManager,
+    CachingSecretManager,
+    DummySecretManager,
+)
 from .api.model_client.dummy_client import DummyClient
 from .api.model_client.grpc_client import GrpcClient
 from .api.model_client.http_client import HttpClient
 from .api.model_client.llamacpp_client import LlamaCPPClient
 from .api.model_client.wca_client import DummyWCAClient, WCAClient, WCAOnPremClient
+from .api.pipelines.completion_cache import CompletionCache
+from .api.utils.postprocess_cache import PostProcessCache
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +55,9 @@ class AiConfig(AppConfig):
     _seat_checker = UNINITIALIZED
     _wca_secret_manager = UNINITIALIZED
     _ansible_lint_caller = UNINITIALIZED
+    _completion_cache = UNINITIALIZED
+    _ari_caller_lock = threading.Lock()
+    _ari_warm_up: Optional[threading.Thread] = None
 
     def ready(self) -> None:
         if settings.ANSIBLE_AI_MODEL_MESH_API_TYPE == "grpc":
@@ -91,6 +105,17 @@ class AiConfig(AppConfig):
                 f"Invalid model mesh client type: {settings.ANSIBLE_AI_MODEL_MESH_API_TYPE}"
             )
 
+        if settings.ARI_WARM_UP and self.model_mesh_client.supports_ari_postprocessing():
+            # ARI is initialized in the background, the health check reports it until done
+            self._ari_warm_up = threading.Thread(
+                target=self.warm_up_ari_caller, name="ari-warm-up", daemon=True
+            )
+            self._ari_warm_up.start()
+
+        if settings.ANSIBLE_LINT_WORKERS:
+            # The ansible-lint workers are forked and warmed up before serving requests
+            self.get_ansible_lint_caller()
+
         return super().ready()
 
     def get_ari_caller(self):
@@ -104,20 +129,47 @@ class AiConfig(AppConfig):
             return None
         if self._ari_caller:
             return self._ari_caller
-        try:
-            self._ari_caller = postprocessing.ARICaller(
-                config=Config(
-                    rules_dir=settings.ARI_RULES_DIR,
-                    data_dir=settings.ARI_DATA_DIR,
-                    rules=settings.ARI_RULES,
-                ),
-                silent=True,
-            )
-            logger.info("Postprocessing is enabled.")
-        except Exception:
-            logger.exception("Failed to initialize ARI.")
-            self._ari_caller = FAILED
-        return self._ari_caller
+        # The warm up and the requests may initialize ARI at the same time
+        with self._ari_caller_lock:
+            if self._ari_caller is UNINITIALIZED:
+                try:
+                    self._ari_caller = postprocessing.ARICaller(
+                        config=Config(
+                            rules_dir=settings.ARI_RULES_DIR,
+                            data_dir=settings.ARI_DATA_DIR,
+                            rules=settings.ARI_RULES,
+                        ),
+                        silent=True,
+                        cache=(
+                            PostProcessCache("ari", settings.ARI_CACHE_MAX_BYTES)
+                            if settings.ARI_CACHE_MAX_BYTES
+                            else None
+                        ),
+                    )
+                    logger.info("Postprocessing is enabled.")
+                except Exception:
+                    logger.exception("Failed to initialize ARI.")
+                    self._ari_caller = FAILED
+        return self._ari_caller or None
+
+    def warm_up_ari_caller(self) -> None:
+        start = time.monotonic()
+        # Peak resident memory, in kilobytes
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        ari_caller = self.get_ari_caller()
+        if ari_caller:
+            try:
+                ari_caller.warm_up()
+            except Exception:
+                logger.exception("Failed to warm up ARI.")
+        duration = time.monotonic() - start
+        memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - max_rss) * 1024
+        postprocessing.ari_warm_up_seconds_gauge.set(duration)
+        postprocessing.ari_warm_up_memory_gauge.set(memory)
+        logger.info(f"ARI warmed up in {duration:.2f}s, using {memory // 2**20}MiB")
+
+    def is_ari_caller_warming_up(self) -> bool:
+        return self._ari_warm_up is not None and self._ari_warm_up.is_alive()
 
     def get_seat_checker(self):
         backends = {
@@ -145,7 +197,7 @@ class AiConfig(AppConfig):
 
         return self._seat_checker
 
-    def get_wca_secret_manager(self) -> Union[AWSSecretManager, DummySecretManager]:
+    def get_wca_secret_manager(self) -> BaseSecretManager:
         backends = {
             "aws_sm": AWSSecretManager,
             "dummy": DummySecretManager,
@@ -166,6 +218,12 @@ class AiConfig(AppConfig):
                 settings.WCA_SECRET_MANAGER_PRIMARY_REGION,
                 settings.WCA_SECRET_MANAGER_REPLICA_REGIONS,
             )
+            if expected_backend is AWSSecretManager and settings.WCA_SECRET_MANAGER_CACHE_TTL:
+                self._wca_secret_manager = CachingSecretManager(
+                    self._wca_secret_manager,
+                    settings.WCA_SECRET_MANAGER_CACHE_TTL,
+                    settings.WCA_SECRET_MANAGER_NEGATIVE_CACHE_TTL,
+                )
 
         return self._wca_secret_manager
 
@@ -178,9 +236,33 @@ class AiConfig(AppConfig):
         if self._ansible_lint_caller is FAILED:
             return None
         try:
-            self._ansible_lint_caller = lintpostprocessing.AnsibleLintCaller()
+            pool = None
+            if settings.ANSIBLE_LINT_WORKERS:
+                pool = LintWorkerPool(
+                    workers=settings.ANSIBLE_LINT_WORKERS,
+                    timeout=settings.ANSIBLE_LINT_WORKER_TIMEOUT,
+                    cpu_limit=settings.ANSIBLE_LINT_WORKER_CPU_LIMIT,
+                    max_queue=settings.ANSIBLE_LINT_WORKER_MAX_QUEUE,
+                )
+            cache = None
+            if settings.ANSIBLE_LINT_CACHE_MAX_BYTES:
+                cache = PostProcessCache("ansible_lint", settings.ANSIBLE_LINT_CACHE_MAX_BYTES)
+            self._ansible_lint_caller = lintpostprocessing.AnsibleLintCaller(
+                in_memory=settings.ANSIBLE_LINT_IN_MEMORY, pool=pool, cache=cache
+            )
             logger.info("Ansible Lint Postprocessing is enabled.")
         except Exception as ex:
             logger.exception(f"Failed to initialize Ansible Lint with exception: {ex}")
             self._ansible_lint_caller = FAILED
         return self._ansible_lint_caller
+
+    def get_completion_cache(self) -> CompletionCache | None:
+        if not settings.ANSIBLE_AI_COMPLETION_CACHE_SIZE:
+            self._completion_cache = UNINITIALIZED
+            return None
+        if self._completion_cache is UNINITIALIZED:
+            self._completion_cache = CompletionCache(
+                settings.ANSIBLE_AI_COMPLETION_CACHE_SIZE,
+                settings.ANSIBLE_AI_COMPLETION_CACHE_TTL,
+            )
+        return self._completion_cache
@@ -76,7 +76,7 @@ class FeatureFlags:
             if user.is_anonymous:
                 user_context = Context.builder("AnonymousUser").anonymous(True).build()
             else:
-                groups = list(user.groups.values_list("name", flat=True))
+                groups = user.group_names
                 userId = str(user.uuid)
 
                 logger.debug(f"constructing user context for {userId}")
@@ -14,13 +14,21 @@
 
 from abc import abstractmethod
 
+from ansible_ai_connect.ai.api.aws.wca_secret_manager import (
+    Suffixes,
+    invalidate_cached_secrets,
+)
 from ansible_ai_connect.ai.management.commands._base_wca_command import BaseWCACommand
+from ansible_ai_connect.users.entitlements import invalidate_organization
 
 
 class BaseWCADeleteCommand(BaseWCACommand):
     def do_command(self, client, args, options):
         org_id = options["org_id"]
         client.delete_secret(org_id, self.get_secret_suffix())
+        invalidate_cached_secrets(org_id)
+        if self.get_secret_suffix() == Suffixes.API_KEY:
+            invalidate_organization(org_id)
         self.stdout.write(self.get_success_message(org_id))
 
     @abstractmethod
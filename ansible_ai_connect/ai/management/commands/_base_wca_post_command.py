@@ -14,7 +14,12 @@
 
 from abc import abstractmethod
 
+from ansible_ai_connect.ai.api.aws.wca_secret_manager import (
+    Suffixes,
+    invalidate_cached_secrets,
+)
 from ansible_ai_connect.ai.management.commands._base_wca_command import BaseWCACommand
+from ansible_ai_connect.users.entitlements import invalidate_organization
 
 
 class BaseWCAPostCommand(BaseWCACommand):
@@ -22,6 +27,9 @@ class BaseWCAPostCommand(BaseWCACommand):
         org_id = options["org_id"]
         secret = options["secret"]
         key_name = client.save_secret(org_id, self.get_secret_suffix(), secret)
+        invalidate_cached_secrets(org_id)
+        if self.get_secret_suffix() == Suffixes.API_KEY:
+            invalidate_organization(org_id)
         self.stdout.write(self.get_success_message(org_id, key_name))
 
     @abstractmethod
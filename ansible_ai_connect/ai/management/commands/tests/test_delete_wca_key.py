@@ -38,3 +38,13 @@ class DeleteWcaKeyCommandTestCase(TestCase):
             instance.delete_secret.assert_called_once_with("mock_org_id", Suffixes.API_KEY)
             captured_output = mock_stdout.getvalue()
             self.assertIn("API Key for orgId 'mock_org_id' deleted.", captured_output)
+
+    @patch("ansible_ai_connect.ai.management.commands._base_wca_command.AWSSecretManager")
+    @patch(
+        "ansible_ai_connect.ai.management.commands._base_wca_delete_command."
+        "invalidate_cached_secrets"
+    )
+    def test_cached_secrets_invalidated(self, mock_invalidate, mock_secret_manager):
+        with patch("sys.stdout", new_callable=StringIO):
+            call_command("delete_wca_key", "mock_org_id")
+        mock_invalidate.assert_called_once_with("mock_org_id")
@@ -43,3 +43,12 @@ class PostWcaKeyCommandTestCase(TestCase):
             self.assertIn(
                 "API Key for orgId 'mock_org_id' stored as: mock_key_name", captured_output
             )
+
+    @patch("ansible_ai_connect.ai.management.commands._base_wca_command.AWSSecretManager")
+    @patch(
+        "ansible_ai_connect.ai.management.commands._base_wca_post_command.invalidate_cached_secrets"
+    )
+    def test_cached_secrets_invalidated(self, mock_invalidate, mock_secret_manager):
+        with patch("sys.stdout", new_callable=StringIO):
+            call_command("post_wca_key", "mock_org_id", "mock_key")
+        mock_invalidate.assert_called_once_with("mock_org_id")
@@ -12,10 +12,19 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from unittest.mock import patch
+
 from django.apps.config import AppConfig
 from django.test import override_settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
 from rest_framework.test import APITestCase
 
+from ansible_ai_connect.ai.api.aws.wca_secret_manager import (
+    AWSSecretManager,
+    CachingSecretManager,
+    DummySecretManager,
+)
 from ansible_ai_connect.ai.api.model_client.dummy_client import DummyClient
 from ansible_ai_connect.ai.api.model_client.exceptions import (
     WcaKeyNotFound,
@@ -28,6 +37,7 @@ from ansible_ai_connect.ai.api.model_client.wca_client import (
     WCAClient,
     WCAOnPremClient,
 )
+from ansible_ai_connect.ari import postprocessing
 
 
 class TestAiApp(APITestCase):
@@ -181,3 +191,51 @@ class TestAiApp(APITestCase):
         app_config = AppConfig.create("ansible_ai_connect.ai")
         app_config.ready()
         self.assertIsNone(app_config.get_ansible_lint_caller())
+
+    @override_settings(WCA_SECRET_BACKEND_TYPE="aws_sm")
+    @override_settings(WCA_SECRET_MANAGER_CACHE_TTL=300)
+    def test_wca_secret_manager_is_cached(self):
+        app_config = AppConfig.create("ansible_ai_connect.ai")
+        app_config.ready()
+        secret_manager = app_config.get_wca_secret_manager()
+        self.assertIsInstance(secret_manager, CachingSecretManager)
+        self.assertIsInstance(secret_manager.secret_manager, AWSSecretManager)
+
+    @override_settings(WCA_SECRET_BACKEND_TYPE="aws_sm")
+    @override_settings(WCA_SECRET_MANAGER_CACHE_TTL=0)
+    def test_wca_secret_manager_cache_disabled(self):
+        app_config = AppConfig.create("ansible_ai_connect.ai")
+        app_config.ready()
+        self.assertIsInstance(app_config.get_wca_secret_manager(), AWSSecretManager)
+
+    @override_settings(WCA_SECRET_BACKEND_TYPE="dummy")
+    def test_dummy_wca_secret_manager_is_not_cached(self):
+        app_config = AppConfig.create("ansible_ai_connect.ai")
+        app_config.ready()
+        self.assertIsInstance(app_config.get_wca_secret_manager(), DummySecretManager)
+
+    @override_settings(ENABLE_ARI_POSTPROCESS=True)
+    @override_settings(ARI_WARM_UP=True)
+    @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="dummy")
+    @patch.object(postprocessing, "ARICaller")
+    def test_ari_warm_up(self, ARICaller):
+        app_config = AppConfig.create("ansible_ai_connect.ai")
+        app_config.ready()
+        app_config._ari_warm_up.join()
+        self.assertFalse(app_config.is_ari_caller_warming_up())
+        self.assertIs(app_config.get_ari_caller(), ARICaller.return_value)
+        ARICaller.assert_called_once()
+        ARICaller.return_value.warm_up.assert_called_once_with()
+        name = "ari_warm_up_seconds"
+        name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+        self.assertGreater(REGISTRY.get_sample_value(name), 0)
+
+    @override_settings(ENABLE_ARI_POSTPROCESS=True)
+    @override_settings(ARI_WARM_UP=False)
+    @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="dummy")
+    @patch.object(postprocessing, "ARICaller")
+    def test_ari_warm_up_disabled(self, ARICaller):
+        app_config = AppConfig.create("ansible_ai_connect.ai")
+        app_config.ready()
+        self.assertFalse(app_config.is_ari_caller_warming_up())
+        ARICaller.assert_not_called()
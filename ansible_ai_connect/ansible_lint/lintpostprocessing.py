@@ -15,31 +15,92 @@
 import logging
 import os
 import tempfile
+import uuid
+import warnings
 from copy import deepcopy
+from importlib.metadata import version
+from typing import Optional
 
 from ansiblelint.config import Options
 from ansiblelint.config import options as default_options
-from ansiblelint.constants import DEFAULT_RULESDIR
+from ansiblelint.constants import DEFAULT_RULESDIR, States
+from ansiblelint.file_utils import Lintable
 from ansiblelint.rules import RulesCollection
 from ansiblelint.runner import LintResult, get_matches
 from ansiblelint.transformer import Transformer
 from django.conf import settings
 
+from ansible_ai_connect.ai.api.utils.postprocess_cache import (
+    PostProcessCache,
+    cache_key,
+)
+from ansible_ai_connect.ansible_lint.worker_pool import LintWorkerPool
+
 logger = logging.getLogger(__name__)
 
 TEMP_TASK_FOLDER = "tasks"
+ANSIBLE_LINT_VERSION = version("ansible-lint")
+
+
+class InMemoryLintable(Lintable):
+    """
+    Tasks file whose content is only kept in memory, transforms update the content
+    without writing it to disk.
+    """
+
+    def __init__(self, content: str) -> None:
+        # The name is unique, ansible-lint caches the parsed lintables by name
+        super().__init__(
+            os.path.join(TEMP_TASK_FOLDER, f"{uuid.uuid4().hex}.yml"),
+            content=content,
+            kind="tasks",
+            base_kind="text/yaml",
+        )
+
+    def write(self, *, force: bool = False) -> None:
+        pass
 
 
 class AnsibleLintCaller:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        in_memory: bool = False,
+        pool: Optional[LintWorkerPool] = None,
+        cache: Optional[PostProcessCache] = None,
+    ) -> None:
         self.config_options = deepcopy(default_options)
         self.default_rules_collection = RulesCollection(rulesdirs=[DEFAULT_RULESDIR])
         self.config_options.write_list = settings.ANSIBLE_LINT_TRANSFORM_RULES
+        # Lint and transform the snippets in memory instead of in temporary files
+        self.in_memory = in_memory
+        # Lint the snippets in the worker processes of the pool
+        self.pool = pool
+        # Results of the snippets already linted
+        self.cache = cache
 
     def run_linter(
         self,
         inline_completion: str,
     ) -> str:
+        if self.cache is None:
+            return self._lint(inline_completion) or inline_completion
+        key = cache_key(
+            ANSIBLE_LINT_VERSION, repr(self.config_options.write_list), inline_completion
+        )
+        result = self.cache.get(key)
+        if result is None:
+            result = self._lint(inline_completion)
+            if result is None:
+                return inline_completion
+            self.cache.set(key, result)
+        return result
+
+    def _lint(self, inline_completion: str) -> Optional[str]:
+        """The linted snippet, None when the pool could not lint it."""
+        if self.pool:
+            return self.pool.run_linter(inline_completion)
+        if self.in_memory:
+            return self._run_linter_in_memory(inline_completion)
         with tempfile.TemporaryDirectory() as tmp_root:
             return self._run_linter(
                 inline_completion,
@@ -81,6 +142,35 @@ class AnsibleLintCaller:
             logger.exception(f"Lint Post-Processing resulted into exception: {exc}")
         return transformed_completion
 
+    def _run_linter_in_memory(self, inline_completion: str) -> str:
+        """Runs the rules and transforms on the snippet without going through the disk."""
+        try:
+            lintable = InMemoryLintable(inline_completion)
+            result = self.get_matches(lintable)
+            self.run_transform(result, self.config_options)
+            return lintable.content
+        except Exception as exc:
+            logger.exception(f"Lint Post-Processing resulted into exception: {exc}")
+        return inline_completion
+
+    def get_matches(self, lintable: Lintable) -> LintResult:
+        """
+        Runs the rules on a tasks file, as ansible-lint's Runner does for the files
+        it is given, which must exist on disk. Tasks files are not syntax checked.
+        """
+        matches = []
+        # A snippet that cannot be loaded is only reported as a load failure, which
+        # has no transform.
+        if not (isinstance(lintable.data, States) and lintable.exc):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                matches = self.default_rules_collection.run(
+                    lintable,
+                    tags=set(self.config_options.tags),
+                    skip_list=self.config_options.skip_list,
+                )
+        return LintResult(matches=sorted(set(matches)), files={lintable})
+
     def run_transform(self, lint_result: LintResult, config_options: Options):
         transformer = Transformer(result=lint_result, options=config_options)
         transformer.run()
@@ -16,7 +16,9 @@ import os
 import shutil
 import tempfile
 from multiprocessing.pool import ThreadPool
+from unittest.mock import Mock, patch
 
+from ansible_ai_connect.ai.api.utils.postprocess_cache import PostProcessCache
 from ansible_ai_connect.ansible_lint.lintpostprocessing import (
     TEMP_TASK_FOLDER,
     AnsibleLintCaller,
@@ -109,3 +111,76 @@ class TestLintPostprocessing(WisdomServiceLogAwareTestCase):
             task_dir = os.path.join(tempfile.tempdir, TEMP_TASK_FOLDER)
             if os.path.isdir(task_dir):
                 shutil.rmtree(task_dir)
+
+
+class TestInMemoryLintPostprocessing(WisdomServiceLogAwareTestCase):
+    """Test AnsibleLintCaller linting in memory"""
+
+    def setUp(self):
+        super().setUp()
+        self.ansibleLintCaller = AnsibleLintCaller(in_memory=True)
+
+    def test_ansible_lint_caller(self):
+        with patch.object(tempfile, "TemporaryDirectory") as temporary_directory:
+            result = self.ansibleLintCaller.run_linter(normal_sample_yaml)
+        self.assertEqual(result, normal_fixed_sample_yaml)
+        temporary_directory.assert_not_called()
+        self.assertFalse(os.path.exists(TEMP_TASK_FOLDER))
+
+    def test_same_result_as_files(self):
+        samples = [
+            normal_sample_yaml,
+            "- name: Copy\n  copy:\n    src: a\n    dest: b\n    mode: 0644\n  become: yes\n",
+            "    - name: Install\n      package: name=nginx state=present\n",
+        ]
+        for sample in samples:
+            with self.subTest(sample=sample):
+                self.assertEqual(
+                    self.ansibleLintCaller.run_linter(sample),
+                    AnsibleLintCaller().run_linter(sample),
+                )
+
+    def test_ansible_lint_caller_with_error(self):
+        with self.assertLogs(logger="root", level="ERROR") as log:
+            result = self.ansibleLintCaller.run_linter(error_sample_yaml)
+            self.assertEqual(result, error_sample_yaml)
+            self.assertInLog(
+                "ruamel.yaml.scanner.ScannerError: while scanning a simple key",
+                log,
+            )
+
+    def test_multi_thread(self):
+        samples = [normal_sample_yaml, error_sample_yaml] * 5
+        with self.assertLogs(logger="root", level="ERROR"):
+            with ThreadPool(5) as pool:
+                results = pool.map(self.ansibleLintCaller.run_linter, samples)
+        self.assertEqual(results, [normal_fixed_sample_yaml, error_sample_yaml] * 5)
+
+
+class TestLintPostprocessingCache(WisdomServiceLogAwareTestCase):
+    """Test AnsibleLintCaller reusing the snippets already linted"""
+
+    def test_cache(self):
+        ansibleLintCaller = AnsibleLintCaller(
+            in_memory=True, cache=PostProcessCache("ansible_lint", 1024 * 1024)
+        )
+        with patch.object(
+            ansibleLintCaller,
+            "_run_linter_in_memory",
+            wraps=ansibleLintCaller._run_linter_in_memory,
+        ) as run_linter:
+            first = ansibleLintCaller.run_linter(normal_sample_yaml)
+            second = ansibleLintCaller.run_linter(normal_sample_yaml)
+        self.assertEqual(first, normal_fixed_sample_yaml)
+        self.assertEqual(second, normal_fixed_sample_yaml)
+        run_linter.assert_called_once()
+
+    def test_pool_fallback_not_cached(self):
+        pool = Mock(run_linter=Mock(side_effect=[None, normal_fixed_sample_yaml]))
+        ansibleLintCaller = AnsibleLintCaller(
+            pool=pool, cache=PostProcessCache("ansible_lint", 1024 * 1024)
+        )
+        self.assertEqual(ansibleLintCaller.run_linter(normal_sample_yaml), normal_sample_yaml)
+        self.assertEqual(ansibleLintCaller.run_linter(normal_sample_yaml), normal_fixed_sample_yaml)
+        self.assertEqual(ansibleLintCaller.run_linter(normal_sample_yaml), normal_fixed_sample_yaml)
+        self.assertEqual(pool.run_linter.call_count, 2)
@@ -0,0 +1,190 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.ansible_lint.lintpostprocessing import AnsibleLintCaller
+from ansible_ai_connect.ansible_lint.worker_pool import (
+    WARM_UP_YAML,
+    LintWorkerPool,
+    python_executable,
+)
+
+# Starts a pool as uWSGI would: sys.executable is not a Python interpreter
+NOT_PYTHON_EXECUTABLE_SCRIPT = """
+import sys
+sys.executable = "/usr/local/bin/uwsgi"
+import time
+from ansible_ai_connect.ansible_lint.tests.test_worker_pool import FakeLinter
+from ansible_ai_connect.ansible_lint.worker_pool import LintWorkerPool
+pool = LintWorkerPool(workers=1, timeout=5, cpu_limit=0.5, max_queue=1, linter=FakeLinter)
+for _ in range(300):
+    if not pool._idle.empty():
+        break
+    time.sleep(0.1)
+print(pool.run_linter("- name: hello"))
+"""
+
+
+def get_fallback_count(reason):
+    name = "ansible_lint_pool_fallback_total"
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name, {"reason": reason}) or 0.0
+
+
+def get_start_failure_count():
+    name = "ansible_lint_pool_worker_start_failures_total"
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+class FakeLinter:
+    # Runs in the workers, the pool unpickles it there
+    def run_linter(self, inline_completion):
+        if inline_completion == "slow":
+            time.sleep(60)
+        if inline_completion == "busy":
+            while True:
+                pass
+        return inline_completion.upper()
+
+
+class FlakyLinter(FakeLinter):
+    # Fails to start once, the marker file records the failure across the workers
+    def __init__(self, marker):
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            raise RuntimeError("failed to start")
+
+
+class TestLintWorkerPool(SimpleTestCase):
+    def get_pool(self, workers=1, **kwargs):
+        pool = LintWorkerPool(
+            workers=workers,
+            **({"timeout": 5, "cpu_limit": 0.5, "max_queue": 1, "linter": FakeLinter} | kwargs),
+        )
+        self.wait_ready(pool, workers)
+        self.addCleanup(self.stop, pool)
+        return pool
+
+    def wait_ready(self, pool, workers):
+        # The first worker waits for the fork server to load ansible-lint
+        for _ in range(300):
+            if pool._idle.qsize() == workers:
+                return
+            time.sleep(0.1)
+        self.fail("the ansible-lint workers did not start")
+
+    def stop(self, pool):
+        while not pool._idle.empty():
+            pool._idle.get().stop()
+
+    def test_run_linter(self):
+        pool = self.get_pool()
+        self.assertEqual(pool.run_linter("- name: hello"), "- NAME: HELLO")
+        self.assertEqual(pool.run_linter(WARM_UP_YAML), WARM_UP_YAML.upper())
+
+    def test_timeout(self):
+        pool = self.get_pool(timeout=0.5)
+        count = get_fallback_count("timeout")
+        self.assertIsNone(pool.run_linter("slow"))
+        self.assertEqual(get_fallback_count("timeout"), count + 1)
+        # The worker was replaced
+        self.wait_ready(pool, 1)
+        self.assertEqual(pool.run_linter("fast"), "FAST")
+
+    def test_cpu_limit(self):
+        pool = self.get_pool()
+        count = get_fallback_count("cpu_limit")
+        self.assertIsNone(pool.run_linter("busy"))
+        self.assertEqual(get_fallback_count("cpu_limit"), count + 1)
+        # The worker is still available
+        self.assertEqual(pool.run_linter("fast"), "FAST")
+
+    def test_saturated(self):
+        pool = self.get_pool(max_queue=0)
+        worker = pool._acquire(1)
+        count = get_fallback_count("saturated")
+        self.assertIsNone(pool.run_linter("fast"))
+        self.assertEqual(get_fallback_count("saturated"), count + 1)
+        pool._release(worker)
+
+    def test_not_ready(self):
+        pool = self.get_pool(workers=0, timeout=60)
+        count = get_fallback_count("not_ready")
+        start = time.monotonic()
+        self.assertIsNone(pool.run_linter("fast"))
+        # No waiting for a worker which never started
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(get_fallback_count("not_ready"), count + 1)
+
+    def test_worker_error(self):
+        pool = self.get_pool()
+        pool._idle.queue[0].process.kill()
+        pool._idle.queue[0].process.join()
+        count = get_fallback_count("worker_error")
+        self.assertIsNone(pool.run_linter("fast"))
+        self.assertEqual(get_fallback_count("worker_error"), count + 1)
+        self.wait_ready(pool, 1)
+        self.assertEqual(pool.run_linter("fast"), "FAST")
+
+    @patch("ansible_ai_connect.ansible_lint.worker_pool.WARM_UP_RETRY_DELAY", 0.1)
+    def test_worker_start_failure(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            count = get_start_failure_count()
+            linter = functools.partial(FlakyLinter, os.path.join(tmp_dir, "started"))
+            # The worker failing to warm up is started again
+            pool = self.get_pool(linter=linter)
+            self.assertEqual(get_start_failure_count(), count + 1)
+            self.assertEqual(pool.run_linter("fast"), "FAST")
+
+
+class TestPythonExecutable(SimpleTestCase):
+    def test_python(self):
+        with patch.object(sys, "executable", "/venv/bin/python3"):
+            self.assertEqual(python_executable(), "/venv/bin/python3")
+
+    def test_not_python(self):
+        with patch.object(sys, "executable", "/usr/local/bin/uwsgi"):
+            executable = python_executable()
+        self.assertTrue(os.path.basename(executable).startswith("python"))
+        self.assertEqual(os.path.dirname(executable), os.path.join(sys.prefix, "bin"))
+
+    def test_pool_with_not_python_executable(self):
+        # The fork server is shared by the pools of a process, this one starts its own
+        result = subprocess.run(
+            [sys.executable, "-c", NOT_PYTHON_EXECUTABLE_SCRIPT],
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(result.stdout.strip(), "- NAME: HELLO", result.stderr)
+
+
+class TestAnsibleLintCallerPool(SimpleTestCase):
+    def test_run_linter(self):
+        pool = Mock(spec=LintWorkerPool)
+        pool.run_linter.return_value = "linted"
+        self.assertEqual(AnsibleLintCaller(pool=pool).run_linter("- name: hello"), "linted")
+        pool.run_linter.assert_called_once_with("- name: hello")
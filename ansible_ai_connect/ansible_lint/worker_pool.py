@@ -0,0 +1,262 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Pool of worker processes running ansible-lint, so a pathological suggestion
+cannot hold a request thread, or the uWSGI worker, for longer than a time limit.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Gauge, Histogram
+
+from ansible_ai_connect.ai.api.utils.deadline import remaining_time
+
+logger = logging.getLogger(__name__)
+
+lint_pool_queue_depth_gauge = Gauge(
+    "ansible_lint_pool_queue_depth",
+    "Number of lint calls waiting for an idle ansible-lint worker",
+    namespace=NAMESPACE,
+)
+lint_pool_idle_workers_gauge = Gauge(
+    "ansible_lint_pool_idle_workers",
+    "Number of idle ansible-lint workers",
+    namespace=NAMESPACE,
+)
+lint_pool_latency_hist = Histogram(
+    "ansible_lint_pool_latency_seconds",
+    "Histogram of the lint calls made to the ansible-lint workers, waiting included",
+    namespace=NAMESPACE,
+)
+lint_pool_worker_start_failure_counter = Counter(
+    "ansible_lint_pool_worker_start_failures",
+    "Counter of ansible-lint workers failing to start or to warm up",
+    namespace=NAMESPACE,
+)
+lint_pool_fallback_counter = Counter(
+    "ansible_lint_pool_fallback",
+    "Counter of lint calls returning no result",
+    ["reason"],
+    namespace=NAMESPACE,
+)
+
+WARM_UP_YAML = "- name: Warm up\n  debug:\n    msg: ready\n"
+# Seconds a new worker has to load ansible-lint and lint WARM_UP_YAML
+WARM_UP_TIMEOUT = 120
+# Seconds before a worker failing to start is started again, doubled after each failure
+WARM_UP_RETRY_DELAY = 1
+WARM_UP_RETRY_MAX_DELAY = 300
+READY = "ready"
+
+
+class CpuLimitExceeded(BaseException):
+    """
+    Raised in a worker when a call used up its CPU time. It is not an Exception so
+    that the linter does not swallow it.
+    """
+
+
+def _raise_cpu_limit_exceeded(signum, frame):
+    raise CpuLimitExceeded()
+
+
+def python_executable() -> str:
+    """The Python interpreter of the service, under uWSGI sys.executable is uWSGI."""
+    if os.path.basename(sys.executable).startswith("python"):
+        return sys.executable
+    version = sys.version_info
+    for name in (f"python{version.major}.{version.minor}", f"python{version.major}", "python"):
+        path = os.path.join(sys.prefix, "bin", name)
+        if os.access(path, os.X_OK):
+            return path
+    return sys.executable
+
+
+def in_memory_linter():
+    from ansible_ai_connect.ansible_lint.lintpostprocessing import AnsibleLintCaller
+
+    return AnsibleLintCaller(in_memory=True)
+
+
+def run_worker(conn, cpu_limit: float, linter: Callable[[], Any]) -> None:
+    """Main loop of a worker process: lints the suggestions received on conn."""
+    # The fork server, it exits with the service process
+    parent_pid = os.getppid()
+    ansible_lint_caller = linter()
+    ansible_lint_caller.run_linter(WARM_UP_YAML)
+    signal.signal(signal.SIGPROF, _raise_cpu_limit_exceeded)
+    conn.send(READY)
+    while os.getppid() == parent_pid:
+        if not conn.poll(1):
+            continue
+        try:
+            inline_completion = conn.recv()
+        except EOFError:
+            break
+        try:
+            # Counts the CPU time of the call only
+            signal.setitimer(signal.ITIMER_PROF, cpu_limit)
+            try:
+                result = ("ok", ansible_lint_caller.run_linter(inline_completion))
+            finally:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+        except CpuLimitExceeded:
+            result = ("cpu_limit", None)
+        conn.send(result)
+
+
+class LintWorker:
+    def __init__(self, context, cpu_limit: float, linter: Callable[[], Any]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=run_worker,
+            args=(child_conn, cpu_limit, linter),
+            name="ansible-lint",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class LintWorkerPool:
+    """
+    Lints suggestions in worker processes, warmed up before their first call. A call
+    returns no result when the pool is saturated, or when it times out or exceeds its
+    CPU time, the worker is then replaced.
+
+    `linter` is a picklable callable returning the linter of a worker.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        cpu_limit: float,
+        max_queue: int,
+        linter: Callable[[], Any] = in_memory_linter,
+    ):
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.max_queue = max_queue
+        self.linter = linter
+        # The workers are forked from a single-threaded fork server, and not from the
+        # service process: its threads may hold locks (logging, imports) a forked child
+        # would never see released. The fork server loads ansible-lint once.
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_executable(python_executable())
+        self._context.set_forkserver_preload(["ansible_ai_connect.ansible_lint.lintpostprocessing"])
+        self._idle: queue.Queue[LintWorker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        # Set once a worker warmed up, calls do not wait for workers that may never start
+        self._ready = threading.Event()
+        for _ in range(workers):
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        threading.Thread(target=self._warm_up, name="ansible-lint-warm-up", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        """Starts a worker, and starts it again with a backoff until it warms up."""
+        failures = 0
+        while True:
+            worker = None
+            try:
+                worker = LintWorker(self._context, self.cpu_limit, self.linter)
+                if worker.conn.poll(WARM_UP_TIMEOUT) and worker.conn.recv() == READY:
+                    self._ready.set()
+                    self._release(worker)
+                    return
+            except (EOFError, OSError):
+                pass
+            logger.error("ansible-lint worker failed to start")
+            lint_pool_worker_start_failure_counter.inc()
+            if worker:
+                worker.stop()
+            failures += 1
+            time.sleep(min(WARM_UP_RETRY_DELAY * 2 ** (failures - 1), WARM_UP_RETRY_MAX_DELAY))
+
+    def _release(self, worker: LintWorker) -> None:
+        self._idle.put(worker)
+        lint_pool_idle_workers_gauge.inc()
+
+    def _acquire(self, timeout: float) -> Optional[LintWorker]:
+        with self._lock:
+            if self._waiting >= self.max_queue and self._idle.empty():
+                return None
+            self._waiting += 1
+        lint_pool_queue_depth_gauge.inc()
+        try:
+            worker = self._idle.get(timeout=timeout)
+            lint_pool_idle_workers_gauge.dec()
+            return worker
+        except queue.Empty:
+            return None
+        finally:
+            lint_pool_queue_depth_gauge.dec()
+            with self._lock:
+                self._waiting -= 1
+
+    def _replace(self, worker: LintWorker) -> None:
+        worker.stop()
+        self._start_worker()
+
+    def _fallback(self, reason: str) -> None:
+        logger.warning(f"ansible-lint post-processing skipped: {reason}")
+        lint_pool_fallback_counter.labels(reason=reason).inc()
+        return None
+
+    def run_linter(self, inline_completion: str) -> Optional[str]:
+        """The linted snippet, None when it could not be linted in time."""
+        start = time.monotonic()
+        timeout = self.timeout
+        remaining = remaining_time()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+
+        if not self._ready.is_set():
+            return self._fallback("not_ready")
+        worker = self._acquire(timeout)
+        if worker is None:
+            return self._fallback("saturated")
+        try:
+            worker.conn.send(inline_completion)
+            if not worker.conn.poll(max(timeout - (time.monotonic() - start), 0)):
+                self._replace(worker)
+                return self._fallback("timeout")
+            status, result = worker.conn.recv()
+        except (EOFError, OSError):
+            self._replace(worker)
+            return self._fallback("worker_error")
+        self._release(worker)
+        lint_pool_latency_hist.observe(time.monotonic() - start)
+
+        if status != "ok":
+            return self._fallback(status)
+        return result
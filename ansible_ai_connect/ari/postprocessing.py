@@ -16,15 +16,40 @@ import contextlib
 import json
 import logging
 import timeit
+from importlib.metadata import version
+from typing import Optional
 
-import yaml
 from ansible_risk_insight.scanner import ARIScanner
 from django.conf import settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Gauge
 
 from ansible_ai_connect.ai.api import formatter as fmtr
+from ansible_ai_connect.ai.api.utils.documents import load_yaml
+from ansible_ai_connect.ai.api.utils.postprocess_cache import (
+    PostProcessCache,
+    cache_key,
+)
 
 logger = logging.getLogger(__name__)
 
+ari_warm_up_seconds_gauge = Gauge(
+    "ari_warm_up_seconds",
+    "Time taken to initialize and warm up ARI",
+    namespace=NAMESPACE,
+)
+ari_warm_up_memory_gauge = Gauge(
+    "ari_warm_up_memory_bytes",
+    "Increase of the peak resident memory of the process while ARI was warmed up",
+    namespace=NAMESPACE,
+)
+
+ARI_VERSION = version("ansible-risk-insight")
+
+WARM_UP_CONTEXT = "- hosts: all\n  tasks:\n"
+WARM_UP_PROMPT = "    - name: Install nginx\n"
+WARM_UP_SUGGESTION = "      ansible.builtin.package:\n        name: nginx\n"
+
 
 @contextlib.contextmanager
 def time_activity(activity_name: str):
@@ -39,8 +64,11 @@ def time_activity(activity_name: str):
 
 
 class ARICaller:
-    def __init__(self, config, silent) -> None:
+    def __init__(self, config, silent, cache: Optional[PostProcessCache] = None) -> None:
+        self.config = config
         self.ari_scanner = ARIScanner(config=config, silent=silent)
+        # Results of the suggestions already post-processed
+        self.cache = cache
 
     @classmethod
     def indent(cls, text, level):
@@ -91,7 +119,7 @@ class ARICaller:
         is_playbook = False
         if context:
             try:
-                context_data = yaml.safe_load(context)
+                context_data = load_yaml(context)
                 if isinstance(context_data, list) and any(
                     play_keyword in context_data[-1]
                     for play_keyword in ["tasks", "pre_tasks", "post_tasks", "handlers"]
@@ -103,7 +131,7 @@ class ARICaller:
         playbook_yaml = context + "\n" + prompt + "\n" + suggestion
         try:
             # check if the playbook yaml is valid
-            _ = yaml.safe_load(playbook_yaml)
+            _ = load_yaml(playbook_yaml)
         except Exception:
             logger.exception(
                 f"failed to create a valid playbook YAML which can be loaded correctly: "
@@ -114,7 +142,40 @@ class ARICaller:
         logger.debug(f"generated playbook yaml: \n{playbook_yaml}")
         return playbook_yaml, is_playbook
 
+    def warm_up(self) -> None:
+        """Loads the rules and the knowledge base of the scanners on a sample suggestion."""
+        input_yaml, is_playbook = self.make_input_yaml(
+            WARM_UP_CONTEXT, WARM_UP_PROMPT, WARM_UP_SUGGESTION
+        )
+        self.evaluate(self.ari_scanner, input_yaml, is_playbook)
+
+    @staticmethod
+    def evaluate(ari_scanner, input_yaml, is_playbook):
+        target_type = "playbook"
+        if not is_playbook:
+            target_type = "taskfile"
+
+        result = ari_scanner.evaluate(
+            type=target_type,
+            raw_yaml=input_yaml,
+        )
+        target = result.find_target(yaml_str=input_yaml, target_type=target_type)
+        if not target:
+            raise ValueError(f"the {target_type} was not found")
+        return target
+
     def postprocess(self, inference_output, prompt, context):
+        if self.cache is None:
+            return self._postprocess(inference_output, prompt, context)
+        # The configuration holds the rules, and the directories of the rules and knowledge base
+        key = cache_key(ARI_VERSION, repr(self.config), inference_output, prompt, context)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._postprocess(inference_output, prompt, context)
+            self.cache.set(key, result)
+        return result
+
+    def _postprocess(self, inference_output, prompt, context):
         input_yaml, is_playbook = self.make_input_yaml(context, prompt, inference_output)
 
         # print("---context---")
@@ -128,17 +189,7 @@ class ARICaller:
         # print("---task_name---")
         # print(task_name)
 
-        target_type = "playbook"
-        if not is_playbook:
-            target_type = "taskfile"
-
-        result = self.ari_scanner.evaluate(
-            type=target_type,
-            raw_yaml=input_yaml,
-        )
-        target = result.find_target(yaml_str=input_yaml, target_type=target_type)
-        if not target:
-            raise ValueError(f"the {target_type} was not found")
+        target = self.evaluate(self.ari_scanner, input_yaml, is_playbook)
 
         ari_results = []
         modified_yamls = []
@@ -152,48 +203,64 @@ class ARICaller:
         if fmtr.is_multi_task_prompt(prompt):
             predicted_task_names = fmtr.get_task_names_from_tasks(inference_output)
         for i, original_anonymized_task_name in enumerate(original_task_names):
-            predicted_task_name = predicted_task_names[i]
-            detail_data = {}
-            ari_result = {"name": original_anonymized_task_name, "rule_details": detail_data}
+            task_modified_yamls, ari_result = self.get_task_result(
+                target,
+                original_anonymized_task_name,
+                predicted_task_names[i],
+                fmtr.is_multi_task_prompt(prompt),
+            )
+            modified_yamls.extend(task_modified_yamls)
             ari_results.append(ari_result)
-            task = target.task(name=predicted_task_name)
-            if task:
-                rule_result = task.find_result(rule_id=settings.ARI_RULE_FOR_OUTPUT_RESULT)
-                detail = rule_result.get_detail()
-                aggregated_detail = detail.get("detail", {})
-
-                if fmtr.is_multi_task_prompt(prompt):
-                    # Here we are using the anonyimized prompt, NOT what came back
-                    # from WCA, which should be the same.
-                    # TODO: See if we can get this task name back from ARI instead,
-                    # which might result in e.g. values being replaced with variables
-                    modified_yamls.append(f"- name: {predicted_task_name}")
-
-                task_modified_yaml = detail.get("modified_yaml")
-                if task_modified_yaml is None:
-                    raise Exception("no modified yaml returned from ARI")
-                modified_yamls.append(task_modified_yaml)
-
-                mutation_result = aggregated_detail.get("mutation_result", {})
-                ari_result["fqcn_module"] = aggregated_detail.get("correct_fqcn", "")
-                for rule_id in mutation_result:
-                    rule_detail = mutation_result[rule_id]
-                    if not rule_detail:
-                        continue
-                    _result = task.find_result(rule_id=rule_id)
-                    if _result:
-                        if "description" not in rule_detail:
-                            rule_detail["description"] = _result.description
-                        if _result.rule:
-                            rule_detail["version"] = _result.rule.version
-                            rule_detail["commit_id"] = _result.rule.commit_id
-                        rule_detail["duration"] = _result.duration
-                        rule_detail["matched"] = _result.matched
-                        rule_detail["error"] = _result.error
-                    detail_data[rule_id] = rule_detail
-            else:
-                raise Exception("task not found in ARI postprocess results")
 
+        return self.merge_results(inference_output, modified_yamls, ari_results)
+
+    @staticmethod
+    def get_task_result(target, original_anonymized_task_name, predicted_task_name, multi_task):
+        modified_yamls = []
+        detail_data = {}
+        ari_result = {"name": original_anonymized_task_name, "rule_details": detail_data}
+        task = target.task(name=predicted_task_name)
+        if task:
+            rule_result = task.find_result(rule_id=settings.ARI_RULE_FOR_OUTPUT_RESULT)
+            detail = rule_result.get_detail()
+            aggregated_detail = detail.get("detail", {})
+
+            if multi_task:
+                # Here we are using the anonyimized prompt, NOT what came back
+                # from WCA, which should be the same.
+                # TODO: See if we can get this task name back from ARI instead,
+                # which might result in e.g. values being replaced with variables
+                modified_yamls.append(f"- name: {predicted_task_name}")
+
+            task_modified_yaml = detail.get("modified_yaml")
+            if task_modified_yaml is None:
+                raise Exception("no modified yaml returned from ARI")
+            modified_yamls.append(task_modified_yaml)
+
+            mutation_result = aggregated_detail.get("mutation_result", {})
+            ari_result["fqcn_module"] = aggregated_detail.get("correct_fqcn", "")
+            for rule_id in mutation_result:
+                rule_detail = mutation_result[rule_id]
+                if not rule_detail:
+                    continue
+                _result = task.find_result(rule_id=rule_id)
+                if _result:
+                    if "description" not in rule_detail:
+                        rule_detail["description"] = _result.description
+                    if _result.rule:
+                        rule_detail["version"] = _result.rule.version
+                        rule_detail["commit_id"] = _result.rule.commit_id
+                    rule_detail["duration"] = _result.duration
+                    rule_detail["matched"] = _result.matched
+                    rule_detail["error"] = _result.error
+                detail_data[rule_id] = rule_detail
+        else:
+            raise Exception("task not found in ARI postprocess results")
+
+        return modified_yamls, ari_result
+
+    @staticmethod
+    def merge_results(inference_output, modified_yamls, ari_results):
         modified_yaml = "\n".join(modified_yamls)
         # return inference_output
         logger.debug("--before--")
@@ -12,8 +12,12 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import re
+from unittest.mock import Mock, patch
+
 from django.test import TestCase
 
+from ansible_ai_connect.ai.api.utils.postprocess_cache import PostProcessCache
 from ansible_ai_connect.ari import postprocessing
 
 
@@ -84,3 +88,76 @@ class ARICallerTestCase(TestCase):
         )
         _, is_playbook = ari_caller.make_input_yaml(context, prompt, inference_output)
         self.assertFalse(is_playbook)
+
+
+class FakeARIScanner:
+    """Returns each task with its module turned into a FQCN."""
+
+    def __init__(self, config=None, silent=True):
+        self.scanned = []
+
+    def evaluate(self, type, raw_yaml):
+        self.scanned.append(raw_yaml)
+        tasks = {}
+        for name, module in re.findall(r"- name: (.+)\n\s+(\w+):", raw_yaml):
+            tasks[name] = Mock(
+                find_result=Mock(
+                    return_value=Mock(
+                        get_detail=Mock(
+                            return_value={
+                                "modified_yaml": f"  ansible.builtin.{module}:",
+                                "detail": {"correct_fqcn": f"ansible.builtin.{module}"},
+                            }
+                        )
+                    )
+                )
+            )
+        target = Mock(task=Mock(side_effect=lambda name: tasks.get(name)))
+        return Mock(find_target=Mock(return_value=target))
+
+
+class ARICallerPostprocessTestCase(TestCase):
+    context = "- hosts: all\n  tasks:\n"
+    prompt = "    # install nginx & start nginx & copy file\n"
+    inference_output = (
+        "    - name: install nginx\n      package:\n        name: nginx\n"
+        "    - name: start nginx\n      service:\n        name: nginx\n"
+        "    - name: copy file\n      copy:\n        src: a\n        dest: b"
+    )
+    expected_yaml = (
+        "- name: install nginx\n  ansible.builtin.package:\n"
+        "- name: start nginx\n  ansible.builtin.service:\n"
+        "- name: copy file\n  ansible.builtin.copy:"
+    )
+
+    def test_postprocess(self):
+        with patch.object(postprocessing, "ARIScanner", FakeARIScanner):
+            ari_caller = postprocessing.ARICaller(config=None, silent=True)
+            modified_yaml, ari_results = ari_caller.postprocess(
+                self.inference_output, self.prompt, self.context
+            )
+        self.assertEqual(modified_yaml, self.expected_yaml)
+        self.assertEqual(
+            [r["fqcn_module"] for r in ari_results],
+            ["ansible.builtin.package", "ansible.builtin.service", "ansible.builtin.copy"],
+        )
+        # The tasks are evaluated in a single scan
+        self.assertEqual(len(ari_caller.ari_scanner.scanned), 1)
+
+    def test_cache(self):
+        with patch.object(postprocessing, "ARIScanner", FakeARIScanner):
+            ari_caller = postprocessing.ARICaller(
+                config=None, silent=True, cache=PostProcessCache("ari", 1024 * 1024)
+            )
+            first = ari_caller.postprocess(self.inference_output, self.prompt, self.context)
+            second = ari_caller.postprocess(self.inference_output, self.prompt, self.context)
+            ari_caller.postprocess(self.inference_output, self.prompt, "- hosts: db\n  tasks:\n")
+        self.assertEqual(first, second)
+        self.assertEqual(second[0], self.expected_yaml)
+        self.assertEqual(len(ari_caller.ari_scanner.scanned), 2)
+
+    def test_warm_up(self):
+        with patch.object(postprocessing, "ARIScanner", FakeARIScanner):
+            ari_caller = postprocessing.ARICaller(config=None, silent=True)
+            ari_caller.warm_up()
+        self.assertEqual(len(ari_caller.ari_scanner.scanned), 1)
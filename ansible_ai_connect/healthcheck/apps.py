@@ -21,6 +21,7 @@ class HealthCheckAppConfig(AppConfig):
 
     def ready(self):
         from .backends import (
+            ARIHealthCheck,
             AuthorizationHealthCheck,
             AWSSecretManagerHealthCheck,
             ModelServerHealthCheck,
@@ -29,3 +30,4 @@ class HealthCheckAppConfig(AppConfig):
         plugin_dir.register(ModelServerHealthCheck)
         plugin_dir.register(AWSSecretManagerHealthCheck)
         plugin_dir.register(AuthorizationHealthCheck)
+        plugin_dir.register(ARIHealthCheck)
@@ -17,7 +17,10 @@ from django.conf import settings
 from health_check.backends import BaseHealthCheckBackend
 from health_check.exceptions import HealthCheckException, ServiceUnavailable
 
-from ansible_ai_connect.ai.api.aws.wca_secret_manager import Suffixes
+from ansible_ai_connect.ai.api.aws.wca_secret_manager import (
+    CachingSecretManager,
+    Suffixes,
+)
 from ansible_ai_connect.users.constants import FAUX_COMMERCIAL_USER_ORG_ID
 
 ERROR_MESSAGE = "An error occurred"
@@ -104,9 +107,11 @@ class AWSSecretManagerHealthCheck(BaseLightspeedHealthCheck):
             return
 
         try:
-            apps.get_app_config("ai").get_wca_secret_manager().get_secret(
-                FAUX_COMMERCIAL_USER_ORG_ID, Suffixes.API_KEY
-            )
+            secret_manager = apps.get_app_config("ai").get_wca_secret_manager()
+            if isinstance(secret_manager, CachingSecretManager):
+                # The cache must not hide an outage of the backend
+                secret_manager = secret_manager.secret_manager
+            secret_manager.get_secret(FAUX_COMMERCIAL_USER_ORG_ID, Suffixes.API_KEY)
         except Exception as e:
             self.add_error(ServiceUnavailable(ERROR_MESSAGE), e)
 
@@ -129,3 +134,15 @@ class AuthorizationHealthCheck(BaseLightspeedHealthCheck):
 
     def identifier(self):
         return self.__class__.__name__
+
+
+class ARIHealthCheck(BaseLightspeedHealthCheck):
+    critical_service = True
+
+    def check_status(self):
+        # The service is not ready to post-process suggestions until ARI is warm
+        if apps.get_app_config("ai").is_ari_caller_warming_up():
+            self.add_error(ServiceUnavailable("ARI is warming up"))
+
+    def identifier(self):
+        return self.__class__.__name__
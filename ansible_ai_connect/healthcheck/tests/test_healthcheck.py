@@ -121,7 +121,7 @@ class BaseTestHealthCheck(WisdomAppsBackendMocking, APITestCase, WisdomServiceLo
         self.assert_common_data(data, expected_status, deployed_region)
         timestamp = data["timestamp"]
         dependencies = data.get("dependencies", [])
-        self.assertEqual(4, len(dependencies))
+        self.assertEqual(5, len(dependencies))
         for dependency in dependencies:
             self.assertIn(
                 dependency["name"],
@@ -131,6 +131,7 @@ class BaseTestHealthCheck(WisdomAppsBackendMocking, APITestCase, WisdomServiceLo
                     "model-server",
                     "secret-manager",
                     "authorization",
+                    "ari",
                 ],
             )
             self.assertGreaterEqual(dependency["time_taken"], 0)
@@ -274,6 +275,35 @@ class TestHealthCheck(BaseTestHealthCheck):
             else:
                 self.assertTrue(self.is_status_ok(dependency["status"]))
 
+    def test_health_check_ari_warming_up(self):
+        cache.clear()
+        with patch.object(apps.get_app_config("ai"), "is_ari_caller_warming_up", return_value=True):
+            with self.assertLogs(logger="root", level="ERROR"):
+                r = self.client.get(reverse("health_check"))
+
+        self.assertEqual(r.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+        _, dependencies = self.assert_basic_data(r, "error")
+        for dependency in dependencies:
+            if dependency["name"] == "ari":
+                self.assertEqual(dependency["status"], "unavailable: ARI is warming up")
+            else:
+                self.assertTrue(self.is_status_ok(dependency["status"]))
+
+    def test_health_check_ari_warming_up_after_cached_response(self):
+        cache.clear()
+        # Cached by a process, or a pod, where ARI is warm
+        r = self.client.get(reverse("health_check"))
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+
+        with patch.object(apps.get_app_config("ai"), "is_ari_caller_warming_up", return_value=True):
+            with self.assertLogs(logger="root", level="ERROR"):
+                r = self.client.get(reverse("health_check"))
+        self.assertEqual(r.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        # The response of the warming process was not cached
+        r = self.client.get(reverse("health_check"))
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+
 
 @override_settings(ANSIBLE_AI_MODEL_MESH_API_TYPE="grpc")
 class TestHealthCheckGrpcClient(BaseTestHealthCheck):
@@ -16,6 +16,7 @@ import json
 import logging
 from datetime import datetime
 
+from django.apps import apps
 from django.conf import settings
 from django.http import HttpResponse, JsonResponse
 from django.utils.decorators import method_decorator
@@ -60,10 +61,17 @@ class HealthCheckCustomView(MainView):
         "WCAHealthCheck": "wca",
         "WCAOnPremHealthCheck": "wca-onprem",
         "AuthorizationHealthCheck": "authorization",
+        "ARIHealthCheck": "ari",
     }
 
-    @method_decorator(cache_page(CACHE_TIMEOUT))
     def get(self, request, *args, **kwargs):
+        # The cached response may come from another process, or pod, where ARI is warm
+        if apps.get_app_config("ai").is_ari_caller_warming_up():
+            return self.render_to_response_json(self.plugins, 200, request.user)
+        return self.get_cached(request, *args, **kwargs)
+
+    @method_decorator(cache_page(CACHE_TIMEOUT))
+    def get_cached(self, request, *args, **kwargs):
         status_code = 200  # Set status code to 200 for letting the output be cached
         return self.render_to_response_json(self.plugins, status_code, request.user)
 
@@ -12,14 +12,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import inspect
 import logging
 
+from asgiref.sync import markcoroutinefunction, sync_to_async
 from django.core import exceptions as core_exceptions
 from django.http import HttpResponseRedirect
 from django.views.generic import TemplateView
 from rest_framework import exceptions
 from rest_framework.request import Request
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
 logger = logging.getLogger(__name__)
 
@@ -141,3 +144,44 @@ class ProtectedTemplateView(TemplateView):
                     message=getattr(permission, "message", None),
                     code=getattr(permission, "code", None),
                 )
+
+
+class AsyncAPIView(APIView):
+    """
+    Extends APIView to support coroutine method handlers.
+
+    The dispatching mirrors APIView.dispatch(). Authentication, permission and
+    throttling checks as well as the exception handling may use the database
+    and so are run in a thread.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # csrf_exempt() hides that the view returns a coroutine
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,165 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Circuit breakers of the upstream services, one per host, shared by all the clients.
+"""
+
+import logging
+import threading
+import time
+from enum import IntEnum
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+circuit_breaker_state_gauge = Gauge(
+    "upstream_circuit_breaker_state",
+    "State of the upstream services circuit breakers (0: closed, 1: half-open, 2: open)",
+    ["host"],
+    namespace=NAMESPACE,
+)
+circuit_breaker_rejected_counter = Counter(
+    "upstream_circuit_breaker_rejected",
+    "Counter of requests to upstream services rejected by an open circuit breaker",
+    ["host"],
+    namespace=NAMESPACE,
+)
+
+
+class CircuitBreakerOpen(requests.exceptions.ConnectionError):
+    """
+    Raised instead of sending a request to an upstream service whose circuit breaker
+    is open. It is a ConnectionError, so the callers handle it as an unreachable service.
+    """
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and then rejects the requests.
+    After `recovery_timeout` seconds, up to `half_open_max_calls` concurrent requests
+    are let through to probe the service: a success closes the circuit, a failure
+    opens it again.
+    """
+
+    def __init__(
+        self, host: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        circuit_breaker_state_gauge.labels(host=host).set(self._state)
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._get_state()
+
+    def _get_state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state != self._state:
+            logger.warning(f"Circuit breaker of {self.host} is now {state.name}")
+        self._state = state
+        self._probes = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        else:
+            self._failures = 0
+        circuit_breaker_state_gauge.labels(host=self.host).set(state)
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._get_state()
+            if state == CircuitState.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            if state == CircuitState.CLOSED:
+                return
+        circuit_breaker_rejected_counter.labels(host=self.host).inc()
+        raise CircuitBreakerOpen(f"Circuit breaker of {self.host} is open")
+
+    def release(self) -> None:
+        """Ends a call that tells nothing about the health of the service."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == CircuitState.OPEN:
+                return
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._set_state(CircuitState.OPEN)
+                return
+            self._failures += 1
+            if self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold:
+                self._set_state(CircuitState.OPEN)
+
+
+_lock = threading.Lock()
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Returns the circuit breaker of the host `url` points to."""
+    host = urlsplit(url).netloc
+    with _lock:
+        circuit_breaker = _circuit_breakers.get(host)
+        if circuit_breaker is None:
+            circuit_breaker = CircuitBreaker(
+                host,
+                settings.UPSTREAM_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                settings.UPSTREAM_CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                settings.UPSTREAM_CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+            )
+            _circuit_breakers[host] = circuit_breaker
+        return circuit_breaker
+
+
+def reset_circuit_breakers() -> None:
+    with _lock:
+        _circuit_breakers.clear()
+
+
+def is_failure_response(status_code: int) -> bool:
+    # Client errors, rate limiting included, do not mean the service is down
+    return status_code >= 500
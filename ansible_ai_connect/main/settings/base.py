@@ -73,12 +73,48 @@ if "ANSIBLE_AI_MODEL_MESH_MODEL_NAME" in os.environ:
 
 # Model API Timeout (in seconds). Default is None.
 ANSIBLE_AI_MODEL_MESH_API_TIMEOUT = os.getenv("ANSIBLE_AI_MODEL_MESH_API_TIMEOUT")
+# Connection pool of the asyncio model clients, 0 means unlimited.
+ANSIBLE_AI_MODEL_MESH_ASYNC_POOL_SIZE = int(
+    os.getenv("ANSIBLE_AI_MODEL_MESH_ASYNC_POOL_SIZE") or "500"
+)
+ANSIBLE_AI_MODEL_MESH_ASYNC_POOL_SIZE_PER_HOST = int(
+    os.getenv("ANSIBLE_AI_MODEL_MESH_ASYNC_POOL_SIZE_PER_HOST") or "0"
+)
+# Serve the completions with the asyncio model clients, requires an ASGI server.
+ANSIBLE_AI_ENABLE_ASYNC_COMPLETIONS = (
+    os.getenv("ANSIBLE_AI_ENABLE_ASYNC_COMPLETIONS", "False").lower() == "true"
+)
+# Identical completion requests of an organization in flight at the same time share
+# a single model prediction.
+ANSIBLE_AI_ENABLE_COMPLETION_COALESCING = (
+    os.getenv("ANSIBLE_AI_ENABLE_COMPLETION_COALESCING", "True").lower() == "true"
+)
+# Number of post-processed completions kept in memory and reused for identical
+# requests of the same organization, 0 disables the cache.
+ANSIBLE_AI_COMPLETION_CACHE_SIZE = int(os.getenv("ANSIBLE_AI_COMPLETION_CACHE_SIZE") or "0")
+ANSIBLE_AI_COMPLETION_CACHE_TTL = int(os.getenv("ANSIBLE_AI_COMPLETION_CACHE_TTL") or "3600")
+# Seconds a completion request has to be answered in, model calls and retries included,
+# 0 disables the deadline. Keep it under the uWSGI harakiri timeout.
+ANSIBLE_AI_COMPLETION_DEADLINE = float(os.getenv("ANSIBLE_AI_COMPLETION_DEADLINE") or "50")
+# Add the per-stage timings of the completions to the Server-Timing response header
+ANSIBLE_AI_ENABLE_SERVER_TIMING = (
+    os.getenv("ANSIBLE_AI_ENABLE_SERVER_TIMING", "False").lower() == "true"
+)
 
 # WCA - General
 ANSIBLE_WCA_IDP_URL = os.getenv("ANSIBLE_WCA_IDP_URL") or "https://iam.cloud.ibm.com/identity"
 ANSIBLE_WCA_IDP_LOGIN = os.getenv("ANSIBLE_WCA_IDP_LOGIN")
 ANSIBLE_WCA_IDP_PASSWORD = os.getenv("ANSIBLE_WCA_IDP_PASSWORD")
 ANSIBLE_WCA_RETRY_COUNT = int(os.getenv("ANSIBLE_WCA_RETRY_COUNT") or "4")
+# Refresh cached IAM tokens this many seconds before they expire.
+ANSIBLE_WCA_IDP_TOKEN_REFRESH_MARGIN = int(
+    os.getenv("ANSIBLE_WCA_IDP_TOKEN_REFRESH_MARGIN") or "300"
+)
+# Send a second codegen request when the first one is slower than the given percentile
+# of the recent requests, hedging at most ANSIBLE_WCA_HEDGING_MAX_RATE of the requests.
+ANSIBLE_WCA_HEDGING_ENABLED = os.getenv("ANSIBLE_WCA_HEDGING_ENABLED", "False").lower() == "true"
+ANSIBLE_WCA_HEDGING_PERCENTILE = float(os.getenv("ANSIBLE_WCA_HEDGING_PERCENTILE") or "95")
+ANSIBLE_WCA_HEDGING_MAX_RATE = float(os.getenv("ANSIBLE_WCA_HEDGING_MAX_RATE") or "0.05")
 ANSIBLE_WCA_HEALTHCHECK_API_KEY = os.getenv("ANSIBLE_WCA_HEALTHCHECK_API_KEY")
 ANSIBLE_WCA_HEALTHCHECK_MODEL_ID = os.getenv("ANSIBLE_WCA_HEALTHCHECK_MODEL_ID")
 # WCA - "On prem"
@@ -196,9 +232,39 @@ AUTHZ_SSO_SERVER = os.environ.get("AUTHZ_SSO_SERVER")
 AUTHZ_API_SERVER = os.environ.get("AUTHZ_API_SERVER")
 AUTHZ_SSO_TOKEN_SERVICE_TIMEOUT = float(os.getenv("AUTHZ_SSO_TOKEN_SERVICE_TIMEOUT") or "1.0")
 AUTHZ_SSO_TOKEN_SERVICE_RETRY_COUNT = int(os.getenv("AUTHZ_SSO_TOKEN_SERVICE_RETRY_COUNT") or "3")
+# The SSO token is refreshed in background this many seconds before it expires, and again
+# after the retry delay (in seconds) when the refresh fails.
+AUTHZ_SSO_TOKEN_REFRESH_MARGIN = float(os.getenv("AUTHZ_SSO_TOKEN_REFRESH_MARGIN") or "60")
+AUTHZ_SSO_TOKEN_REFRESH_RETRY_DELAY = float(
+    os.getenv("AUTHZ_SSO_TOKEN_REFRESH_RETRY_DELAY") or "10"
+)
 AUTHZ_AMS_SERVICE_RETRY_COUNT = int(os.getenv("AMS_SERVICE_RETRY_COUNT") or "3")
 AUTHZ_AMS_SERVICE_TIMEOUT = float(os.getenv("AUTHZ_AMS_SERVICE_TIMEOUT") or "3.0")
 
+# Connection pools of the upstream HTTP services (WCA, IBM Cloud IAM, SSO, AMS...)
+# Number of hosts to keep a pool for
+UPSTREAM_HTTP_POOL_CONNECTIONS = int(os.getenv("UPSTREAM_HTTP_POOL_CONNECTIONS") or "10")
+# Number of connections kept alive per host
+UPSTREAM_HTTP_POOL_MAXSIZE = int(os.getenv("UPSTREAM_HTTP_POOL_MAXSIZE") or "50")
+# Wait for a pooled connection instead of opening extra ones, this caps the
+# number of connections per host to UPSTREAM_HTTP_POOL_MAXSIZE.
+UPSTREAM_HTTP_POOL_BLOCK = os.getenv("UPSTREAM_HTTP_POOL_BLOCK", "False").lower() == "true"
+UPSTREAM_HTTP_TCP_KEEPALIVE = os.getenv("UPSTREAM_HTTP_TCP_KEEPALIVE", "True").lower() == "true"
+# Stop sending requests to an upstream host after this many consecutive failures
+# (connection errors, timeouts, 5xx), and probe it again after the recovery timeout.
+UPSTREAM_CIRCUIT_BREAKER_ENABLED = (
+    os.getenv("UPSTREAM_CIRCUIT_BREAKER_ENABLED", "True").lower() == "true"
+)
+UPSTREAM_CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(
+    os.getenv("UPSTREAM_CIRCUIT_BREAKER_FAILURE_THRESHOLD") or "10"
+)
+UPSTREAM_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = float(
+    os.getenv("UPSTREAM_CIRCUIT_BREAKER_RECOVERY_TIMEOUT") or "30"
+)
+UPSTREAM_CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS = int(
+    os.getenv("UPSTREAM_CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS") or "1"
+)
+
 
 t_deployment_mode = Literal["saas", "upstream", "onprem"]
 DEPLOYMENT_MODE: t_deployment_mode = cast(
@@ -258,7 +324,14 @@ OAUTH2_PROVIDER = {
     ],
     # 14 hours, to match the duration of the Red Hat SSO sessions
     "REFRESH_TOKEN_EXPIRE_SECONDS": 50_400,
+    "OAUTH2_VALIDATOR_CLASS": "ansible_ai_connect.users.oauth2.CachedOAuth2Validator",
 }
+# How long (in seconds) the OAuth2 access tokens are resolved from the cache, 0 disables it.
+# The cache must be shared by all the processes, so that the tokens revoked by one of them
+# are dropped for all: enabling it requires OAUTH2_TOKEN_CACHE_BACKEND, e.g. set to
+# django.core.cache.backends.redis.RedisCache, the service refuses to start otherwise.
+OAUTH2_TOKEN_CACHE_TTL = int(os.environ.get("OAUTH2_TOKEN_CACHE_TTL") or "0")
+OAUTH2_TOKEN_CACHE_ALIAS = "oauth2_tokens"
 
 #
 # We need to run 'manage.py migrate' before adding our own OAuth2 application model.
@@ -282,6 +355,15 @@ ME_USER_CACHE_TIMEOUT_SEC = int(os.environ.get("ME_USER_CACHE_TIMEOUT_SEC", 30))
 ME_USER_RATE_THROTTLE = os.environ.get("ME_USER_RATE_THROTTLE") or "50/minute"
 SPECIAL_THROTTLING_GROUPS = ["test"]
 
+# How long (in seconds) the seat, subscription, license, trial and WCA API key checks of a
+# user are shared by their requests. 0 disables the cache.
+ENTITLEMENTS_CACHE_TTL = int(os.environ.get("ENTITLEMENTS_CACHE_TTL") or "60")
+
+# How long (in seconds) the parsed RH-SSO signing keys are used before the JWKS is fetched
+# again, and how many verified RH-SSO access tokens are kept until they expire.
+RHSSO_JWKS_CACHE_TTL = int(os.environ.get("RHSSO_JWKS_CACHE_TTL") or "3600")
+RHSSO_TOKEN_CACHE_SIZE = int(os.environ.get("RHSSO_TOKEN_CACHE_SIZE") or "10000")
+
 AMS_ORG_CACHE_TIMEOUT_SEC = int(os.environ.get("AMS_ORG_CACHE_TIMEOUT_SEC", 60 * 60 * 24))
 AMS_SUBSCRIPTION_CACHE_TIMEOUT_SEC = int(
     os.environ.get("AMS_SUBSCRIPTION_CACHE_TIMEOUT_SEC", 60 * 15)
@@ -507,12 +589,33 @@ ARI_RULES = [
 if "ARI_RULES" in os.environ:
     ARI_RULES = os.environ["ARI_RULES"].split(",")
 ARI_RULE_FOR_OUTPUT_RESULT = os.getenv("ARI_RULE_FOR_OUTPUT_RESULT") or "W007"
+# Initialize ARI when the service starts instead of on the first suggestion
+ARI_WARM_UP = os.getenv("ARI_WARM_UP", "False").lower() == "true"
+# Bytes of memory holding the ARI results of the suggestions already processed, 0 disables it.
+# The results are reused until the service restarts, even when the knowledge base changes.
+ARI_CACHE_MAX_BYTES = int(os.getenv("ARI_CACHE_MAX_BYTES") or "0")
 
 ENABLE_ANSIBLE_LINT_POSTPROCESS = (
     os.getenv("ENABLE_ANSIBLE_LINT_POSTPROCESS", "False").lower() == "true"
 )
 
 ANSIBLE_LINT_TRANSFORM_RULES = ["all"]
+# Lint the suggestions in memory rather than in temporary files
+ANSIBLE_LINT_IN_MEMORY = os.getenv("ANSIBLE_LINT_IN_MEMORY", "True").lower() == "true"
+# Bytes of memory holding the linted suggestions, 0 disables it
+ANSIBLE_LINT_CACHE_MAX_BYTES = int(os.getenv("ANSIBLE_LINT_CACHE_MAX_BYTES") or "0")
+# Bytes of memory holding the normalized prompts and suggestions, and as many holding the
+# indented suggestions, 0 disables them
+ANSIBLE_AI_FORMATTER_CACHE_MAX_BYTES = int(
+    os.getenv("ANSIBLE_AI_FORMATTER_CACHE_MAX_BYTES") or str(4 * 1024 * 1024)
+)
+# Number of worker processes running ansible-lint, 0 lints in the request thread.
+# A lint call returns the untransformed suggestion after the timeout, or when it used
+# its CPU time in seconds, or when more than the max queue calls wait for a worker.
+ANSIBLE_LINT_WORKERS = int(os.getenv("ANSIBLE_LINT_WORKERS") or "0")
+ANSIBLE_LINT_WORKER_TIMEOUT = float(os.getenv("ANSIBLE_LINT_WORKER_TIMEOUT") or "10")
+ANSIBLE_LINT_WORKER_CPU_LIMIT = float(os.getenv("ANSIBLE_LINT_WORKER_CPU_LIMIT") or "5")
+ANSIBLE_LINT_WORKER_MAX_QUEUE = int(os.getenv("ANSIBLE_LINT_WORKER_MAX_QUEUE") or "10")
 
 ENABLE_ADDITIONAL_CONTEXT = os.getenv("ENABLE_ADDITIONAL_CONTEXT", "False").lower() == "true"
 
@@ -523,7 +626,12 @@ CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.db.DatabaseCache",
         "LOCATION": "cache",
-    }
+    },
+    OAUTH2_TOKEN_CACHE_ALIAS: {
+        "BACKEND": os.environ.get("OAUTH2_TOKEN_CACHE_BACKEND")
+        or "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": os.environ.get("OAUTH2_TOKEN_CACHE_LOCATION") or "oauth2-tokens",
+    },
 }
 
 t_wca_secret_backend_type = Literal["dummy", "aws_sm"]
@@ -536,6 +644,14 @@ WCA_SECRET_MANAGER_PRIMARY_REGION = os.getenv("WCA_SECRET_MANAGER_PRIMARY_REGION
 WCA_SECRET_MANAGER_REPLICA_REGIONS = [
     c.strip() for c in os.getenv("WCA_SECRET_MANAGER_REPLICA_REGIONS", "").split(",") if c
 ]
+# How long (in seconds) Secrets read from AWS are kept in the memory of each process, and
+# how long the absence of a Secret for an organization is remembered. 0 disables the cache.
+# Saving or deleting a Secret changes the version of the organization in the default
+# cache, the Secrets cached by all the processes before the change are then ignored.
+WCA_SECRET_MANAGER_CACHE_TTL = int(os.getenv("WCA_SECRET_MANAGER_CACHE_TTL") or "300")
+WCA_SECRET_MANAGER_NEGATIVE_CACHE_TTL = int(
+    os.getenv("WCA_SECRET_MANAGER_NEGATIVE_CACHE_TTL") or "30"
+)
 WCA_ENABLE_ARI_POSTPROCESS = os.getenv("WCA_ENABLE_ARI_POSTPROCESS", "False").lower() == "true"
 
 CSP_DEFAULT_SRC = ("'self'", "data:")
@@ -0,0 +1,148 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.main.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpen,
+    CircuitState,
+    reset_circuit_breakers,
+)
+from ansible_ai_connect.main.upstream import new_upstream_session
+
+HOST = "127.0.0.1"
+
+
+def get_sample(name, host):
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name, {"host": host}) or 0.0
+
+
+class TestCircuitBreaker(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.circuit_breaker = CircuitBreaker(
+            "breaker.example.com", failure_threshold=2, recovery_timeout=30, half_open_max_calls=1
+        )
+
+    def fail(self, count):
+        for _ in range(count):
+            self.circuit_breaker.before_call()
+            self.circuit_breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(1)
+        self.circuit_breaker.record_success()
+        self.fail(1)
+        self.assertEqual(self.circuit_breaker.state, CircuitState.CLOSED)
+        self.fail(1)
+        self.assertEqual(self.circuit_breaker.state, CircuitState.OPEN)
+        self.assertEqual(
+            get_sample("upstream_circuit_breaker_state", "breaker.example.com"), CircuitState.OPEN
+        )
+
+    def test_open_rejects(self):
+        rejected = get_sample("upstream_circuit_breaker_rejected_total", "breaker.example.com")
+        self.fail(2)
+        with self.assertRaises(CircuitBreakerOpen):
+            self.circuit_breaker.before_call()
+        self.assertEqual(
+            get_sample("upstream_circuit_breaker_rejected_total", "breaker.example.com"),
+            rejected + 1,
+        )
+
+    @patch("time.monotonic")
+    def test_half_open_probe_success(self, monotonic):
+        monotonic.return_value = 1000
+        self.fail(2)
+        monotonic.return_value = 1030
+        self.assertEqual(self.circuit_breaker.state, CircuitState.HALF_OPEN)
+        self.circuit_breaker.before_call()
+        # Only one probe at a time
+        with self.assertRaises(CircuitBreakerOpen):
+            self.circuit_breaker.before_call()
+        self.circuit_breaker.record_success()
+        self.assertEqual(self.circuit_breaker.state, CircuitState.CLOSED)
+        self.circuit_breaker.before_call()
+
+    @patch("time.monotonic")
+    def test_half_open_probe_failure(self, monotonic):
+        monotonic.return_value = 1000
+        self.fail(2)
+        monotonic.return_value = 1030
+        self.fail(1)
+        self.assertEqual(self.circuit_breaker.state, CircuitState.OPEN)
+        monotonic.return_value = 1059
+        with self.assertRaises(CircuitBreakerOpen):
+            self.circuit_breaker.before_call()
+
+    @patch("time.monotonic")
+    def test_half_open_released_probe(self, monotonic):
+        monotonic.return_value = 1000
+        self.fail(2)
+        monotonic.return_value = 1030
+        self.circuit_breaker.before_call()
+        self.circuit_breaker.release()
+        self.circuit_breaker.before_call()
+
+
+class ErrorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests += 1
+        self.send_response(503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(UPSTREAM_CIRCUIT_BREAKER_FAILURE_THRESHOLD=3)
+class TestUpstreamSessionCircuitBreaker(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_circuit_breakers()
+        self.addCleanup(reset_circuit_breakers)
+        self.server = ThreadingHTTPServer((HOST, 0), ErrorHandler)
+        self.server.requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://{HOST}:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_fail_fast(self):
+        session = new_upstream_session(circuit_breaker=True)
+        for _ in range(3):
+            self.assertEqual(session.get(self.url).status_code, 503)
+        with self.assertRaises(CircuitBreakerOpen):
+            session.get(self.url)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_disabled(self):
+        session = new_upstream_session(circuit_breaker=False)
+        for _ in range(4):
+            self.assertEqual(session.get(self.url).status_code, 503)
+        self.assertEqual(self.server.requests, 4)
@@ -0,0 +1,103 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, override_settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import REGISTRY
+
+from ansible_ai_connect.main.upstream import new_upstream_session
+
+HOST = "127.0.0.1"
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get_sample(name):
+    name = f"{NAMESPACE}_{name}" if NAMESPACE else name
+    return REGISTRY.get_sample_value(name, {"host": HOST}) or 0.0
+
+
+class TestUpstreamSession(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer((HOST, 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://{HOST}:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_connection_reuse(self):
+        created = get_sample("upstream_http_connections_created_total")
+        reused = get_sample("upstream_http_connections_reused_total")
+
+        session = new_upstream_session()
+        for _ in range(3):
+            session.get(self.url).raise_for_status()
+
+        self.assertEqual(get_sample("upstream_http_connections_created_total"), created + 1)
+        self.assertEqual(get_sample("upstream_http_connections_reused_total"), reused + 2)
+        self.assertEqual(get_sample("upstream_http_connections_in_use"), 0)
+
+    def test_pool_exhausted(self):
+        exhausted = get_sample("upstream_http_pool_exhausted_total")
+
+        session = new_upstream_session(pool_maxsize=1)
+        r = session.get(self.url, stream=True)
+        self.assertEqual(get_sample("upstream_http_connections_in_use"), 1)
+        session.get(self.url).raise_for_status()
+        r.close()
+
+        self.assertEqual(get_sample("upstream_http_pool_exhausted_total"), exhausted + 1)
+        self.assertEqual(get_sample("upstream_http_connections_in_use"), 0)
+
+    @override_settings(UPSTREAM_HTTP_POOL_MAXSIZE=7)
+    @override_settings(UPSTREAM_HTTP_POOL_BLOCK=True)
+    def test_pool_settings(self):
+        adapter = new_upstream_session().get_adapter(self.url)
+        pool = adapter.poolmanager.connection_from_url(self.url)
+        self.assertEqual(pool.pool.maxsize, 7)
+        self.assertTrue(pool.block)
+
+    @override_settings(UPSTREAM_HTTP_TCP_KEEPALIVE=True)
+    def test_tcp_keepalive(self):
+        adapter = new_upstream_session().get_adapter(self.url)
+        self.assertIn(
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            adapter.poolmanager.connection_pool_kw["socket_options"],
+        )
+
+    @override_settings(UPSTREAM_HTTP_TCP_KEEPALIVE=False)
+    def test_without_tcp_keepalive(self):
+        adapter = new_upstream_session().get_adapter(self.url)
+        self.assertNotIn("socket_options", adapter.poolmanager.connection_pool_kw)
@@ -0,0 +1,209 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Pooled and instrumented requests sessions for the upstream services
+(WCA, IBM Cloud IAM, Red Hat SSO, AMS, model servers...).
+"""
+
+import socket
+import time
+from typing import Optional
+
+import requests
+from django.conf import settings
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Gauge, Histogram
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+from ansible_ai_connect.main.circuit_breaker import (
+    get_circuit_breaker,
+    is_failure_response,
+)
+
+# from django_prometheus.middleware.DEFAULT_LATENCY_BUCKETS, for the shorter durations
+TLS_HANDSHAKE_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    float("inf"),
+)
+
+upstream_connections_created_counter = Counter(
+    "upstream_http_connections_created",
+    "Counter of new connections opened to upstream services",
+    ["host"],
+    namespace=NAMESPACE,
+)
+upstream_connections_reused_counter = Counter(
+    "upstream_http_connections_reused",
+    "Counter of requests to upstream services sent over a kept-alive connection",
+    ["host"],
+    namespace=NAMESPACE,
+)
+upstream_pool_exhausted_counter = Counter(
+    "upstream_http_pool_exhausted",
+    "Counter of requests to upstream services finding no idle slot in the connection pool",
+    ["host"],
+    namespace=NAMESPACE,
+)
+upstream_connections_in_use_gauge = Gauge(
+    "upstream_http_connections_in_use",
+    "Number of connections to upstream services currently checked out of the pool",
+    ["host"],
+    namespace=NAMESPACE,
+)
+upstream_tls_handshake_hist = Histogram(
+    "upstream_http_tls_handshake_latency_seconds",
+    "Histogram of TLS handshake time of new connections to upstream services",
+    ["host"],
+    namespace=NAMESPACE,
+    buckets=TLS_HANDSHAKE_LATENCY_BUCKETS,
+)
+
+
+class InstrumentedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        start_time = time.monotonic()
+        sock = super()._new_conn()
+        self._tcp_connect_duration = time.monotonic() - start_time
+        return sock
+
+    def connect(self):
+        self._tcp_connect_duration = 0.0
+        start_time = time.monotonic()
+        super().connect()
+        duration = time.monotonic() - start_time - self._tcp_connect_duration
+        upstream_tls_handshake_hist.labels(host=self.host).observe(duration)
+
+
+class InstrumentedPoolMixin:
+    def _new_conn(self):
+        upstream_connections_created_counter.labels(host=self.host).inc()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        if self.pool is not None and self.pool.empty():
+            # All the pool slots are checked out, the request will either
+            # wait or go through a connection that cannot be kept alive
+            upstream_pool_exhausted_counter.labels(host=self.host).inc()
+        conn = super()._get_conn(timeout=timeout)
+        if getattr(conn, "sock", None) is not None:
+            upstream_connections_reused_counter.labels(host=self.host).inc()
+        upstream_connections_in_use_gauge.labels(host=self.host).inc()
+        return conn
+
+    def _put_conn(self, conn):
+        upstream_connections_in_use_gauge.labels(host=self.host).dec()
+        super()._put_conn(conn)
+
+
+class InstrumentedHTTPConnectionPool(InstrumentedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = HTTPConnection
+
+
+class InstrumentedHTTPSConnectionPool(InstrumentedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = InstrumentedHTTPSConnection
+
+
+class InstrumentedPoolManager(PoolManager):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_classes_by_scheme = {
+            "http": InstrumentedHTTPConnectionPool,
+            "https": InstrumentedHTTPSConnectionPool,
+        }
+
+
+class UpstreamHTTPAdapter(HTTPAdapter):
+    def __init__(self, *args, tcp_keepalive: bool = False, circuit_breaker: bool = False, **kwargs):
+        self.tcp_keepalive = tcp_keepalive
+        self.circuit_breaker = circuit_breaker
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        if not self.circuit_breaker:
+            return super().send(request, *args, **kwargs)
+        circuit_breaker = get_circuit_breaker(request.url)
+        circuit_breaker.before_call()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except Exception:
+            circuit_breaker.record_failure()
+            raise
+        if is_failure_response(response.status_code):
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
+        return response
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        if self.tcp_keepalive:
+            pool_kwargs.setdefault(
+                "socket_options",
+                HTTPConnection.default_socket_options
+                + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+            )
+        self.poolmanager = InstrumentedPoolManager(
+            num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs
+        )
+
+
+def new_upstream_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None,
+    tcp_keepalive: Optional[bool] = None,
+    circuit_breaker: Optional[bool] = None,
+) -> requests.Session:
+    """
+    Returns a requests.Session whose connection pools are sized from the UPSTREAM_HTTP_*
+    settings and report their usage to Prometheus. Requests go through the circuit
+    breaker of their host when UPSTREAM_CIRCUIT_BREAKER_ENABLED is set.
+    """
+    adapter = UpstreamHTTPAdapter(
+        pool_connections=(
+            settings.UPSTREAM_HTTP_POOL_CONNECTIONS
+            if pool_connections is None
+            else pool_connections
+        ),
+        pool_maxsize=settings.UPSTREAM_HTTP_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize,
+        pool_block=settings.UPSTREAM_HTTP_POOL_BLOCK if pool_block is None else pool_block,
+        tcp_keepalive=(
+            settings.UPSTREAM_HTTP_TCP_KEEPALIVE if tcp_keepalive is None else tcp_keepalive
+        ),
+        circuit_breaker=(
+            settings.UPSTREAM_CIRCUIT_BREAKER_ENABLED
+            if circuit_breaker is None
+            else circuit_breaker
+        ),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-17 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0003_alter_organization_telemetry_opt_out"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="completion_cache_opt_out",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -24,6 +24,7 @@ logger = logging.getLogger(__name__)
 class Organization(models.Model):
     id = models.IntegerField(primary_key=True)
     telemetry_opt_out = models.BooleanField(default=False, db_column="telemetry_opt_out")
+    completion_cache_opt_out = models.BooleanField(default=False)
 
     @property
     def has_telemetry_opt_out(self):
@@ -21,3 +21,6 @@ class UsersConfig(AppConfig):
 
     def ready(self) -> None:
         import ansible_ai_connect.users.signals  # noqa: F401
+        from ansible_ai_connect.users.oauth2 import check_token_cache
+
+        check_token_cache()
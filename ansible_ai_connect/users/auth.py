@@ -12,10 +12,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import hashlib
 import logging
+import threading
+import time
+from typing import NamedTuple, Optional
 
 import jwt
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Histogram
 from rest_framework import authentication
 from social_core.backends.oauth import BaseOAuth2
 from social_django.models import UserSocialAuth
@@ -28,6 +35,126 @@ from ansible_ai_connect.users.constants import (
 
 logger = logging.getLogger("auth")
 
+rhsso_token_verification_hist = Histogram(
+    "rhsso_token_verification_latency_seconds",
+    "Histogram of the verification time of the RH-SSO access tokens",
+    namespace=NAMESPACE,
+)
+rhsso_token_cache_hit_counter = Counter(
+    "rhsso_token_cache_hits",
+    "Counter of RH-SSO access tokens served from the cache of verified tokens",
+    namespace=NAMESPACE,
+)
+rhsso_token_cache_miss_counter = Counter(
+    "rhsso_token_cache_misses",
+    "Counter of RH-SSO access tokens verified because they were not in the cache",
+    namespace=NAMESPACE,
+)
+rhsso_signing_key_cache_hit_counter = Counter(
+    "rhsso_signing_key_cache_hits",
+    "Counter of RH-SSO signing keys served from the cache",
+    namespace=NAMESPACE,
+)
+rhsso_signing_key_cache_miss_counter = Counter(
+    "rhsso_signing_key_cache_misses",
+    "Counter of RH-SSO signing keys looked up in the JWKS of the provider",
+    namespace=NAMESPACE,
+)
+
+
+class CachedSigningKey(NamedTuple):
+    key: jwt.PyJWK
+    expires_at: float
+
+
+class CachedToken(NamedTuple):
+    user_id: int
+    expires_at: float
+
+
+class SigningKeyCache:
+    """
+    The parsed signing keys of the provider by kid. A key is looked up again, with a
+    fresh JWKS, RHSSO_JWKS_CACHE_TTL seconds after it was, so that the rotated out
+    keys stop being accepted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: dict[str, CachedSigningKey] = {}
+
+    def get(self, backend, access_token) -> jwt.PyJWK:
+        kid = jwt.get_unverified_header(access_token).get("kid")
+        ttl = settings.RHSSO_JWKS_CACHE_TTL
+        if not kid or ttl <= 0:
+            return jwt.PyJWK(backend.find_valid_key(access_token))
+
+        with self._lock:
+            cached = self._keys.get(kid)
+        if cached and cached.expires_at > time.monotonic():
+            rhsso_signing_key_cache_hit_counter.inc()
+            return cached.key
+
+        rhsso_signing_key_cache_miss_counter.inc()
+        if cached:
+            # social-core keeps the JWKS for a day, fetch it again
+            backend.get_jwks_keys.invalidate()
+        key = jwt.PyJWK(backend.find_valid_key(access_token))
+        with self._lock:
+            self._keys[kid] = CachedSigningKey(key, time.monotonic() + ttl)
+        return key
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+class VerifiedTokenCache:
+    """
+    The users of the verified access tokens by digest of the tokens, until the tokens
+    expire. At most RHSSO_TOKEN_CACHE_SIZE tokens are kept, 0 disables the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: dict[str, CachedToken] = {}
+
+    @staticmethod
+    def digest(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    def get(self, digest: str) -> Optional[int]:
+        with self._lock:
+            cached = self._tokens.get(digest)
+            if cached and cached.expires_at <= time.time():
+                del self._tokens[digest]
+                cached = None
+        return cached.user_id if cached else None
+
+    def set(self, digest: str, user_id: int, decoded_token: dict):
+        size = settings.RHSSO_TOKEN_CACHE_SIZE
+        expires_at = decoded_token.get("exp")
+        # Tokens without an expiration are verified by every request
+        if size <= 0 or not expires_at or expires_at <= time.time():
+            return
+        with self._lock:
+            if digest not in self._tokens and len(self._tokens) >= size:
+                now = time.time()
+                for key in [k for k, v in self._tokens.items() if v.expires_at <= now]:
+                    del self._tokens[key]
+                if len(self._tokens) >= size:
+                    # The oldest token goes first
+                    del self._tokens[next(iter(self._tokens))]
+            self._tokens[digest] = CachedToken(user_id, expires_at)
+
+    def discard(self, digest: str):
+        with self._lock:
+            self._tokens.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
 
 class AAPOAuth2(BaseOAuth2):
     """AAP OAuth authentication backend"""
@@ -75,13 +202,27 @@ class AAPOAuth2(BaseOAuth2):
 class RHSSOAuthentication(authentication.BaseAuthentication):
     """Red Hat SSO Access Token authentication backend"""
 
-    # This function works for validating the access token and
-    # identifying an existing user. It doesn't work if user doesn't exist yet.
-    def _auth_existing_user(self, access_token, request):
+    # Shared by the requests of the process
+    signing_keys = SigningKeyCache()
+    verified_tokens = VerifiedTokenCache()
+
+    def _cached_user(self, digest):
+        user_id = self.verified_tokens.get(digest)
+        if user_id is None:
+            rhsso_token_cache_miss_counter.inc()
+            return None
+        user = get_user_model().objects.select_related("organization").filter(pk=user_id).first()
+        if user is None:
+            self.verified_tokens.discard(digest)
+            rhsso_token_cache_miss_counter.inc()
+            return None
+        rhsso_token_cache_hit_counter.inc()
+        return user
+
+    def _verify(self, access_token):
         strategy = load_strategy()
         backend = load_backend(strategy, "oidc", redirect_uri=None)
-        key = backend.find_valid_key(access_token)
-        rsakey = jwt.PyJWK(key)
+        rsakey = self.signing_keys.get(backend, access_token)
 
         # Decode and verify access token using extracted public key
         decoded_token = jwt.decode(
@@ -95,13 +236,28 @@ class RHSSOAuthentication(authentication.BaseAuthentication):
         scope = decoded_token.get("scope")
         if RHSSO_LIGHTSPEED_SCOPE not in scope.split():
             raise ValueError(f"Unexpected scope: {scope}")
+        return decoded_token
+
+    # This function works for validating the access token and
+    # identifying an existing user. It doesn't work if user doesn't exist yet.
+    def _auth_existing_user(self, access_token, request):
+        digest = self.verified_tokens.digest(access_token)
+        user = self._cached_user(digest)
+        if user:
+            return user, None
+
+        with rhsso_token_verification_hist.time():
+            decoded_token = self._verify(access_token)
 
         social_user_id = decoded_token.get("sub")
         try:
-            social_user = UserSocialAuth.objects.get(provider="oidc", uid=social_user_id)
-            return social_user.user, decoded_token
+            social_user = UserSocialAuth.objects.select_related("user__organization").get(
+                provider="oidc", uid=social_user_id
+            )
         except UserSocialAuth.DoesNotExist:
             return None, decoded_token
+        self.verified_tokens.set(digest, social_user.user.pk, decoded_token)
+        return social_user.user, decoded_token
 
     def authenticate(self, request):
         authorization_header = request.headers.get("Authorization")
@@ -133,6 +289,10 @@ class RHSSOAuthentication(authentication.BaseAuthentication):
         try:
             backend.user_data = lambda _: user_data
             user = backend.do_auth(access_token)
+            if user:
+                self.verified_tokens.set(
+                    self.verified_tokens.digest(access_token), user.pk, user_data
+                )
             return (user, None)
         except Exception as e:
             logger.info(e)
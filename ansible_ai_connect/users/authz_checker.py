@@ -16,6 +16,7 @@
 
 import logging
 import sys
+import threading
 from abc import abstractmethod
 from datetime import datetime, timedelta
 from http import HTTPStatus
@@ -25,9 +26,14 @@ import requests
 from django.conf import settings
 from django.core.cache import cache
 from django_prometheus.conf import NAMESPACE
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from requests.exceptions import HTTPError
 
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
+from ansible_ai_connect.ai.api.utils.deadline import remaining_time
+from ansible_ai_connect.main.circuit_breaker import CircuitBreakerOpen
+from ansible_ai_connect.main.upstream import new_upstream_session
+
 logger = logging.getLogger(__name__)
 
 # from django_prometheus.middleware.DEFAULT_LATENCY_BUCKETS
@@ -85,6 +91,19 @@ authz_token_service_retry_counter = Counter(
     namespace=NAMESPACE,
 )
 
+authz_token_refresh_failure_counter = Counter(
+    "authz_sso_token_refresh_failures",
+    "Counter of failed refreshes of the Red Hat SSO token",
+    ["mode"],
+    namespace=NAMESPACE,
+)
+
+authz_token_age_gauge = Gauge(
+    "authz_sso_token_age_seconds",
+    "Age of the Red Hat SSO token served to the authz checks",
+    namespace=NAMESPACE,
+)
+
 authz_ams_service_retry_counter = Counter(
     "authz_ams_service_retries",
     "Counter of AMS service retries",
@@ -116,6 +135,12 @@ class BaseCheck:
 
 def fatal_exception(exc) -> bool:
     """Determine if an exception is fatal or not"""
+    if isinstance(exc, CircuitBreakerOpen):
+        # fail fast, the service is known to be down
+        return True
+    if isinstance(exc, DeadlineExceeded):
+        # the request was abandoned
+        return True
     if isinstance(exc, requests.RequestException):
         status_code = getattr(getattr(exc, "response", None), "status_code", None)
         # retry on server errors and client errors
@@ -137,14 +162,24 @@ def log_backoff_exception(details):
 
 
 class Token:
+    # Seconds left on an expiring token when it is refreshed within a request
+    MIN_VALIDITY = 3
+
     def __init__(self, client_id, client_secret, server="sso.redhat.com") -> None:
         self._client_id = client_id
         self._client_secret = client_secret
         self._server = server
+        self._session = new_upstream_session()
         self.expiration_date = datetime.fromtimestamp(0)
+        self.issued_date = datetime.fromtimestamp(0)
         self.access_token: str = ""
         self.retries = settings.AUTHZ_SSO_TOKEN_SERVICE_RETRY_COUNT
         self.timeout = settings.AUTHZ_SSO_TOKEN_SERVICE_TIMEOUT
+        self.refresh_margin = timedelta(seconds=settings.AUTHZ_SSO_TOKEN_REFRESH_MARGIN)
+        # Only one refresh runs at a time, the current token is served meanwhile
+        self._lock = threading.Lock()
+        self._background = False
+        self._timer: threading.Timer | None = None
 
     @staticmethod
     def on_backoff(details):
@@ -152,6 +187,11 @@ class Token:
         authz_token_service_retry_counter.inc()
 
     def refresh(self) -> None:
+        with self._lock:
+            if not self._refresh():
+                authz_token_refresh_failure_counter.labels(mode="request").inc()
+
+    def _refresh(self) -> bool:
         data = {
             "grant_type": "client_credentials",
             "client_id": self._client_id,
@@ -164,12 +204,13 @@ class Token:
                 backoff.expo,
                 Exception,
                 max_tries=self.retries + 1,
+                max_time=remaining_time,
                 giveup=fatal_exception,
                 on_backoff=self.on_backoff,
             )
             @authz_token_service_hist.time()
             def post_request():
-                return requests.post(
+                return self._session.post(
                     f"{self._server}/auth/realms/redhat-external/protocol/openid-connect/token",
                     data=data,
                     timeout=self.timeout,
@@ -178,28 +219,86 @@ class Token:
             r = post_request()
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
             logger.exception("Cannot reach the SSO backend in time.")
-            return None
+            return False
         except HTTPError:
             logger.exception("SSO token service failed.")
-            return None
+            return False
         if r.status_code != HTTPStatus.OK:
             logger.error(f"Unexpected error code ({r.status_code}) returned by SSO service.")
-            return None
+            return False
         data = r.json()
-        self.access_token = data["access_token"]
+        now = datetime.utcnow()
         expires_in = data["expires_in"]
-        self.expiration_date = datetime.utcnow() + timedelta(seconds=expires_in)
+        self.access_token = data["access_token"]
+        self.issued_date = now
+        self.expiration_date = now + timedelta(seconds=expires_in)
+        authz_token_age_gauge.set_function(self.age)
+        if self._background:
+            # Well ahead of the expiration, or half way through short-lived tokens
+            ahead = min(self.refresh_margin, timedelta(seconds=expires_in / 2))
+            self._schedule(expires_in - ahead.total_seconds())
+        return True
+
+    def age(self) -> float:
+        return (datetime.utcnow() - self.issued_date).total_seconds()
+
+    def _expiring(self) -> bool:
+        return self.expiration_date - datetime.utcnow() < timedelta(seconds=self.MIN_VALIDITY)
 
     def get(self) -> str:
-        if self.expiration_date - datetime.utcnow() < timedelta(seconds=3):
-            self.refresh()
+        if self._expiring():
+            with self._lock:
+                # The token may have been refreshed while this thread waited for the lock
+                if self._expiring() and not self._refresh():
+                    authz_token_refresh_failure_counter.labels(mode="request").inc()
         return self.access_token
 
+    def start_background_refresh(self) -> None:
+        """Refresh the token on a timer, ahead of its expiration, once it is first issued."""
+        self._background = True
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            # A request is refreshing it already
+            return
+        try:
+            if self._refresh():
+                return
+            authz_token_refresh_failure_counter.labels(mode="background").inc()
+            remaining = (self.expiration_date - datetime.utcnow()).total_seconds()
+            # Try again while the current token is valid, the requests refresh it otherwise
+            if remaining > self.MIN_VALIDITY:
+                self._schedule(min(settings.AUTHZ_SSO_TOKEN_REFRESH_RETRY_DELAY, remaining / 2))
+        finally:
+            self._lock.release()
+
+
+_shared_tokens: dict[tuple, Token] = {}
+_shared_tokens_lock = threading.Lock()
+
+
+def shared_token(client_id, client_secret, server) -> Token:
+    """The SSO token of the credentials, shared by the checks and refreshed in background."""
+    with _shared_tokens_lock:
+        key = (client_id, client_secret, server)
+        if key not in _shared_tokens:
+            token = Token(client_id, client_secret, server)
+            token.start_background_refresh()
+            _shared_tokens[key] = token
+        return _shared_tokens[key]
+
 
 class CIAMCheck(BaseCheck):
     def __init__(self, client_id, client_secret, sso_server, api_server):
-        self._session = requests.Session()
-        self._token = Token(client_id, client_secret, sso_server)
+        self._session = new_upstream_session()
+        self._token = shared_token(client_id, client_secret, sso_server)
         self._api_server = api_server
 
     def self_test(self):
@@ -220,8 +319,8 @@ class AMSCheck(BaseCheck):
         pass
 
     def __init__(self, client_id, client_secret, sso_server, api_server):
-        self._session = requests.Session()
-        self._token = Token(client_id, client_secret, sso_server)
+        self._session = new_upstream_session()
+        self._token = shared_token(client_id, client_secret, sso_server)
         self._api_server = api_server
         self._ams_org_cache = {}
         self.retries = settings.AUTHZ_AMS_SERVICE_RETRY_COUNT
@@ -260,6 +359,7 @@ class AMSCheck(BaseCheck):
                 backoff.expo,
                 Exception,
                 max_tries=self.retries + 1,
+                max_time=remaining_time,
                 giveup=fatal_exception,
                 on_backoff=self.on_backoff,
             )
@@ -392,6 +492,7 @@ class AMSCheck(BaseCheck):
                 backoff.expo,
                 Exception,
                 max_tries=self.retries + 1,
+                max_time=remaining_time,
                 giveup=fatal_exception,
                 on_backoff=self.on_backoff,
             )
@@ -0,0 +1,139 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import logging
+import time
+import uuid
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+entitlements_cache_hit_counter = Counter(
+    "entitlements_cache_hit",
+    "Entitlements of users read from the cache",
+    ["entitlement"],
+    namespace=NAMESPACE,
+)
+entitlements_cache_miss_counter = Counter(
+    "entitlements_cache_miss",
+    "Entitlements of users checked because they were not in the cache",
+    ["entitlement"],
+    namespace=NAMESPACE,
+)
+entitlements_cache_saved_seconds_counter = Counter(
+    "entitlements_cache_saved_seconds",
+    "Time the checks of the entitlements read from the cache took when they were made",
+    ["entitlement"],
+    namespace=NAMESPACE,
+)
+
+
+def _user_key(user_id) -> str:
+    return f"entitlements_user_{user_id}"
+
+
+def _org_key(org_id) -> str:
+    return f"entitlements_org_{org_id}"
+
+
+class Entitlements:
+    """
+    The entitlements of a user, shared by the requests of the user for
+    ENTITLEMENTS_CACHE_TTL seconds. Each entitlement is checked the first time
+    it is needed, and the snapshot is dropped when the user logs in, when their
+    plans or groups change, or when the WCA API key of their organization changes.
+    """
+
+    def __init__(self, user):
+        # Users not saved yet have nothing to share
+        self.user_key = _user_key(user.pk) if user.pk else None
+        org_id = user.organization.id if user.organization else None
+        self.org_key = _org_key(org_id) if org_id else None
+        self._loaded = False
+        self._org_version: Optional[str] = None
+        self._expires_at = 0.0
+        # {entitlement: (value, seconds the check took)}
+        self._values: dict[str, tuple[bool, float]] = {}
+
+    def get(self, name: str, check: Callable[[], bool]) -> bool:
+        ttl = settings.ENTITLEMENTS_CACHE_TTL
+        if ttl <= 0 or not self.user_key:
+            return check()
+
+        self._load(ttl)
+        if name in self._values:
+            value, duration = self._values[name]
+            entitlements_cache_hit_counter.labels(entitlement=name).inc()
+            entitlements_cache_saved_seconds_counter.labels(entitlement=name).inc(duration)
+            return value
+
+        entitlements_cache_miss_counter.labels(entitlement=name).inc()
+        start = time.perf_counter()
+        value = check()
+        self._values[name] = (value, time.perf_counter() - start)
+        self._save()
+        return value
+
+    def _load(self, ttl: int):
+        if self._loaded:
+            return
+        self._loaded = True
+        keys = [self.user_key] + ([self.org_key] if self.org_key else [])
+        try:
+            cached = cache.get_many(keys)
+        except Exception:
+            logger.exception("Failed to read the entitlements of '%s'", self.user_key)
+            cached = {}
+        # Snapshots taken before the organization was invalidated are stale
+        self._org_version = cached.get(self.org_key) if self.org_key else None
+        snapshot = cached.get(self.user_key)
+        if snapshot and snapshot["org_version"] == self._org_version:
+            self._expires_at = snapshot["expires_at"]
+            self._values = dict(snapshot["values"])
+        else:
+            self._expires_at = time.time() + ttl
+
+    def _save(self):
+        timeout = self._expires_at - time.time()
+        if timeout <= 0:
+            return
+        snapshot = {
+            "org_version": self._org_version,
+            "expires_at": self._expires_at,
+            "values": self._values,
+        }
+        try:
+            cache.set(self.user_key, snapshot, timeout)
+        except Exception:
+            logger.exception("Failed to store the entitlements of '%s'", self.user_key)
+
+
+def invalidate_user(user_id) -> None:
+    """Drop the cached entitlements of a user."""
+    if settings.ENTITLEMENTS_CACHE_TTL > 0:
+        cache.delete(_user_key(user_id))
+
+
+def invalidate_organization(org_id) -> None:
+    """Drop the cached entitlements of all the users of an organization."""
+    ttl = settings.ENTITLEMENTS_CACHE_TTL
+    if ttl > 0 and org_id:
+        # The snapshots of the users taken before the new version are ignored, and none
+        # of them lives longer than the TTL.
+        cache.set(_org_key(org_id), uuid.uuid4().hex, ttl)
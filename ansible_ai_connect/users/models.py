@@ -19,6 +19,7 @@ from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django_deprecate_fields import deprecate_field
@@ -32,6 +33,7 @@ from .constants import (
     USER_SOCIAL_AUTH_PROVIDER_AAP,
     USER_SOCIAL_AUTH_PROVIDER_OIDC,
 )
+from .entitlements import Entitlements
 
 logger = logging.getLogger("organizations")
 
@@ -69,29 +71,54 @@ class User(ExportModelOperationsMixin("user"), AbstractUser):
     rh_employee = models.BooleanField(default=False)
     external_username = models.CharField(default="", null=False)
 
+    def _related(self, name: str) -> list:
+        """
+        The objects of a relation of the user, queried once for the lifetime of the
+        instance (a request) instead of at every use. Adding or removing some through
+        the relation of the user queries them again.
+        """
+        prefetch_related_objects([self], name)
+        return list(getattr(self, name).all())
+
+    @property
+    def group_names(self) -> list[str]:
+        return [group.name for group in self._related("groups")]
+
+    @property
+    def _social_auth(self):
+        social_auths = self._related("social_auth")
+        return social_auths[0] if social_auths else None
+
     @property
     def org_id(self):
-        if self.groups.filter(name="Commercial").exists():
+        if "Commercial" in self.group_names:
             return FAUX_COMMERCIAL_USER_ORG_ID
         if self.organization and self.organization.id:
             return self.organization.id
         return None
 
     def is_oidc_user(self) -> bool:
-        if not self.social_auth.values():
+        if not self._social_auth:
             return False
-        return self.social_auth.values()[0]["provider"] == USER_SOCIAL_AUTH_PROVIDER_OIDC
+        return self._social_auth.provider == USER_SOCIAL_AUTH_PROVIDER_OIDC
 
     def is_aap_user(self) -> bool:
-        if not self.social_auth.values():
+        if not self._social_auth:
             return False
-        return self.social_auth.values()[0]["provider"] == USER_SOCIAL_AUTH_PROVIDER_AAP
+        return self._social_auth.provider == USER_SOCIAL_AUTH_PROVIDER_AAP
+
+    @cached_property
+    def entitlements(self) -> Entitlements:
+        return Entitlements(self)
 
     @cached_property
     def rh_user_has_seat(self) -> bool:
         """True if the user comes from RHSSO and has a Wisdom Seat."""
+        return self.entitlements.get("has_seat", self._rh_user_has_seat)
+
+    def _rh_user_has_seat(self) -> bool:
         # For dev/test purposes only:
-        if self.groups.filter(name="Commercial").exists():
+        if "Commercial" in self.group_names:
             return True
 
         # user is of an on-prem AAP with valid license
@@ -103,9 +130,7 @@ class User(ExportModelOperationsMixin("user"), AbstractUser):
             if not settings.ANSIBLE_AI_ENABLE_TECH_PREVIEW:
                 return True
 
-            secret_manager = apps.get_app_config("ai").get_wca_secret_manager()
-            org_has_api_key = secret_manager.secret_exists(self.organization.id, Suffixes.API_KEY)
-            return org_has_api_key
+            return self.org_has_api_key
 
         return False
 
@@ -116,7 +141,9 @@ class User(ExportModelOperationsMixin("user"), AbstractUser):
         2. is of an on-prem AAP with valid license or
         3. comes from RHSSO and the associated org has access to Wisdom
         """
+        return self.entitlements.get("org_has_subscription", self._rh_org_has_subscription)
 
+    def _rh_org_has_subscription(self) -> bool:
         if self.organization and self.organization.is_subscription_check_should_be_bypassed:
             message = (
                 "Bypass organization check for organization ID "
@@ -139,17 +166,37 @@ class User(ExportModelOperationsMixin("user"), AbstractUser):
 
     @cached_property
     def rh_aap_licensed(self) -> bool:
-        return self.is_aap_user() and self.social_auth.values()[0]["extra_data"]["aap_licensed"]
+        return self.entitlements.get("aap_licensed", self._rh_aap_licensed)
+
+    def _rh_aap_licensed(self) -> bool:
+        return self.is_aap_user() and self._social_auth.extra_data["aap_licensed"]
+
+    @cached_property
+    def org_has_api_key(self) -> bool:
+        """True if the WCA API key of the organization of the user is set."""
+        return self.entitlements.get("org_has_api_key", self._org_has_api_key)
+
+    def _org_has_api_key(self) -> bool:
+        if not self.organization:
+            return False
+        secret_manager = apps.get_app_config("ai").get_wca_secret_manager()
+        return secret_manager.secret_exists(self.organization.id, Suffixes.API_KEY)
+
+    @cached_property
+    def has_active_trial(self) -> bool:
+        """True if one of the plans of the user is active."""
+        return self.entitlements.get("has_active_trial", self._has_active_trial)
+
+    def _has_active_trial(self) -> bool:
+        return any(up.is_active for up in self._related("userplan_set"))
 
     @cached_property
     def rh_aap_system_auditor(self) -> bool:
-        return (
-            self.is_aap_user() and self.social_auth.values()[0]["extra_data"]["aap_system_auditor"]
-        )
+        return self.is_aap_user() and self._social_auth.extra_data["aap_system_auditor"]
 
     @cached_property
     def rh_aap_superuser(self) -> bool:
-        return self.is_aap_user() and self.social_auth.values()[0]["extra_data"]["aap_superuser"]
+        return self.is_aap_user() and self._social_auth.extra_data["aap_superuser"]
 
     plans = models.ManyToManyField(
         Plan,
@@ -0,0 +1,155 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django_prometheus.conf import NAMESPACE
+from oauth2_provider.models import get_access_token_model
+from oauth2_provider.oauth2_validators import OAuth2Validator
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+oauth2_token_cache_hit_counter = Counter(
+    "oauth2_token_cache_hit",
+    "OAuth2 access tokens resolved from the cache",
+    namespace=NAMESPACE,
+)
+oauth2_token_cache_miss_counter = Counter(
+    "oauth2_token_cache_miss",
+    "OAuth2 access tokens looked up in the database because they were not in the cache",
+    namespace=NAMESPACE,
+)
+
+# The access tokens resolved by the current request, as each request authenticates with
+# its token more than once (OAuth2TokenMiddleware, then the authentication of the view).
+_resolved = threading.local()
+
+
+def _cache():
+    return caches[settings.OAUTH2_TOKEN_CACHE_ALIAS]
+
+
+def check_token_cache():
+    """
+    Refuses a token cache local to each process when it is enabled: the tokens revoked by
+    another process would be accepted for up to OAUTH2_TOKEN_CACHE_TTL seconds.
+    """
+    if settings.OAUTH2_TOKEN_CACHE_TTL > 0 and isinstance(_cache(), LocMemCache):
+        raise ImproperlyConfigured(
+            "OAUTH2_TOKEN_CACHE_TTL requires a cache shared by all the processes, "
+            "set OAUTH2_TOKEN_CACHE_BACKEND (e.g. django.core.cache.backends.redis.RedisCache)"
+        )
+
+
+def _key(token: str) -> str:
+    return "oauth2_token_" + hashlib.sha256(token.encode()).hexdigest()
+
+
+class CachedOAuth2Validator(OAuth2Validator):
+    """
+    Resolves the access tokens from the OAUTH2_TOKEN_CACHE_ALIAS cache for at most
+    OAUTH2_TOKEN_CACHE_TTL seconds, and once per request. The user of a token is still
+    read from the database, so that deactivated users are refused right away.
+    """
+
+    def _load_access_token(self, token):
+        if settings.OAUTH2_TOKEN_CACHE_TTL <= 0:
+            return super()._load_access_token(token)
+
+        key = _key(token)
+        tokens = getattr(_resolved, "tokens", None)
+        if tokens is None:
+            tokens = _resolved.tokens = {}
+        if key not in tokens:
+            tokens[key] = self._cached_access_token(key, token)
+        return tokens[key]
+
+    def _cached_access_token(self, key, token):
+        try:
+            entry = _cache().get(key)
+        except Exception:
+            logger.exception("Failed to read an OAuth2 access token from the cache")
+            entry = None
+        if entry:
+            user = get_user_model().objects.filter(pk=entry["user_id"]).first()
+            if user:
+                oauth2_token_cache_hit_counter.inc()
+                return get_access_token_model()(
+                    id=entry["id"],
+                    token=token,
+                    user=user,
+                    application=entry["application"],
+                    scope=entry["scope"],
+                    expires=entry["expires"],
+                )
+            invalidate_token(token)
+
+        oauth2_token_cache_miss_counter.inc()
+        access_token = super()._load_access_token(token)
+        if access_token and access_token.user_id:
+            _store(key, access_token)
+        return access_token
+
+
+def _store(key, access_token):
+    expires: datetime = access_token.expires
+    timeout = min(settings.OAUTH2_TOKEN_CACHE_TTL, (expires - timezone.now()).total_seconds())
+    if timeout <= 0:
+        return
+    entry = {
+        "id": access_token.id,
+        "user_id": access_token.user_id,
+        "application": access_token.application,
+        "scope": access_token.scope,
+        "expires": expires,
+    }
+    try:
+        _cache().set(key, entry, timeout)
+    except Exception:
+        logger.exception("Failed to store an OAuth2 access token in the cache")
+
+
+def forget_resolved_tokens() -> None:
+    """Resolve the access tokens again, from the cache, in the next request."""
+    _resolved.tokens = {}
+
+
+def invalidate_token(token: str) -> None:
+    """Drop an access token from the cache, when it is revoked or changed."""
+    key = _key(token)
+    getattr(_resolved, "tokens", {}).pop(key, None)
+    if settings.OAUTH2_TOKEN_CACHE_TTL > 0:
+        try:
+            _cache().delete(key)
+        except Exception:
+            logger.exception("Failed to drop an OAuth2 access token from the cache")
+
+
+def invalidate_user_tokens(user_id) -> None:
+    """Drop the access tokens of a user from the cache."""
+    if settings.OAUTH2_TOKEN_CACHE_TTL <= 0:
+        return
+    tokens = get_access_token_model().objects.filter(user_id=user_id)
+    for token in tokens.values_list("token", flat=True):
+        invalidate_token(token)
@@ -154,3 +154,5 @@ def load_extra_data(backend, details, response, uid, user, *args, **kwargs):
             extra_data.get("aap_superuser") if user.is_aap_user() else False
         )
         social.save()
+        # The user may hold a copy of the social auth from before the update
+        user.refresh_from_db(fields=["social_auth"])
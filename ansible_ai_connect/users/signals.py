@@ -20,7 +20,21 @@ from django.contrib.auth.signals import (
     user_logged_out,
     user_login_failed,
 )
+from django.core.signals import request_started
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import Signal, receiver
+from oauth2_provider.models import get_access_token_model
+
+from ansible_ai_connect.users.entitlements import (
+    invalidate_organization,
+    invalidate_user,
+)
+from ansible_ai_connect.users.models import User
+from ansible_ai_connect.users.oauth2 import (
+    forget_resolved_tokens,
+    invalidate_token,
+    invalidate_user_tokens,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +49,28 @@ def user_login_log(sender, user, **kwargs):
     logger.info(f"User: {user} LOGIN successful")
 
 
+@receiver(user_logged_in)
+def user_login_invalidate_entitlements(sender, user, **kwargs):
+    """Check the entitlements of the user again when they log in"""
+    invalidate_user(user.pk)
+
+
+@receiver(m2m_changed, sender=User.plans.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def user_plans_or_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Check the entitlements of the users again when their plans or groups change"""
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_user(instance.pk)
+    elif action == "post_clear":
+        # pk_set is None, the snapshots of the users expire with the TTL
+        return
+    else:
+        for user_id in pk_set:
+            invalidate_user(user_id)
+
+
 @receiver(user_login_failed)
 def user_login_failed_log(sender, user=None, **kwargs):
     """User failed login attempt log to user log"""
@@ -50,6 +86,26 @@ def user_logout_log(sender, user, **kwargs):
     logger.info(f"User: {user} LOGOUT successful")
 
 
+@receiver(user_logged_out)
+def user_logout_invalidate_tokens(sender, user, **kwargs):
+    """Read the access tokens of the user from the database again"""
+    if user:
+        invalidate_user_tokens(user.pk)
+
+
+@receiver(post_save, sender=get_access_token_model())
+@receiver(post_delete, sender=get_access_token_model())
+def access_token_changed(sender, instance, **kwargs):
+    """Drop the cached access token when it is changed or revoked"""
+    invalidate_token(instance.token)
+
+
+@receiver(request_started)
+def request_started_forget_tokens(sender, **kwargs):
+    """Each request resolves its access token again"""
+    forget_resolved_tokens()
+
+
 @receiver(user_set_wca_api_key)
 def user_set_wca_key_log(sender, user, org_id, api_key, **kwargs):
     """User set WCA API Key"""
@@ -58,6 +114,12 @@ def user_set_wca_key_log(sender, user, org_id, api_key, **kwargs):
     )
 
 
+@receiver(user_set_wca_api_key)
+def user_set_wca_key_invalidate_entitlements(sender, user, org_id, **kwargs):
+    """Check the entitlements of the users of the Organisation again"""
+    invalidate_organization(org_id)
+
+
 @receiver(user_set_wca_model_id)
 def user_set_wca_model_id_log(sender, user, org_id, model_id, **kwargs):
     """User set WCA Model Id"""
@@ -12,6 +12,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import time
 from datetime import datetime
 from unittest.mock import MagicMock, Mock, patch
 from uuid import uuid4
@@ -27,7 +28,11 @@ from social_django.models import UserSocialAuth
 from social_django.utils import load_strategy
 
 from ansible_ai_connect.test_utils import WisdomServiceLogAwareTestCase
-from ansible_ai_connect.users.auth import AAPOAuth2, RHSSOAuthentication
+from ansible_ai_connect.users.auth import (
+    AAPOAuth2,
+    RHSSOAuthentication,
+    rhsso_token_cache_hit_counter,
+)
 from ansible_ai_connect.users.constants import RHSSO_LIGHTSPEED_SCOPE
 
 
@@ -50,11 +55,11 @@ class DummyRHBackend(OpenIdConnectAuth):
         return self.issuer
 
 
-def build_access_token(private_key, issuer, payload, scope=None):
+def build_access_token(private_key, issuer, payload, scope=None, headers=None):
     payload["aud"] = RHSSO_LIGHTSPEED_SCOPE
     payload["scope"] = scope if scope else RHSSO_LIGHTSPEED_SCOPE
     payload["iss"] = issuer
-    return jwt.encode(payload, key=private_key, algorithm="RS256")
+    return jwt.encode(payload, key=private_key, algorithm="RS256", headers=headers)
 
 
 class TestAAPOAuth2(WisdomServiceLogAwareTestCase):
@@ -125,6 +130,8 @@ class TestRHSSOAuthentication(WisdomServiceLogAwareTestCase):
         self.rh_usa = UserSocialAuth.objects.create(
             user=self.rh_user, provider="oidc", uid=str(uuid4())
         )
+        RHSSOAuthentication.signing_keys.clear()
+        RHSSOAuthentication.verified_tokens.clear()
 
     @patch("ansible_ai_connect.users.auth.load_backend")
     def test_authenticate_returns_existing_user(self, mock_load_backend):
@@ -228,3 +235,82 @@ class TestRHSSOAuthentication(WisdomServiceLogAwareTestCase):
 
         request = Mock(headers={"Authorization": f"Bearer {access_token}"})
         self.assertEqual(self.authentication.authenticate(request), None)
+
+    @patch("ansible_ai_connect.users.auth.load_backend")
+    def test_authenticate_caches_verified_token(self, mock_load_backend):
+        backend = DummyRHBackend()
+        mock_load_backend.return_value = backend
+        access_token = build_access_token(
+            private_key=backend.rsa_private_key,
+            issuer=backend.issuer,
+            payload={"sub": self.rh_usa.uid, "exp": int(time.time()) + 600},
+        )
+        hits = rhsso_token_cache_hit_counter._value.get()
+
+        request = Mock(headers={"Authorization": f"Bearer {access_token}"})
+        self.assertEqual(self.authentication.authenticate(request)[0], self.rh_user)
+        self.assertEqual(self.authentication.authenticate(request)[0], self.rh_user)
+
+        mock_load_backend.assert_called_once()
+        self.assertEqual(rhsso_token_cache_hit_counter._value.get(), hits + 1)
+
+    @patch("ansible_ai_connect.users.auth.load_backend")
+    def test_authenticate_verifies_token_of_deleted_user(self, mock_load_backend):
+        backend = DummyRHBackend()
+        mock_load_backend.return_value = backend
+        access_token = build_access_token(
+            private_key=backend.rsa_private_key,
+            issuer=backend.issuer,
+            payload={"sub": self.rh_usa.uid, "exp": int(time.time()) + 600},
+        )
+
+        request = Mock(headers={"Authorization": f"Bearer {access_token}"})
+        self.assertEqual(self.authentication.authenticate(request)[0], self.rh_user)
+        self.rh_user.delete()
+        with override_settings(ANSIBLE_AI_ENABLE_TECH_PREVIEW=False):
+            self.assertIsNone(self.authentication.authenticate(request))
+        self.assertEqual(mock_load_backend.call_count, 3)
+
+    @patch("ansible_ai_connect.users.auth.load_backend")
+    def test_authenticate_does_not_cache_token_without_expiration(self, mock_load_backend):
+        backend = DummyRHBackend()
+        mock_load_backend.return_value = backend
+        access_token = build_access_token(
+            private_key=backend.rsa_private_key,
+            issuer=backend.issuer,
+            payload={"sub": self.rh_usa.uid},
+        )
+
+        request = Mock(headers={"Authorization": f"Bearer {access_token}"})
+        self.authentication.authenticate(request)
+        self.authentication.authenticate(request)
+
+        self.assertEqual(mock_load_backend.call_count, 2)
+
+    @override_settings(RHSSO_TOKEN_CACHE_SIZE=0)
+    @patch("ansible_ai_connect.users.auth.load_backend")
+    def test_authenticate_caches_signing_key(self, mock_load_backend):
+        backend = DummyRHBackend()
+        backend.find_valid_key = Mock(return_value=backend.jwk_public_key)
+        backend.get_jwks_keys = Mock()
+        mock_load_backend.return_value = backend
+        access_token = build_access_token(
+            private_key=backend.rsa_private_key,
+            issuer=backend.issuer,
+            payload={"sub": self.rh_usa.uid},
+            headers={"kid": "key-1"},
+        )
+
+        request = Mock(headers={"Authorization": f"Bearer {access_token}"})
+        self.assertEqual(self.authentication.authenticate(request)[0], self.rh_user)
+        self.assertEqual(self.authentication.authenticate(request)[0], self.rh_user)
+        backend.find_valid_key.assert_called_once()
+        backend.get_jwks_keys.invalidate.assert_not_called()
+
+        # The key is looked up again in a fresh JWKS once it expired
+        with patch(
+            "ansible_ai_connect.users.auth.time.monotonic", return_value=time.monotonic() + 3601
+        ):
+            self.assertEqual(self.authentication.authenticate(request)[0], self.rh_user)
+        self.assertEqual(backend.find_valid_key.call_count, 2)
+        backend.get_jwks_keys.invalidate.assert_called_once()
@@ -14,7 +14,9 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from functools import wraps
 from http import HTTPStatus
 from unittest.mock import Mock, PropertyMock, patch
@@ -24,6 +26,8 @@ from django.test import TestCase, override_settings
 from prometheus_client import Counter, Histogram
 from requests.exceptions import HTTPError
 
+from ansible_ai_connect.ai.api.model_client.exceptions import DeadlineExceeded
+from ansible_ai_connect.main.circuit_breaker import CircuitBreakerOpen
 from ansible_ai_connect.test_utils import WisdomServiceLogAwareTestCase
 from ansible_ai_connect.users.authz_checker import (
     AMSCheck,
@@ -36,9 +40,11 @@ from ansible_ai_connect.users.authz_checker import (
     authz_ams_org_cache_hit_counter,
     authz_ams_rh_org_has_subscription_cache_hit_counter,
     authz_ams_service_retry_counter,
+    authz_token_refresh_failure_counter,
     authz_token_service_hist,
     authz_token_service_retry_counter,
     fatal_exception,
+    shared_token,
 )
 
 
@@ -70,7 +76,7 @@ class TestToken(WisdomServiceLogAwareTestCase):
     def get_default_ams_checker(self):
         return AMSCheck("foo", "bar", "https://sso.redhat.com", "https://some-api.server.host")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_token_refresh(self, m_post):
         m_r = Mock()
         m_r.json.return_value = {"access_token": "foo_bar", "expires_in": 900}
@@ -87,7 +93,7 @@ class TestToken(WisdomServiceLogAwareTestCase):
         self.assertEqual(my_token.get(), "foo_bar")
         self.assertEqual(m_r.json.call_count, 0)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     @assert_call_count_metrics(metric=authz_token_service_retry_counter)
     @assert_call_count_metrics(metric=authz_token_service_hist)
     @override_settings(AUTHZ_SSO_TOKEN_SERVICE_RETRY_COUNT=1)
@@ -102,7 +108,7 @@ class TestToken(WisdomServiceLogAwareTestCase):
             self.assertInLog("SSO token service failed", log)
             self.assertInLog("Caught retryable error after 1 tries.", log)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     @assert_call_count_metrics(metric=authz_token_service_retry_counter)
     @assert_call_count_metrics(metric=authz_token_service_hist)
     @override_settings(AUTHZ_SSO_TOKEN_SERVICE_RETRY_COUNT=1)
@@ -123,6 +129,82 @@ class TestToken(WisdomServiceLogAwareTestCase):
             self.assertEqual(my_token.access_token, "foo_bar")
             self.assertInLog("Caught retryable error after 1 tries.", log)
 
+    @patch("requests.Session.post")
+    def test_token_refreshed_once_by_concurrent_requests(self, m_post):
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            return Mock(status_code=200, json=Mock(return_value=response))
+
+        response = {"access_token": "foo_bar", "expires_in": 900}
+        m_post.side_effect = slow_post
+        my_token = Token("foo", "bar")
+
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(my_token.get())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(tokens, ["foo_bar"] * 5)
+        m_post.assert_called_once()
+
+    @patch("requests.Session.post")
+    @override_settings(AUTHZ_SSO_TOKEN_REFRESH_MARGIN=60)
+    def test_token_background_refresh_scheduled_ahead_of_expiration(self, m_post):
+        m_post.return_value = Mock(
+            status_code=200, json=Mock(return_value={"access_token": "foo_bar", "expires_in": 900})
+        )
+        my_token = Token("foo", "bar")
+        my_token.start_background_refresh()
+        with patch.object(my_token, "_schedule") as m_schedule:
+            self.assertEqual(my_token.get(), "foo_bar")
+            m_schedule.assert_called_once_with(840)
+
+            # Short-lived tokens are refreshed half way through
+            m_post.return_value.json.return_value = {"access_token": "foo", "expires_in": 60}
+            my_token._background_refresh()
+            m_schedule.assert_called_with(30)
+        self.assertEqual(my_token.get(), "foo")
+
+    @patch("requests.Session.post")
+    @override_settings(AUTHZ_SSO_TOKEN_REFRESH_RETRY_DELAY=10)
+    def test_token_background_refresh_failure(self, m_post):
+        m_post.side_effect = HTTPError("Bad Request", response=Mock(status_code=400))
+        my_token = Token("foo", "bar")
+        my_token.start_background_refresh()
+        my_token.access_token = "foo_bar"
+        my_token.expiration_date = datetime.utcnow() + timedelta(seconds=50)
+        failures = authz_token_refresh_failure_counter.labels(mode="background")
+        failures_before = failures._value.get()
+
+        with (
+            patch.object(my_token, "_schedule") as m_schedule,
+            self.assertLogs(logger="ansible_ai_connect.users.authz_checker", level="ERROR"),
+        ):
+            my_token._background_refresh()
+            m_schedule.assert_called_once_with(10)
+
+        # The current token is still served
+        self.assertEqual(my_token.get(), "foo_bar")
+        self.assertEqual(failures._value.get(), failures_before + 1)
+
+    @patch("requests.Session.post")
+    def test_token_background_refresh_skipped_while_refreshing(self, m_post):
+        my_token = Token("foo", "bar")
+        with my_token._lock:
+            my_token._background_refresh()
+        m_post.assert_not_called()
+
+    def test_token_shared_by_checks(self):
+        ams_checker = self.get_default_ams_checker()
+        ciam_checker = CIAMCheck(
+            "foo", "bar", "https://sso.redhat.com", "https://some-api.server.host"
+        )
+        self.assertIs(ams_checker._token, ciam_checker._token)
+        self.assertIs(ams_checker._token, shared_token("foo", "bar", "https://sso.redhat.com"))
+        self.assertIsNot(ams_checker._token, shared_token("foo", "baz", "https://sso.redhat.com"))
+
     def test_fatal_exception(self):
         """Test the logic to determine if an exception is fatal or not"""
         exc = Exception()
@@ -150,6 +232,14 @@ class TestToken(WisdomServiceLogAwareTestCase):
         b = fatal_exception(exc)
         self.assertTrue(b)
 
+        exc = CircuitBreakerOpen()
+        b = fatal_exception(exc)
+        self.assertTrue(b)
+
+        exc = DeadlineExceeded()
+        b = fatal_exception(exc)
+        self.assertTrue(b)
+
     def test_ciam_self_test_success(self):
         m_r = Mock()
         m_r.status_code = 200
@@ -0,0 +1,117 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from unittest.mock import Mock, patch
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import override_settings
+
+from ansible_ai_connect.test_utils import WisdomAppsBackendMocking
+from ansible_ai_connect.users.constants import USER_SOCIAL_AUTH_PROVIDER_OIDC
+from ansible_ai_connect.users.entitlements import (
+    entitlements_cache_hit_counter,
+    entitlements_cache_saved_seconds_counter,
+)
+from ansible_ai_connect.users.models import Plan
+from ansible_ai_connect.users.signals import user_set_wca_api_key
+from ansible_ai_connect.users.tests.test_users import create_user
+
+
+def reload(user):
+    """The user as read by the next request"""
+    return get_user_model().objects.get(pk=user.pk)
+
+
+@override_settings(ENTITLEMENTS_CACHE_TTL=60)
+@override_settings(AUTHZ_BACKEND_TYPE="dummy")
+@override_settings(AUTHZ_DUMMY_ORGS_WITH_SUBSCRIPTION="1981")
+@override_settings(ANSIBLE_AI_ENABLE_TECH_PREVIEW=True)
+class TestEntitlements(WisdomAppsBackendMocking):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.secret_manager = Mock()
+        self.secret_manager.secret_exists.return_value = True
+        self.secret_manager_patcher = patch.object(
+            apps.get_app_config("ai"), "get_wca_secret_manager", return_value=self.secret_manager
+        )
+        self.secret_manager_patcher.start()
+        self.user = create_user(provider=USER_SOCIAL_AUTH_PROVIDER_OIDC, rh_org_id=1981)
+
+    def tearDown(self):
+        self.secret_manager_patcher.stop()
+        super().tearDown()
+
+    def test_shared_by_requests(self):
+        hits = entitlements_cache_hit_counter.labels(entitlement="has_seat")._value.get()
+        saved = entitlements_cache_saved_seconds_counter.labels(entitlement="has_seat")
+        saved_before = saved._value.get()
+
+        self.assertTrue(self.user.rh_user_has_seat)
+        with patch.object(apps.get_app_config("ai"), "get_seat_checker") as get_seat_checker:
+            user = reload(self.user)
+            self.assertTrue(user.rh_user_has_seat)
+            self.assertTrue(user.rh_org_has_subscription)
+            self.assertTrue(user.org_has_api_key)
+            get_seat_checker.assert_not_called()
+        self.secret_manager.secret_exists.assert_called_once()
+
+        self.assertEqual(
+            entitlements_cache_hit_counter.labels(entitlement="has_seat")._value.get(), hits + 1
+        )
+        self.assertGreater(saved._value.get(), saved_before)
+
+    @override_settings(ENTITLEMENTS_CACHE_TTL=0)
+    def test_disabled(self):
+        self.assertTrue(self.user.org_has_api_key)
+        self.assertTrue(reload(self.user).org_has_api_key)
+        self.assertEqual(self.secret_manager.secret_exists.call_count, 2)
+
+    def test_invalidated_when_api_key_set(self):
+        self.secret_manager.secret_exists.return_value = False
+        self.assertFalse(self.user.rh_user_has_seat)
+
+        self.secret_manager.secret_exists.return_value = True
+        self.assertFalse(reload(self.user).rh_user_has_seat)
+        user_set_wca_api_key.send(
+            self.__class__, user=self.user, org_id=self.user.organization.id, api_key="key"
+        )
+        self.assertTrue(reload(self.user).rh_user_has_seat)
+
+    def test_invalidated_when_trial_starts(self):
+        self.assertFalse(self.user.has_active_trial)
+
+        trial_plan, _ = Plan.objects.get_or_create(name="trial of 90 days", expires_after="90 days")
+        self.user.plans.add(trial_plan)
+        self.assertTrue(reload(self.user).has_active_trial)
+
+    def test_invalidated_when_groups_change(self):
+        user = create_user()
+        self.assertFalse(user.rh_user_has_seat)
+
+        commercial_group, _ = Group.objects.get_or_create(name="Commercial")
+        commercial_group.user_set.add(user)
+        self.assertTrue(reload(user).rh_user_has_seat)
+
+    def test_invalidated_on_login(self):
+        user = create_user(provider=USER_SOCIAL_AUTH_PROVIDER_OIDC, rh_org_id=1981, password="pw")
+        self.secret_manager.secret_exists.return_value = False
+        self.assertFalse(user.org_has_api_key)
+
+        self.secret_manager.secret_exists.return_value = True
+        self.client.login(username=user.username, password="pw")
+        self.assertTrue(reload(user).org_has_api_key)
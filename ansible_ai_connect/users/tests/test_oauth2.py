@@ -0,0 +1,179 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import datetime
+import uuid
+from io import StringIO
+
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from oauth2_provider.models import AccessToken, Application, RefreshToken
+from oauth2_provider.settings import oauth2_settings
+
+from ansible_ai_connect.test_utils import WisdomAppsBackendMocking
+from ansible_ai_connect.users.oauth2 import (
+    CachedOAuth2Validator,
+    _key,
+    check_token_cache,
+    forget_resolved_tokens,
+    oauth2_token_cache_hit_counter,
+)
+from ansible_ai_connect.users.tests.test_users import create_user
+
+
+def load(token):
+    """The access token as resolved by the next request"""
+    forget_resolved_tokens()
+    return CachedOAuth2Validator()._load_access_token(token)
+
+
+@override_settings(OAUTH2_TOKEN_CACHE_TTL=60)
+class TestCachedOAuth2Validator(WisdomAppsBackendMocking, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["oauth2_tokens"].clear()
+        forget_resolved_tokens()
+        self.user = create_user()
+        self.application = Application.objects.create(
+            name="Test Application",
+            client_type=Application.CLIENT_PUBLIC,
+            authorization_grant_type=Application.GRANT_AUTHORIZATION_CODE,
+        )
+        self.access_token = AccessToken.objects.create(
+            user=self.user,
+            application=self.application,
+            token=uuid.uuid4().hex,
+            scope="read write",
+            expires=timezone.now() + datetime.timedelta(minutes=10),
+        )
+
+    def test_resolved_from_cache(self):
+        load(self.access_token.token)
+        hits = oauth2_token_cache_hit_counter._value.get()
+
+        with CaptureQueriesContext(connection) as queries:
+            access_token = load(self.access_token.token)
+        self.assertEqual(access_token.pk, self.access_token.pk)
+        self.assertEqual(access_token.user, self.user)
+        self.assertEqual(access_token.application, self.application)
+        self.assertTrue(access_token.is_valid(["read", "write"]))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("oauth2_provider_accesstoken", queries[0]["sql"])
+        self.assertEqual(oauth2_token_cache_hit_counter._value.get(), hits + 1)
+
+    def test_resolved_once_per_request(self):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.access_token.token}"}
+        self.client.get(reverse("me"), **headers)
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get(reverse("me"), **headers)
+        self.assertEqual(r.status_code, 200)
+        sql = [q["sql"] for q in queries.captured_queries]
+        self.assertFalse([q for q in sql if "oauth2_provider_accesstoken" in q])
+        self.assertEqual(len([q for q in sql if 'FROM "users_user"' in q]), 1)
+
+    @override_settings(OAUTH2_TOKEN_CACHE_TTL=0)
+    def test_disabled(self):
+        load(self.access_token.token)
+        hits = oauth2_token_cache_hit_counter._value.get()
+        with CaptureQueriesContext(connection) as queries:
+            load(self.access_token.token)
+        self.assertIn("oauth2_provider_accesstoken", queries[0]["sql"])
+        self.assertEqual(oauth2_token_cache_hit_counter._value.get(), hits)
+
+    def test_expired_token_not_cached(self):
+        self.access_token.expires = timezone.now() - datetime.timedelta(seconds=1)
+        self.access_token.save()
+        load(self.access_token.token)
+        self.assertIsNone(caches["oauth2_tokens"].get(self._key()))
+
+    def test_invalidated_when_revoked(self):
+        load(self.access_token.token)
+        self.access_token.revoke()
+        self.assertIsNone(load(self.access_token.token))
+
+    def test_invalidated_when_changed(self):
+        load(self.access_token.token)
+        self.access_token.scope = "read"
+        self.access_token.save()
+        self.assertEqual(load(self.access_token.token).scope, "read")
+
+    def test_invalidated_by_revoke_expired_refreshtokens(self):
+        refresh_token = RefreshToken.objects.create(
+            user=self.user,
+            token=uuid.uuid4().hex,
+            application=self.application,
+            access_token=self.access_token,
+        )
+        refresh_token.created = timezone.now() - datetime.timedelta(
+            seconds=oauth2_settings.REFRESH_TOKEN_EXPIRE_SECONDS + 1
+        )
+        refresh_token.save()
+        load(self.access_token.token)
+
+        call_command("revoke_expired_refreshtokens", stdout=StringIO())
+        self.assertIsNone(load(self.access_token.token))
+
+    def test_invalidated_on_logout(self):
+        load(self.access_token.token)
+        self.assertIsNotNone(caches["oauth2_tokens"].get(self._key()))
+        user_logged_out.send(self.__class__, request=None, user=self.user)
+        self.assertIsNone(caches["oauth2_tokens"].get(self._key()))
+
+    def test_deleted_user(self):
+        load(self.access_token.token)
+        caches["oauth2_tokens"].set(self._key(), {"user_id": -1})
+        self.assertEqual(load(self.access_token.token).user, self.user)
+
+    def _key(self):
+        return _key(self.access_token.token)
+
+
+class TestCheckTokenCache(TestCase):
+    def caches(self, backend):
+        return {
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "cache",
+            },
+            "oauth2_tokens": {"BACKEND": backend, "LOCATION": "oauth2-tokens"},
+        }
+
+    def test_local_memory_cache(self):
+        with override_settings(
+            OAUTH2_TOKEN_CACHE_TTL=60,
+            CACHES=self.caches("django.core.cache.backends.locmem.LocMemCache"),
+        ):
+            with self.assertRaises(ImproperlyConfigured):
+                check_token_cache()
+
+    def test_local_memory_cache_disabled(self):
+        with override_settings(
+            OAUTH2_TOKEN_CACHE_TTL=0,
+            CACHES=self.caches("django.core.cache.backends.locmem.LocMemCache"),
+        ):
+            check_token_cache()
+
+    def test_shared_cache(self):
+        with override_settings(
+            OAUTH2_TOKEN_CACHE_TTL=60,
+            CACHES=self.caches("django.core.cache.backends.db.DatabaseCache"),
+        ):
+            check_token_cache()
@@ -39,7 +39,7 @@ class GroupSpecificThrottle(UserRateThrottle):
         pass
 
     def get_scope(self, request, view):
-        user_groups = set(request.user.groups.values_list("name", flat=True))
+        user_groups = set(getattr(request.user, "group_names", []))
         return next((group for group in self.GROUPS if group in user_groups), "user")
 
     def allow_request(self, request, view):
@@ -30,7 +30,6 @@ from rest_framework.throttling import UserRateThrottle
 from ansible_ai_connect.ai.api.aws.exceptions import (
     WcaSecretManagerMissingCredentialsError,
 )
-from ansible_ai_connect.ai.api.aws.wca_secret_manager import Suffixes
 from ansible_ai_connect.ai.api.telemetry import schema1
 from ansible_ai_connect.ai.api.utils.segment import send_schema1_event
 from ansible_ai_connect.main.cache.cache_per_user import cache_per_user
@@ -61,9 +60,7 @@ class HomeView(TemplateView):
             and self.request.user.rh_org_has_subscription
             and not self.request.user.is_aap_user()
         ):
-            self.org_has_api_key = self.secret_manager.secret_exists(
-                self.request.user.organization.id, Suffixes.API_KEY
-            )
+            self.org_has_api_key = self.request.user.org_has_api_key
 
         if (
             settings.ANSIBLE_AI_ENABLE_ONE_CLICK_TRIAL
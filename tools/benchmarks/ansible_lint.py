@@ -0,0 +1,84 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Compares the time ansible-lint post-processing takes per suggestion when linting
+in temporary files and in memory, and checks both give the same output.
+
+With the environment of the service, the database is not used:
+
+    python tools/benchmarks/ansible_lint.py
+"""
+
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ansible_ai_connect.main.settings.development")
+django.setup()
+
+from ansible_ai_connect.ansible_lint.lintpostprocessing import (  # noqa: E402
+    AnsibleLintCaller,
+)
+
+SUGGESTIONS = {
+    "single-task": (
+        "- name: Start the httpd service\n"
+        "  service:\n    name: httpd\n    state: started\n    enabled: yes\n"
+    ),
+    "multi-task": (
+        "- name: Install httpd\n  package:\n    name: httpd\n    state: present\n"
+        "- name: Copy the index page\n  copy:\n    src: index.html\n"
+        "    dest: /var/www/html/index.html\n    mode: 0644\n"
+        "- name: Restart httpd\n  service: name=httpd state=restarted\n"
+    ),
+    "playbook": (
+        "- name: Web servers\n  hosts: webservers\n  become: yes\n  tasks:\n"
+        "    - name: Install httpd\n      package:\n        name: httpd\n"
+        "    - name: Start httpd\n      service:\n        name: httpd\n        state: started\n"
+    ),
+}
+
+
+def measure(ansible_lint_caller, suggestion, iterations):
+    start, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(iterations):
+        result = ansible_lint_caller.run_linter(suggestion)
+    duration, cpu = time.perf_counter() - start, time.process_time() - start_cpu
+    return result, duration * 1000 / iterations, cpu * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    callers = {"files": AnsibleLintCaller(), "memory": AnsibleLintCaller(in_memory=True)}
+    print(f"{'suggestion':<12} {'lint in':<8} {'ms':>8} {'cpu ms':>8}")
+    for name, suggestion in SUGGESTIONS.items():
+        results = set()
+        for mode, ansible_lint_caller in callers.items():
+            # The first run loads the rules and ansible plugins
+            ansible_lint_caller.run_linter(suggestion)
+            result, duration, cpu = measure(ansible_lint_caller, suggestion, args.iterations)
+            results.add(result)
+            print(f"{name:<12} {mode:<8} {duration:>8.2f} {cpu:>8.2f}")
+        if len(results) != 1:
+            raise SystemExit(f"the {name} suggestion is linted differently in memory")
+
+
+if __name__ == "__main__":
+    main()
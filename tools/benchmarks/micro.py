@@ -0,0 +1,410 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Micro-benchmarks of the per-request CPU work of a completion: the formatter,
+the anonymizer and the post-processing with ARI and ansible-lint.
+
+Each function runs on single-task, multi-task and large-context playbooks,
+without any model server, database or network. The results are written as JSON,
+with the versions of the libraries, to compare the runs before and after an
+upgrade:
+
+    python tools/benchmarks/micro.py --output before.json
+    pip install --upgrade ansible-lint
+    python tools/benchmarks/micro.py --output after.json --compare before.json
+
+The post-processing with ARI uses the knowledge base of ARI_KB_PATH, it is
+skipped when the knowledge base is not there.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+from unittest import mock
+from uuid import uuid4
+
+import django
+import yaml
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ansible_ai_connect.main.settings.development")
+django.setup()
+
+from ansible_anonymizer import anonymizer  # noqa: E402
+from ansible_risk_insight.scanner import Config  # noqa: E402
+from django.apps import apps  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from ansible_ai_connect.ai.api import formatter as fmtr  # noqa: E402
+from ansible_ai_connect.ai.api.data.data_model import APIPayload  # noqa: E402
+from ansible_ai_connect.ai.api.pipelines.completion_context import (  # noqa: E402
+    CompletionContext,
+)
+from ansible_ai_connect.ai.api.pipelines.completion_stages.post_process import (  # noqa: E402
+    completion_post_process,
+)
+from ansible_ai_connect.ansible_lint.lintpostprocessing import (  # noqa: E402
+    AnsibleLintCaller,
+)
+from ansible_ai_connect.ari.postprocessing import ARICaller  # noqa: E402
+
+PACKAGES = [
+    "ansible-anonymizer",
+    "ansible-core",
+    "ansible-lint",
+    "ansible-risk-insight",
+    "PyYAML",
+    "ruamel.yaml",
+]
+
+
+def large_context():
+    """A playbook of three plays, with variables holding personal data, and 60 tasks."""
+    plays = []
+    for play in range(3):
+        tasks = []
+        for task in range(20):
+            tasks += [
+                f"    - name: Install package {play}-{task}",
+                "      ansible.builtin.package:",
+                f'        name: "{{{{ packages[{task}] }}}}"',
+                "        state: present",
+                f"    - name: Configure service {play}-{task}",
+                "      ansible.builtin.template:",
+                f"        src: service-{task}.conf.j2",
+                f"        dest: /etc/service-{task}.conf",
+                '        mode: "0644"',
+                f"      notify: Restart service {task}",
+            ]
+        plays.append(
+            "\n".join(
+                [
+                    f"- name: Configure the servers of zone {play}",
+                    f"  hosts: zone{play}",
+                    "  become: true",
+                    "  vars:",
+                    f"    admin_email: admin{play}@example.com",
+                    f"    gateway: 10.0.{play}.1",
+                    "    db_password: Sup3rS3cr3t",
+                    "    packages:",
+                    *[f"      - package{index}" for index in range(20)],
+                    "  tasks:",
+                    *tasks,
+                ]
+            )
+        )
+    return "\n".join(plays) + "\n"
+
+
+SMALL_CONTEXT = """\
+- name: Configure the web servers
+  hosts: webservers
+  become: true
+  vars:
+    http_port: 80
+    admin_email: admin@example.com
+  tasks:
+    - name: Install httpd
+      ansible.builtin.package:
+        name: httpd
+        state: present
+"""
+
+
+@dataclass
+class Completion:
+    context: str
+    prompt: str
+    # The anonymized prediction of the model for the prompt
+    prediction: str
+
+
+COMPLETIONS = {
+    "single-task": Completion(
+        SMALL_CONTEXT,
+        "    - name: Start the httpd service\n",
+        "      service:\n        name: httpd\n        state: started\n        enabled: yes\n",
+    ),
+    "multi-task": Completion(
+        SMALL_CONTEXT,
+        "    # Copy the index page & Open the http port & Restart httpd\n",
+        "    - name: Copy the index page\n      copy:\n        src: index.html\n"
+        "        dest: /var/www/html/index.html\n        mode: 0644\n"
+        "    - name: Open the http port\n      firewalld:\n"
+        "        port: '{{ http_port }}/tcp'\n        state: enabled\n"
+        "    - name: Restart httpd\n      service: name=httpd state=restarted\n",
+    ),
+    "large-context": Completion(
+        large_context(),
+        "    - name: Start the httpd service\n",
+        "      ansible.builtin.service:\n        name: httpd\n        state: started\n",
+    ),
+}
+
+
+@dataclass
+class Case:
+    name: str
+    completion: str
+    run: Callable[..., Any]
+    # Prepares the arguments of each run, it is not measured
+    setup: Callable[[], tuple]
+    # The ARI and ansible-lint callers of the post-processing
+    ari_caller: Optional[ARICaller] = None
+    ansible_lint_caller: Optional[AnsibleLintCaller] = None
+    skipped: Optional[str] = None
+
+
+def clear_formatter_caches():
+    """Formats each text again, rather than measuring the caches of the formatter."""
+    fmtr._normalize_yaml.cache_clear()
+    fmtr.adjust_indentation.cache_clear()
+
+
+def arguments(*args):
+    return lambda: args
+
+
+def uncached(*args):
+    def setup():
+        clear_formatter_caches()
+        return args
+
+    return setup
+
+
+def post_process_context(completion: Completion):
+    """The context of a completion as the pre-processing and inference stages leave it."""
+    context, prompt = fmtr.preprocess(completion.context, completion.prompt)
+    original_prompt = completion.prompt
+    if not fmtr.is_multi_task_prompt(original_prompt):
+        indent = len(prompt) - len(prompt.lstrip())
+        original_prompt = " " * indent + fmtr.normalize_yaml(completion.prompt)
+    user = SimpleNamespace(rh_user_has_seat=False, groups=None)
+    payload = APIPayload(
+        prompt=prompt,
+        original_prompt=original_prompt,
+        context=context,
+        suggestionId=uuid4(),
+    )
+    multi_task = fmtr.is_multi_task_prompt(completion.prompt)
+
+    def setup():
+        clear_formatter_caches()
+        return (
+            CompletionContext(
+                request=SimpleNamespace(user=user),
+                payload=payload.model_copy(),
+                original_indent=completion.prompt.find("#" if multi_task else "name"),
+                anonymized_predictions={"predictions": [completion.prediction]},
+            ),
+        )
+
+    return setup
+
+
+def ari_caller():
+    if not os.path.isdir(settings.ARI_RULES_DIR):
+        return None
+    return ARICaller(
+        config=Config(
+            rules_dir=settings.ARI_RULES_DIR,
+            data_dir=settings.ARI_DATA_DIR,
+            rules=settings.ARI_RULES,
+        ),
+        silent=True,
+    )
+
+
+def cases(ari: Optional[ARICaller], ansible_lint: AnsibleLintCaller):
+    post_processing = {
+        "ansible_lint": (None, ansible_lint),
+        "ari+ansible_lint": (ari, ansible_lint),
+    }
+    for name, completion in COMPLETIONS.items():
+        text = f"{completion.context}\n{completion.prompt}"
+        prediction = fmtr.normalize_yaml(completion.prediction)
+        yield Case(
+            "formatter.preprocess",
+            name,
+            fmtr.preprocess,
+            uncached(completion.context, completion.prompt),
+        )
+        yield Case("formatter.normalize_yaml", name, fmtr.normalize_yaml, uncached(text))
+        yield Case(
+            "formatter.adjust_indentation", name, fmtr.adjust_indentation, uncached(prediction)
+        )
+        yield Case(
+            "formatter.restore_original_task_names",
+            name,
+            fmtr.restore_original_task_names,
+            arguments(completion.prediction, completion.prompt),
+        )
+        yield Case(
+            "formatter.get_fqcn_or_module_from_prediction",
+            name,
+            fmtr.get_fqcn_or_module_from_prediction,
+            arguments(completion.prediction),
+        )
+        yield Case(
+            "anonymizer.anonymize_struct",
+            name,
+            anonymizer.anonymize_struct,
+            arguments({"context": completion.context, "prompt": completion.prompt}),
+        )
+        for variant, (ari_caller, ansible_lint_caller) in post_processing.items():
+            yield Case(
+                f"completion_post_process[{variant}]",
+                name,
+                completion_post_process,
+                post_process_context(completion),
+                ari_caller,
+                ansible_lint_caller,
+                None if ari_caller or not variant.startswith("ari") else "no ARI knowledge base",
+            )
+
+
+def measure(case: Case, iterations: int, warm_up: int, max_seconds: float) -> dict:
+    """Runs the case the number of iterations, or fewer when they take more than max_seconds."""
+    # The first runs load the rules and plugins of ARI and ansible-lint
+    end = time.perf_counter() + max_seconds
+    for _ in range(warm_up):
+        case.run(*case.setup())
+        if time.perf_counter() > end:
+            break
+    durations = []
+    cpu = 0.0
+    end = time.perf_counter() + max_seconds
+    while len(durations) < iterations and (not durations or time.perf_counter() < end):
+        args = case.setup()
+        start, start_cpu = time.perf_counter(), time.process_time()
+        case.run(*args)
+        durations.append(time.perf_counter() - start)
+        cpu += time.process_time() - start_cpu
+    durations.sort()
+    return {
+        "iterations": len(durations),
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "median_ms": statistics.median(durations) * 1000,
+        "p95_ms": durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000,
+        "min_ms": durations[0] * 1000,
+        "stdev_ms": statistics.pstdev(durations) * 1000,
+        "cpu_mean_ms": cpu / len(durations) * 1000,
+    }
+
+
+def environment() -> dict:
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "libyaml": yaml.__with_libyaml__,
+        "packages": versions,
+    }
+
+
+def compare(results: list[dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {
+            (result["name"], result["completion"]): result for result in json.load(f)["results"]
+        }
+    print(f"\n{'benchmark':<58} {'completion':<14} {'before':>9} {'after':>9} {'change':>8}")
+    for result in results:
+        before = baseline.get((result["name"], result["completion"]))
+        if not before or "median_ms" not in before or "median_ms" not in result:
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"]
+        print(
+            f"{result['name']:<58} {result['completion']:<14} "
+            f"{before['median_ms']:>9.3f} {result['median_ms']:>9.3f} {change:>+8.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warm-up", type=int, default=3)
+    parser.add_argument(
+        "--max-seconds", type=float, default=10, help="time limit of the iterations of a benchmark"
+    )
+    parser.add_argument("--filter", help="regular expression selecting the benchmarks to run")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="results of a previous run")
+    args = parser.parse_args()
+
+    # The post-processing events are not sent, and its warnings not logged on every run
+    settings.SEGMENT_WRITE_KEY = None
+    logging.disable(logging.WARNING)
+    ari = ari_caller()
+    ansible_lint = AnsibleLintCaller(in_memory=settings.ANSIBLE_LINT_IN_MEMORY)
+
+    ai_config = apps.get_app_config("ai")
+    results = []
+    print(f"{'benchmark':<58} {'completion':<14} {'median ms':>10} {'cpu ms':>8}")
+    for case in cases(ari, ansible_lint):
+        if args.filter and not re.search(args.filter, f"{case.name} {case.completion}"):
+            continue
+        label = f"{case.name:<58} {case.completion:<14}"
+        result = {"name": case.name, "completion": case.completion}
+        if case.skipped:
+            result["skipped"] = case.skipped
+            print(f"{label} skipped: {case.skipped} in {settings.ARI_BASE_DIR}")
+        else:
+            with mock.patch.object(ai_config, "get_ari_caller", return_value=case.ari_caller):
+                with mock.patch.object(
+                    ai_config, "get_ansible_lint_caller", return_value=case.ansible_lint_caller
+                ):
+                    result |= measure(case, args.iterations, args.warm_up, args.max_seconds)
+            print(f"{label} {result['median_ms']:>10.3f} {result['cpu_mean_ms']:>8.3f}")
+        results.append(result)
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+        f.write("\n")
+    print(f"\nresults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
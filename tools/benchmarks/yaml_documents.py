@@ -0,0 +1,144 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Measures the CPU time spent loading YAML per completion, with and without the
+YAML documents shared by the completion pipeline stages.
+
+It replays the loads of the pre-processing, the post-processing and the ARI
+per-task evaluation of a single-task and a multi-task completion, without any
+model server, database or network.
+
+    DJANGO_SETTINGS_MODULE=ansible_ai_connect.main.settings.development \
+        SECRET_KEY=benchmark python tools/benchmarks/yaml_documents.py
+"""
+
+import argparse
+import contextlib
+import os
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ansible_ai_connect.main.settings.development")
+django.setup()
+
+from ansible_ai_connect.ai.api import formatter as fmtr  # noqa: E402
+from ansible_ai_connect.ai.api.serializers import (  # noqa: E402
+    CompletionRequestSerializer,
+)
+from ansible_ai_connect.ai.api.utils import documents as documents_module  # noqa: E402
+from ansible_ai_connect.ai.api.utils.documents import (  # noqa: E402
+    YamlDocuments,
+    load_yaml,
+)
+from ansible_ai_connect.ari.postprocessing import ARICaller  # noqa: E402
+
+CONTEXT = """\
+- hosts: webservers
+  become: true
+  vars:
+    http_port: 80
+    packages:
+      - httpd
+      - mod_ssl
+      - firewalld
+  tasks:
+    - name: Ensure the packages are installed
+      ansible.builtin.package:
+        name: "{{ packages }}"
+        state: present
+    - name: Open the http port
+      ansible.posix.firewalld:
+        port: "{{ http_port }}/tcp"
+        permanent: true
+        state: enabled
+"""
+
+COMPLETIONS = {
+    "single-task": (
+        "    - name: Start the httpd service\n",
+        "      ansible.builtin.service:\n        name: httpd\n        state: started\n",
+    ),
+    "multi-task": (
+        "    # Start httpd & Copy the index page & Restart httpd\n",
+        "    - name: Start httpd\n      ansible.builtin.service:\n        name: httpd\n"
+        "        state: started\n"
+        "    - name: Copy the index page\n      ansible.builtin.copy:\n"
+        "        src: index.html\n        dest: /var/www/html/index.html\n"
+        "    - name: Restart httpd\n      ansible.builtin.service:\n        name: httpd\n"
+        "        state: restarted\n",
+    ),
+}
+
+
+def complete(prompt, recommendation):
+    """The YAML loads of a completion, from the request validation to ARI."""
+    user = SimpleNamespace(rh_user_has_seat=True)
+    # Each completion normalizes its texts, rather than reusing the ones of the previous run
+    fmtr._normalize_yaml.cache_clear()
+    CompletionRequestSerializer.validate_extracted_prompt(prompt, user)
+    original_prompt = prompt
+    context, prompt = fmtr.preprocess(CONTEXT, prompt)
+    if not fmtr.is_multi_task_prompt(prompt):
+        fmtr.normalize_yaml(original_prompt)
+    load_yaml(recommendation)
+    # ARI evaluates each task of a multi-task suggestion on its own
+    tasks = ARICaller.split_tasks(recommendation) if fmtr.is_multi_task_prompt(prompt) else []
+    for task in tasks or [recommendation]:
+        ARICaller.make_input_yaml(context, prompt, task)
+    if tasks:
+        fmtr.get_task_names_from_tasks(recommendation)
+
+
+def measure(prompt, recommendation, iterations, shared):
+    loads = 0
+    safe_load = documents_module.safe_load
+
+    def counted_safe_load(stream):
+        nonlocal loads
+        loads += 1
+        return safe_load(stream)
+
+    with mock.patch.object(documents_module, "safe_load", counted_safe_load):
+        start = time.process_time()
+        for _ in range(iterations):
+            documents = YamlDocuments().activate() if shared else contextlib.nullcontext()
+            with documents:
+                complete(prompt, recommendation)
+        duration = time.process_time() - start
+    return duration * 1000 / iterations, loads / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'completion':<12} {'documents':<10} {'loads':>6} {'cpu ms':>8}")
+    for name, (prompt, recommendation) in COMPLETIONS.items():
+        baseline = None
+        for shared in (False, True):
+            cpu, loads = measure(prompt, recommendation, args.iterations, shared)
+            line = f"{name:<12} {'shared' if shared else 'none':<10} {loads:>6.0f} {cpu:>8.3f}"
+            if baseline:
+                line += f"  ({(baseline - cpu) / baseline:.0%} less)"
+            baseline = cpu
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Sends completion, feedback, content match, explanation and generation requests
+to a running service at a target rate, and reports the throughput, the latency
+percentiles and the errors per endpoint.
+
+The requests start at the target rate whether the previous ones completed or
+not, as the users of the service would. With the URL of the stats of the fake
+WCA server, the report includes the calls the service made to it.
+
+    python tools/loadtest/driver.py --url http://localhost:8000 --token TOKEN \\
+        --rps 20 --duration 60 --mix completions=80,feedback=15,contentmatches=5 \\
+        --wca-stats http://localhost:8090/stats --output report.json
+
+The token is an OAuth2 access token of a user with a seat, for instance from
+`manage.py createtoken --create-user --groups Commercial --organization-id 1`,
+and COMPLETION_USER_RATE_THROTTLE must allow the rate of the test to a single
+user, 10/minute by default. The requests are synthetic unless `--replay` gives a
+file of captured ones, one JSON object per line:
+
+    {"endpoint": "completions", "body": {"prompt": "...", "suggestionId": "..."}}
+
+The identifiers of the replayed requests are replaced with new ones, unless
+`--keep-ids` is set, so that the responses are not served from a cache.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Iterator, Optional
+
+import aiohttp
+
+ENDPOINTS = {
+    "completions": "/api/v0/ai/completions/",
+    "feedback": "/api/v0/ai/feedback/",
+    "contentmatches": "/api/v0/ai/contentmatches/",
+    "explanations": "/api/v0/ai/explanations/",
+    "generations": "/api/v0/ai/generations/",
+}
+ID_FIELDS = ["suggestionId", "explanationId", "generationId"]
+PERCENTILES = [50, 90, 95, 99]
+
+PACKAGES = ["nginx", "httpd", "postgresql", "redis", "firewalld", "chrony", "podman", "git"]
+
+PLAYBOOK = """\
+---
+- name: Configure the web servers
+  hosts: webservers
+  become: true
+  tasks:
+    - name: Install {package}
+      ansible.builtin.package:
+        name: {package}
+        state: present
+"""
+
+
+def synthetic_request(endpoint: str, rng: random.Random) -> dict:
+    package = rng.choice(PACKAGES)
+    playbook = PLAYBOOK.format(package=package)
+    if endpoint == "completions":
+        if rng.random() < 0.3:
+            prompt = f"    # Start {package} & Enable {package} at boot & Open the firewall\n"
+        else:
+            prompt = f"    - name: Start the {package} service\n"
+        return {
+            "prompt": f"{playbook}{prompt}",
+            "suggestionId": str(uuid.uuid4()),
+            "metadata": {"ansibleExtensionVersion": "24.4.0"},
+        }
+    if endpoint == "feedback":
+        return {
+            "sentimentFeedback": {"value": rng.randint(1, 5), "feedback": "Load test feedback"},
+        }
+    if endpoint == "contentmatches":
+        return {
+            "suggestions": [
+                f"      ansible.builtin.package:\n        name: {package}\n        state: present\n"
+            ],
+            "suggestionId": str(uuid.uuid4()),
+        }
+    if endpoint == "explanations":
+        return {"content": playbook, "explanationId": str(uuid.uuid4())}
+    return {
+        "text": f"Install and start {package} on the web servers",
+        "generationId": str(uuid.uuid4()),
+        "createOutline": True,
+    }
+
+
+def synthetic_traffic(mix: dict[str, int], rng: random.Random) -> Iterator[tuple[str, dict]]:
+    endpoints, weights = zip(*mix.items())
+    while True:
+        endpoint = rng.choices(endpoints, weights)[0]
+        yield endpoint, synthetic_request(endpoint, rng)
+
+
+def replayed_traffic(path: str, keep_ids: bool) -> Iterator[tuple[str, dict]]:
+    with open(path) as f:
+        requests = [json.loads(line) for line in f if line.strip()]
+    for request in itertools.cycle(requests):
+        body = dict(request["body"])
+        if not keep_ids:
+            body |= {field: str(uuid.uuid4()) for field in ID_FIELDS if field in body}
+        yield request["endpoint"], body
+
+
+def percentile(durations: list[float], p: int) -> Optional[float]:
+    """Nearest-rank percentile of sorted durations."""
+    if not durations:
+        return None
+    return durations[max(int(len(durations) * p / 100 + 0.5) - 1, 0)]
+
+
+class Results:
+    def __init__(self):
+        self.sent: Counter = Counter()
+        self.dropped: Counter = Counter()
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        # HTTP status or exception name of the completed requests
+        self.outcomes: dict[str, Counter] = defaultdict(Counter)
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        for endpoint in sorted(self.sent):
+            durations = sorted(self.durations[endpoint])
+            ok = sum(n for status, n in self.outcomes[endpoint].items() if status.startswith("2"))
+            endpoints[endpoint] = {
+                "sent": self.sent[endpoint],
+                "dropped": self.dropped[endpoint],
+                "completed": len(durations),
+                "ok": ok,
+                "throughput_rps": len(durations) / duration,
+                "latency_ms": {
+                    **{f"p{p}": (percentile(durations, p) or 0) * 1000 for p in PERCENTILES},
+                    "max": (durations[-1] if durations else 0) * 1000,
+                },
+                "outcomes": dict(self.outcomes[endpoint]),
+            }
+        completed = sum(len(durations) for durations in self.durations.values())
+        return {
+            "duration_s": duration,
+            "sent": sum(self.sent.values()),
+            "dropped": sum(self.dropped.values()),
+            "completed": completed,
+            "throughput_rps": completed / duration,
+            "endpoints": endpoints,
+        }
+
+
+async def send(session, url, endpoint, body, results: Results):
+    start = time.perf_counter()
+    try:
+        async with session.post(url + ENDPOINTS[endpoint], json=body) as response:
+            await response.read()
+            outcome = str(response.status)
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+    except aiohttp.ClientError as e:
+        outcome = type(e).__name__
+    results.durations[endpoint].append(time.perf_counter() - start)
+    results.outcomes[endpoint][outcome] += 1
+
+
+async def wca_stats(session, url: Optional[str]) -> Optional[dict]:
+    if not url:
+        return None
+    async with session.get(url) as response:
+        return await response.json()
+
+
+def upstream_calls(before: dict, after: dict, requests: int) -> dict:
+    calls = {}
+    for endpoint, statuses in after["calls"].items():
+        previous = before["calls"].get(endpoint, {})
+        counts = {
+            status: n - previous.get(status, 0)
+            for status, n in statuses.items()
+            if n - previous.get(status, 0)
+        }
+        if counts:
+            calls[endpoint] = counts
+    total = after["total"] - before["total"]
+    return {
+        "calls": calls,
+        "total": total,
+        "per_request": total / requests if requests else 0,
+    }
+
+
+async def run(args, traffic: Iterator[tuple[str, dict]]) -> dict:
+    results = Results()
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.max_in_flight)
+    async with aiohttp.ClientSession(
+        headers=headers, timeout=timeout, connector=connector
+    ) as session:
+        before = await wca_stats(session, args.wca_stats)
+        in_flight = set()
+        start = time.perf_counter()
+        for index in itertools.count():
+            scheduled = start + index / args.rps
+            if scheduled - start >= args.duration:
+                break
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            endpoint, body = next(traffic)
+            results.sent[endpoint] += 1
+            if len(in_flight) >= args.max_in_flight:
+                # The service is too far behind, the driver would measure its own queue
+                results.dropped[endpoint] += 1
+                continue
+            task = asyncio.create_task(send(session, args.url, endpoint, body, results))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(in_flight)
+        duration = time.perf_counter() - start
+        report = results.report(duration)
+        after = await wca_stats(session, args.wca_stats)
+    if before and after:
+        report["upstream"] = upstream_calls(before, after, report["completed"])
+    return report
+
+
+def print_report(report: dict):
+    print(
+        f"{report['completed']} requests completed in {report['duration_s']:.1f}s, "
+        f"{report['throughput_rps']:.1f} rps, {report['dropped']} dropped"
+    )
+    header = " ".join(f"{f'p{p} ms':>9}" for p in PERCENTILES)
+    print(f"{'endpoint':<16} {'sent':>6} {'ok':>6} {header} {'max ms':>9}  outcomes")
+    for endpoint, result in report["endpoints"].items():
+        latencies = " ".join(f"{result['latency_ms'][f'p{p}']:>9.1f}" for p in PERCENTILES)
+        outcomes = ", ".join(f"{k}: {v}" for k, v in sorted(result["outcomes"].items()))
+        print(
+            f"{endpoint:<16} {result['sent']:>6} {result['ok']:>6} {latencies} "
+            f"{result['latency_ms']['max']:>9.1f}  {outcomes}"
+        )
+    if "upstream" in report:
+        upstream = report["upstream"]
+        print(f"\nWCA calls: {upstream['total']}, {upstream['per_request']:.2f} per request")
+        for endpoint, statuses in sorted(upstream["calls"].items()):
+            print(f"  {endpoint:<14} " + ", ".join(f"{k}: {v}" for k, v in statuses.items()))
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(","):
+        endpoint, _, weight = item.partition("=")
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {endpoint}")
+        mix[endpoint] = int(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000", help="URL of the service")
+    parser.add_argument("--token", help="OAuth2 access token sent with the requests")
+    parser.add_argument("--rps", type=float, default=10, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of traffic")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="completions=80,feedback=10,contentmatches=6,explanations=2,generations=2",
+        help="relative weights of the endpoints of the synthetic requests",
+    )
+    parser.add_argument("--replay", help="file of requests to send instead of synthetic ones")
+    parser.add_argument("--keep-ids", action="store_true", help="send the replayed ids as is")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout of a request")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--wca-stats", help="URL of the stats of the fake WCA server")
+    parser.add_argument("--seed", type=int, help="seed of the synthetic requests")
+    parser.add_argument("--output", help="file to write the report to, as JSON")
+    args = parser.parse_args()
+
+    if args.replay:
+        traffic = replayed_traffic(args.replay, args.keep_ids)
+    else:
+        traffic = synthetic_traffic(args.mix, random.Random(args.seed))
+    report = asyncio.run(run(args, traffic))
+    report["config"] = {"url": args.url, "rps": args.rps, "duration": args.duration}
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
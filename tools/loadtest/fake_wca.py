@@ -0,0 +1,289 @@
+#  Copyright Red Hat
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+A stand-in for the WCA and IBM Cloud IAM APIs, to load test the service locally.
+
+Every endpoint answers after a latency drawn from its distribution, and fails at
+the configured rates with a 429, a 5xx, or the 403 page of Cloudflare. The
+X-Request-ID header of the requests is echoed in the responses.
+
+    python tools/loadtest/fake_wca.py --port 8090 \\
+        --latency lognormal:300:0.5 --latency codegen=lognormal:900:0.4 \\
+        --error 429=0.02 --error codegen:cloudflare=0.005 --error token:503=0.01
+
+A latency is `fixed:MS`, `uniform:MIN_MS:MAX_MS` or `lognormal:MEDIAN_MS:SIGMA`,
+an error kind is 429, 500, 502, 503, 504 or cloudflare. Both apply to all the
+endpoints unless prefixed by one of: token, codegen, codematch, explain, playbook.
+
+The service uses it with:
+
+    ANSIBLE_AI_MODEL_MESH_API_TYPE=wca
+    ANSIBLE_AI_MODEL_MESH_API_URL=http://localhost:8090
+    ANSIBLE_WCA_IDP_URL=http://localhost:8090/identity
+    ANSIBLE_AI_MODEL_MESH_API_KEY=fake
+    ANSIBLE_AI_MODEL_MESH_MODEL_ID=fake
+    WCA_SECRET_BACKEND_TYPE=dummy
+    WCA_SECRET_DUMMY_SECRETS='1:fake<sep>fake'
+
+GET /stats returns the number of calls per endpoint and status, POST /stats/reset
+sets them back to zero.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Callable
+
+from aiohttp import web
+
+ENDPOINTS = ["token", "codegen", "codematch", "explain", "playbook"]
+ERROR_KINDS = ["429", "500", "502", "503", "504", "cloudflare"]
+REQUEST_ID_HEADER = "X-Request-ID"
+
+CLOUDFLARE_PAGE = """\
+<!DOCTYPE html>
+<html><head><title>Attention Required! | Cloudflare</title></head>
+<body><h1>Sorry, you have been blocked</h1>
+<p>Cloudflare Ray ID: {ray_id}</p></body></html>
+"""
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """The function drawing the latencies, in seconds, of a distribution spec."""
+    kind, *values = spec.split(":")
+    try:
+        numbers = [float(value) for value in values]
+        if kind == "fixed" and len(numbers) == 1:
+            return lambda: numbers[0] / 1000
+        if kind == "uniform" and len(numbers) == 2:
+            return lambda: rng.uniform(*numbers) / 1000
+        if kind == "lognormal" and len(numbers) == 2:
+            median, sigma = numbers
+            return lambda: median * rng.lognormvariate(0, sigma) / 1000
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"invalid latency distribution: {spec}")
+
+
+def split_endpoint(value: str) -> tuple[list[str], str]:
+    """The endpoints an option applies to, and the rest of the option."""
+    for endpoint in ENDPOINTS:
+        for separator in ("=", ":"):
+            prefix = f"{endpoint}{separator}"
+            if value.startswith(prefix):
+                return [endpoint], value[len(prefix) :]
+    return ENDPOINTS, value
+
+
+class FakeWCA:
+    def __init__(self, latencies, errors, token_ttl: int, rng: random.Random):
+        # Latency function and {error kind: rate} per endpoint
+        self.latencies: dict[str, Callable[[], float]] = latencies
+        self.errors: dict[str, dict[str, float]] = errors
+        self.token_ttl = token_ttl
+        self.rng = rng
+        self.calls: dict[str, Counter] = defaultdict(Counter)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/identity/token", self.endpoint("token", self.token)),
+                web.post("/v1/wca/codegen/ansible", self.endpoint("codegen", self.codegen)),
+                web.post("/v1/wca/codematch/ansible", self.endpoint("codematch", self.codematch)),
+                web.post(
+                    "/v1/wca/explain/ansible/playbook", self.endpoint("explain", self.explain)
+                ),
+                web.post(
+                    "/v1/wca/codegen/ansible/playbook", self.endpoint("playbook", self.playbook)
+                ),
+                web.get("/stats", self.stats),
+                web.post("/stats/reset", self.reset_stats),
+            ]
+        )
+        return app
+
+    def endpoint(self, name, handler):
+        async def handle(request: web.Request) -> web.Response:
+            await asyncio.sleep(self.latencies[name]())
+            # Responses are mappings, false when they have no state
+            response = self.error(name)
+            if response is None:
+                response = await self.authorized(name, request, handler)
+            request_id = request.headers.get(REQUEST_ID_HEADER)
+            if request_id:
+                response.headers[REQUEST_ID_HEADER] = request_id
+            self.calls[name][str(response.status)] += 1
+            return response
+
+        return handle
+
+    def error(self, name):
+        draw = self.rng.random()
+        for kind, rate in self.errors[name].items():
+            if draw < rate:
+                if kind == "cloudflare":
+                    return web.Response(
+                        status=403,
+                        text=CLOUDFLARE_PAGE.format(ray_id=uuid.uuid4().hex[:16]),
+                        content_type="text/html",
+                    )
+                return web.json_response({"detail": f"fake {kind} error"}, status=int(kind))
+            draw -= rate
+        return None
+
+    @staticmethod
+    async def authorized(name, request, handler):
+        if name != "token" and not request.headers.get("Authorization"):
+            return web.json_response({"detail": "missing Authorization header"}, status=401)
+        return await handler(request)
+
+    async def token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if not form.get("apikey") or not form.get("grant_type"):
+            return web.json_response({"errorCode": "BXNIM0415E"}, status=400)
+        now = int(time.time())
+        return web.json_response(
+            {
+                "access_token": uuid.uuid4().hex,
+                "refresh_token": "not_supported",
+                "token_type": "Bearer",
+                "expires_in": self.token_ttl,
+                "expiration": now + self.token_ttl,
+                "scope": "ibm openid",
+            }
+        )
+
+    @staticmethod
+    async def codegen(request: web.Request) -> web.Response:
+        data = await request.json()
+        prompt = data.get("prompt", "").rstrip("\n").split("\n")[-1]
+        indent = " " * (len(prompt) - len(prompt.lstrip()))
+        if prompt.lstrip().startswith("#"):
+            names = [name.strip() for name in prompt.split("#", 1)[1].split("&")]
+            prediction = "".join(
+                f"{indent}- name: {name}\n{indent}  ansible.builtin.debug:\n"
+                f"{indent}    msg: {name}\n"
+                for name in names
+            )
+        else:
+            prediction = (
+                f"{indent}  ansible.builtin.package:\n"
+                f"{indent}    name: nginx\n{indent}    state: present\n"
+            )
+        return web.json_response({"predictions": [prediction]})
+
+    @staticmethod
+    async def codematch(request: web.Request) -> web.Response:
+        data = await request.json()
+        return web.json_response(
+            [
+                {
+                    "code_matches": [
+                        {
+                            "repo_name": f"fake.collection{index}",
+                            "repo_url": f"https://galaxy.ansible.com/fake/collection{index}",
+                            "path": "plugins/modules/package.py",
+                            "license": "gpl-3.0",
+                            "data_source_description": "Ansible Galaxy collections",
+                            "score": 0.9 - index / 10,
+                        }
+                        for index in range(3)
+                    ],
+                    "meta": {"encode_duration": 12.5, "search_duration": 25.0},
+                }
+                for _ in data.get("input", [])
+            ]
+        )
+
+    @staticmethod
+    async def explain(request: web.Request) -> web.Response:
+        await request.json()
+        return web.json_response(
+            {"explanation": "## Summary\nThis playbook installs and starts nginx.\n"}
+        )
+
+    @staticmethod
+    async def playbook(request: web.Request) -> web.Response:
+        data = await request.json()
+        outline = data.get("outline") or "1. Install nginx\n2. Start nginx"
+        playbook = (
+            "---\n- name: Generated playbook\n  hosts: all\n  tasks:\n"
+            "    - name: Install nginx\n      ansible.builtin.package:\n"
+            "        name: nginx\n        state: present\n"
+            "    - name: Start nginx\n      ansible.builtin.service:\n"
+            "        name: nginx\n        state: started\n"
+        )
+        return web.json_response(
+            {"playbook": playbook, "outline": outline if data.get("create_outline") else ""}
+        )
+
+    async def stats(self, request: web.Request) -> web.Response:
+        calls = {name: dict(statuses) for name, statuses in self.calls.items()}
+        total = sum(sum(statuses.values()) for statuses in self.calls.values())
+        return web.json_response({"calls": calls, "total": total})
+
+    async def reset_stats(self, request: web.Request) -> web.Response:
+        self.calls.clear()
+        return web.json_response({})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        metavar="[ENDPOINT=]DISTRIBUTION",
+        help="latency of the responses, lognormal:300:0.5 by default",
+    )
+    parser.add_argument(
+        "--error",
+        action="append",
+        default=[],
+        metavar="[ENDPOINT:]KIND=RATE",
+        help="fraction of the calls failing with the kind of error",
+    )
+    parser.add_argument("--token-ttl", type=int, default=3600, help="lifetime of IAM tokens")
+    parser.add_argument("--seed", type=int, help="seed of the latencies and errors")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    default_latency = parse_latency("lognormal:300:0.5", rng)
+    latencies = {endpoint: default_latency for endpoint in ENDPOINTS}
+    for option in args.latency:
+        endpoints, spec = split_endpoint(option)
+        latency = parse_latency(spec, rng)
+        latencies.update({endpoint: latency for endpoint in endpoints})
+    errors = {endpoint: {} for endpoint in ENDPOINTS}
+    for option in args.error:
+        endpoints, spec = split_endpoint(option)
+        kind, _, rate = spec.partition("=")
+        if kind not in ERROR_KINDS:
+            parser.error(f"unknown error kind {kind}, expected one of {', '.join(ERROR_KINDS)}")
+        for endpoint in endpoints:
+            errors[endpoint][kind] = float(rate)
+
+    fake_wca = FakeWCA(latencies, errors, args.token_ttl, rng)
+    web.run_app(fake_wca.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()